@@ -1,6 +1,7 @@
 from .event_admin import cpe
-from .boat_admin import boatready, boatready_callback, checkinmode, editseats
+from .boat_admin import boatready, boatready_callback, checkinmode, editseats, manifest
 from .user_admin import register, unregister
+from .sheets_admin import resyncsheets
 
 __all__ = [
     "cpe",
@@ -8,6 +9,8 @@ __all__ = [
     "boatready_callback",
     "checkinmode",
     "editseats",
+    "manifest",
     "register",
     "unregister",
+    "resyncsheets",
 ]
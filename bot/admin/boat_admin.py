@@ -6,6 +6,9 @@ from db.models import Boat, BoardingSession
 from datetime import datetime
 from bot.utils.roles import require_role
 from utils.timezone import get_maldives_time
+from services.boarding_context import invalidate_boarding_context
+from db.seat_ledger import sync_seat_ledger, set_ledger_capacity
+from services.manifest_projection import rebuild_manifest, load_manifest, manifest_counts
 
 @require_role("admin")
 async def boatready(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -83,8 +86,15 @@ async def _create_boarding_session(update, boat_number: int, seat_count: int, le
             started_at=get_maldives_time()
         )
         db.add(session)
+        db.flush()
+
+        # Reconcile the seat ledger for this boat/leg (capacity + already boarded count)
+        sync_seat_ledger(db, boat_number, leg_type, seat_count)
+        rebuild_manifest(db, boat_number, leg_type)
         db.commit()
 
+    invalidate_boarding_context(f"boat {boat_number} {leg_type} session started")
+
     leg_emoji = "🛬" if leg_type == "arrival" else "🛫"
     message_text = (
         f"🛳 Boat {boat_number} is now boarding for {leg_emoji} {leg_type.upper()} with {seat_count} seats.\n"
@@ -165,10 +175,51 @@ async def editseats(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text(f"❌ Boat {boat_number} not found.")
                 return
             boat.capacity = new_count
+            set_ledger_capacity(db, boat_number, new_count)
             db.commit()
 
+        invalidate_boarding_context(f"boat {boat_number} capacity set to {new_count}")
+
         await update.message.reply_text(f"✅ Boat {boat_number} seat count updated to {new_count}.")
         logger.info(f"[Admin] Boat {boat_number} seat count updated to {new_count} by {user_id}.")
 
     except Exception as e:
-        log_and_raise("Admin", "running /editseats", e)
\ No newline at end of file
+        log_and_raise("Admin", "running /editseats", e)
+
+@require_role("checkin_staff")
+async def manifest(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the live manifest for a boat (boarding order) from the manifest projection."""
+    try:
+        if not context.args:
+            await update.message.reply_text("Usage: /manifest <BoatNumber> [arrival|departure]")
+            return
+
+        boat_number = int(context.args[0])
+        leg_type = context.args[1].lower() if len(context.args) > 1 else None
+        if leg_type not in (None, "arrival", "departure"):
+            await update.message.reply_text("❌ Leg must be 'arrival' or 'departure'.")
+            return
+
+        with get_db() as db:
+            rows = load_manifest(db, boat_number, leg_type=leg_type)
+            counts = manifest_counts(db, boat_number)
+
+        header = (
+            f"📋 Boat {boat_number} manifest"
+            + (f" ({leg_type})" if leg_type else "")
+            + f"\n🛬 Arrival: {counts.get('arrival', 0)} | 🛫 Departure: {counts.get('departure', 0)}"
+        )
+        if not rows:
+            await update.message.reply_text(f"{header}\n\nNo passengers boarded yet.")
+            return
+
+        lines = [f"{idx}. {row['Name']} ({row['ID']}) — {row['Leg']}" for idx, row in enumerate(rows, start=1)]
+        text = header + "\n\n" + "\n".join(lines)
+        if len(text) > 4000:  # Telegram message limit
+            text = text[:4000].rsplit("\n", 1)[0] + "\n…"
+        await update.message.reply_text(text)
+
+    except ValueError:
+        await update.message.reply_text("❌ Boat number must be a number.")
+    except Exception as e:
+        log_and_raise("Admin", "running /manifest", e)
@@ -7,6 +7,7 @@ from db.models import Config
 from sheets.manager import create_event_tab
 from googleapiclient.errors import HttpError
 from bot.utils.roles import require_role
+from services.boarding_context import invalidate_boarding_context
 
 
 @require_role("admin")
@@ -48,6 +49,8 @@ async def cpe(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 db.add(Config(key="active_event", value=event_name))
             db.commit()
 
+        invalidate_boarding_context(f"active event set to '{event_name}'")
+
         await update.message.reply_text(f"✅ Active event set to: {event_name}")
         logger.info(f"[Admin] Active event set to '{event_name}' by {user_id}")
 
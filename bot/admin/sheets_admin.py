@@ -0,0 +1,25 @@
+from telegram import Update
+from telegram.ext import ContextTypes
+from config.logger import logger, log_and_raise
+from sheets.manager import resync_sheets
+from bot.utils.roles import require_role
+from services.boarding_context import get_boarding_context
+
+
+@require_role("admin")
+async def resyncsheets(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Re-verify sheet headers and drop cached row positions (after manual sheet edits)."""
+    try:
+        user_id = str(update.effective_user.id)
+        event_name = " ".join(context.args).strip() if context.args else get_boarding_context().event_name
+
+        results = resync_sheets(event_name)
+
+        lines = ["🔄 Sheets resynced:"]
+        for tab, aligned in results.items():
+            lines.append(f"{'✅' if aligned else '❌'} {tab} — {'headers OK' if aligned else 'header mismatch (see logs)'}")
+        await update.message.reply_text("\n".join(lines))
+        logger.info(f"[Admin] Sheets resynced by {user_id}: {results}")
+
+    except Exception as e:
+        log_and_raise("Admin", "running /resyncsheets", e)
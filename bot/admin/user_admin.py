@@ -3,7 +3,7 @@ from telegram.ext import ContextTypes
 from config.logger import logger, log_and_raise
 from db.init import get_db
 from db.models import User
-from bot.utils.roles import require_role
+from bot.utils.roles import require_role, invalidate_role_cache
 
 VALID_ROLES = ["admin", "checkin_staff", "booking_staff"]
 
@@ -36,6 +36,8 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.info(f"[Register] Registered new user {target_chat_id} as {role} ({name})")
             db.commit()
 
+        invalidate_role_cache(target_chat_id)
+
         await update.message.reply_text(f"✅ User {target_chat_id} registered as {role}.")
 
     except Exception as e:
@@ -57,6 +59,7 @@ async def unregister(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 display_name = user.name or target_chat_id
                 db.delete(user)
                 db.commit()
+                invalidate_role_cache(target_chat_id)
                 await update.message.reply_text(f"✅ Unregistered {display_name}.")
                 logger.info(f"[Unregister] Removed user {target_chat_id} ({display_name})")
             else:
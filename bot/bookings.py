@@ -1,18 +1,58 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from config.logger import logger, log_and_raise
-from config.envs import DRY_RUN, PHOTO_REQUIRED
-from db.init import get_db
+from config.envs import PHOTO_REQUIRED
+from sqlalchemy import select
+from db.init import get_async_db
 from db.models import Booking, Config
-from sheets.manager import append_to_master, append_to_event, update_booking_photo
 from utils.money import parse_amount
 from utils.booking_parser import parse_booking_input
 from utils.photo import handle_photo_upload
 from utils.booking_schema import build_master_row
+from utils.timezone import get_maldives_time
 from services.booking_service import create_booking
+from services.sheets_outbox import enqueue_append, enqueue_photo
 from bot.utils.roles import require_role
 
 # ===== /newbooking Command =====
+def _create_booking_tx(db, **fields):
+    """
+    Create the booking and queue its Sheets row in one transaction (runs on a sync
+    Session via AsyncSession.run_sync). Returns (event_name, booking); event_name is
+    None when no active event is set.
+    """
+    active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
+    if not active_event_cfg or not active_event_cfg.value:
+        return None, None
+    event_name = active_event_cfg.value.strip()
+
+    booking = create_booking(db=db, event_name=event_name, **fields)
+
+    # Build Master row using schema utility
+    booking_dict = {
+        "ticket_ref": booking.ticket_ref,
+        "name": fields["name"],
+        "id_number": fields["id_number"],
+        "phone": fields["phone"],
+        "male_dep": fields["male_dep"],
+        "resort_dep": fields["resort_dep"],
+        "arrival_time": fields["arrival_time"],
+        "departure_time": fields["departure_time"],
+        "paid_amount": fields["paid_amount"],
+        "transfer_ref": fields["transfer_ref"],
+        "ticket_type": fields["ticket_type"],
+        "status": "booked",
+        "id_doc_url": fields["id_doc_url"],
+        "group_id": getattr(booking, "group_id", ""),
+        "created_at": getattr(booking, "created_at", None),
+    }
+    master_row = build_master_row(booking_dict, event_name)
+
+    # Sheets append is queued and flushed by the outbox worker
+    enqueue_append(db, event_name, [master_row])
+    return event_name, booking
+
+
 @require_role("booking_staff")
 async def newbooking(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Create a new booking and append to DB + Sheets."""
@@ -81,16 +121,9 @@ async def newbooking(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Photo ID is required for booking. Please attach a photo.")
             return
 
-        with get_db() as db:
-            active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
-            if not active_event_cfg or not active_event_cfg.value:
-                await update.message.reply_text("⛔ No active event set. Use /cpe first.")
-                return
-            event_name = active_event_cfg.value.strip()
-
-            booking = create_booking(
-                db=db,
-                event_name=event_name,
+        async with get_async_db() as db:
+            event_name, booking = await db.run_sync(
+                _create_booking_tx,
                 name=name,
                 id_number=id_number,
                 phone=phone,
@@ -103,31 +136,10 @@ async def newbooking(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 departure_time=departure_time,
                 id_doc_url=id_doc_url,
             )
-            ticket_ref = booking.ticket_ref
-
-            # Build Master row using schema utility
-            booking_dict = {
-                "ticket_ref": ticket_ref,
-                "name": name,
-                "id_number": id_number,
-                "phone": phone,
-                "male_dep": male_dep,
-                "resort_dep": resort_dep,
-                "arrival_time": arrival_time,
-                "departure_time": departure_time,
-                "paid_amount": paid_amount,
-                "transfer_ref": transfer_ref,
-                "ticket_type": ticket_type,
-                "status": "booked",
-                "id_doc_url": id_doc_url,
-                "group_id": getattr(booking, "group_id", ""),
-                "created_at": getattr(booking, "created_at", None),
-            }
-            master_row = build_master_row(booking_dict, event_name)
-
-            if not DRY_RUN:
-                append_to_master(event_name, master_row)
-                append_to_event(event_name, master_row)  # let booking_io build event row
+        if not event_name:
+            await update.message.reply_text("⛔ No active event set. Use /cpe first.")
+            return
+        ticket_ref = booking.ticket_ref
 
         # Confirmation message + inline button
         msg_lines = [
@@ -196,38 +208,38 @@ async def handle_booking_photo(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return
 
-    with get_db() as db:
+    async with get_async_db() as db:
         # Try ticket_ref first (unique)
-        booking = db.query(Booking).filter(Booking.ticket_ref == id_arg).first()
+        booking = (await db.execute(select(Booking).where(Booking.ticket_ref == id_arg))).scalars().first()
+        # Fall back to id_number
+        matches = [booking] if booking else \
+            (await db.execute(select(Booking).where(Booking.id_number == id_arg))).scalars().all()
 
-        if not booking:
-            # Fall back to id_number
-            matches = db.query(Booking).filter(Booking.id_number == id_arg).all()
-            if not matches:
-                await update.message.reply_text(f"❌ No booking found for `{id_arg}`")
-                return
-            if len(matches) > 1:
-                lines = [f"- {b.ticket_ref}: {b.name} (event {b.event_id})" for b in matches]
-                await update.message.reply_text(
-                    f"⚠️ Multiple bookings found for ID {id_arg}:\n"
-                    + "\n".join(lines) +
-                    "\n\nPlease retry with `/attachphoto <TICKET_REF>`."
-                )
-                return
-            booking = matches[0]
+    if not matches:
+        await update.message.reply_text(f"❌ No booking found for `{id_arg}`")
+        return
+    if len(matches) > 1:
+        lines = [f"- {b.ticket_ref}: {b.name} (event {b.event_id})" for b in matches]
+        await update.message.reply_text(
+            f"⚠️ Multiple bookings found for ID {id_arg}:\n"
+            + "\n".join(lines) +
+            "\n\nPlease retry with `/attachphoto <TICKET_REF>`."
+        )
+        return
+    booking = matches[0]
 
-        # Upload photo to Supabase
-        file_url = await handle_photo_upload(update, booking.ticket_ref)
-        if file_url:
+    # Upload photo to Supabase (no DB connection held meanwhile)
+    file_url = await handle_photo_upload(update, booking.ticket_ref)
+    if file_url:
+        async with get_async_db() as db:
+            booking = await db.get(Booking, booking.id)
             booking.id_doc_url = file_url
-            db.commit()
-            db.refresh(booking)
-
-            if not DRY_RUN:
-                update_booking_photo(booking.event_id, booking.ticket_ref, file_url)
+            # Re-uploads overwrite the same path, so bump the version PDF caches key on
+            booking.updated_at = get_maldives_time()
+            await db.run_sync(enqueue_photo, booking.event_id, booking.ticket_ref, file_url)
 
-            await update.message.reply_text(
-                f"✅ Photo attached to {booking.name} "
-                f"(ID: {booking.id_number}, Ticket: {booking.ticket_ref})"
-            )
-            logger.info(f"[Booking] Photo attached for {booking.name} ({booking.id_number}, {booking.ticket_ref})")
\ No newline at end of file
+        await update.message.reply_text(
+            f"✅ Photo attached to {booking.name} "
+            f"(ID: {booking.id_number}, Ticket: {booking.ticket_ref})"
+        )
+        logger.info(f"[Booking] Photo attached for {booking.name} ({booking.id_number}, {booking.ticket_ref})")
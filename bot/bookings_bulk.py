@@ -1,3 +1,4 @@
+import asyncio
 import io
 import os
 from telegram import Update
@@ -9,7 +10,7 @@ from db.init import get_db
 from db.models import Config
 from sheets.manager import ensure_event_tab
 
-ALLOWED_EXTENSIONS = {".csv", ".xls", ".xlsx"}
+ALLOWED_EXTENSIONS = {".csv", ".xlsx"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
 
 
@@ -17,19 +18,20 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
 @require_role("admin")
 async def newbookings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    Handle /newbookings command with attached CSV/XLS file.
-    Usage: /newbookings [EventName]
+    Handle /newbookings command with attached CSV/XLSX file.
+    Usage: /newbookings [EventName] [upsert]
     """
     try:
         message = update.message
         if not message or not message.document:
             await update.message.reply_text(
                 "📝 To bulk import bookings, please attach a CSV or Excel file.\n\n"
-                "Usage: /newbookings [EventName]\n"
+                "Usage: /newbookings [EventName] [upsert]\n"
                 "- Only admins can use this command.\n"
-                "- Attach a CSV/XLS file with the correct columns.\n"
+                "- Attach a CSV/XLSX file with the correct columns.\n"
                 "- Optionally specify the event name as an argument.\n"
-                "- The event name will default to the one set by /cpe if not provided."
+                "- The event name will default to the one set by /cpe if not provided.\n"
+                "- Rows already imported are skipped; add 'upsert' to overwrite changed details."
             )
             return
 
@@ -37,7 +39,8 @@ async def newbookings(update: Update, context: ContextTypes.DEFAULT_TYPE):
         filename = message.document.file_name or ""
         ext = os.path.splitext(filename)[1].lower()
         if ext not in ALLOWED_EXTENSIONS:
-            await message.reply_text("❌ Invalid file type. Please upload a CSV or Excel file.")
+            hint = " Legacy .xls isn't supported — save it as .xlsx." if ext == ".xls" else ""
+            await message.reply_text(f"❌ Invalid file type. Please upload a CSV or Excel (.xlsx) file.{hint}")
             return
 
         # Validate file size
@@ -53,8 +56,14 @@ async def newbookings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Event name (from command args or default)
         # Use event_name from args, else from /cpe (active_event), else default to 'Master'
-        if context.args:
-            event_name = context.args[0]
+        # A trailing "upsert" overwrites bookings whose details changed since the last import
+        args = list(context.args or [])
+        upsert = bool(args) and args[-1].lower() in ("upsert", "--upsert")
+        if upsert:
+            args.pop()
+
+        if args:
+            event_name = args[0]
         else:
             with get_db() as db:
                 active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
@@ -65,17 +74,18 @@ async def newbookings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         logger.info(f"[Bot] /newbookings triggered by {update.effective_user.id} for event '{event_name}'")
 
-        # Ensure event tab exists
-        ensure_event_tab(event_name)
-
         # Ensure event tab exists in Sheets before import
-        ensure_event_tab(event_name)
+        await asyncio.to_thread(ensure_event_tab, event_name)
 
-        # Run import pipeline
-        result = import_service.run_bulk_import(
-            file_bytes.getvalue(),
+        # Run import pipeline (streams the file chunk by chunk) off the event loop, so
+        # other chats keep being served while chunks are parsed and committed
+        result = await asyncio.to_thread(
+            import_service.run_bulk_import,
+            file_bytes,
             str(update.effective_user.id),
-            event_name=event_name
+            event_name=event_name,
+            filename=filename,
+            upsert=upsert,
         )
 
         # Format operator summary
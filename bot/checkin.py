@@ -1,16 +1,19 @@
 import io
-from datetime import datetime
+from sqlalchemy import insert, update as sa_update
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CallbackQueryHandler
 from config.logger import logger, log_and_raise
-from config.envs import DRY_RUN
-from db.init import get_db
-from db.models import Booking, BoardingSession, CheckinLog, Config, Boat
-from utils.supabase_storage import fetch_signed_file
-from utils.booking_schema import build_master_row, build_event_row
-from sheets.manager import update_booking
+from db.init import get_async_db
+from db.models import Booking, CheckinLog
+from db.seat_ledger import claim_seats, release_seats
+from db.lookups import find_bookings_by_id, find_bookings_by_phone
+from utils.async_storage import fetch_signed_file
+from utils.booking_schema import build_master_row
 from bot.utils.roles import require_role
 from utils.timezone import get_maldives_time
+from services.boarding_context import BoardingContext, get_boarding_context
+from services.sheets_outbox import enqueue_update
+from services.manifest_projection import record_boarding, remove_boarding
 
 
 # ===== Lookup and prompt =====
@@ -46,51 +49,44 @@ async def handle_checkin(update: Update, context: ContextTypes.DEFAULT_TYPE, met
             await update.message.reply_text(f"Usage: /{method} <value>")
             return
 
-        with get_db() as db:
-            # Active session
-            session = db.query(BoardingSession).filter(BoardingSession.is_active.is_(True)).first()
-            if not session:
-                await update.message.reply_text("⚠️ No active boat session. Use /boatready first.")
+        # Active session + event from the cached boarding context (no DB hit)
+        ctx = get_boarding_context()
+        if not ctx.has_session:
+            await update.message.reply_text("⚠️ No active boat session. Use /boatready first.")
+            return
+        if not ctx.has_event:
+            await update.message.reply_text("⛔ No active event set. Use /cpe first.")
+            return
+        event_name = ctx.event_name
+
+        # === DIFFERENT LOGIC FOR ID vs PHONE ===
+        if method == "id":
+            # Single booking lookup (existing logic)
+            async with get_async_db() as db:
+                matches = await db.run_sync(find_bookings_by_id, event_name, query, 1)
+            booking = matches[0] if matches else None
+
+            if not booking:
+                await update.message.reply_text(f"❌ No booking found for ID: {query}")
                 return
 
-            # Active event
-            active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
-            if not active_event_cfg or not active_event_cfg.value:
-                await update.message.reply_text("⛔ No active event set. Use /cpe first.")
+            await show_booking_selection(update, [booking], method, ctx=ctx)
+
+        else:  # method == "phone" - GROUP CHECK-IN
+            # Find all bookings with this phone number
+            async with get_async_db() as db:
+                bookings = await db.run_sync(find_bookings_by_phone, event_name, query)
+
+            if not bookings:
+                await update.message.reply_text(f"❌ No bookings found for phone: {query}")
                 return
-            event_name = active_event_cfg.value
-
-            # === DIFFERENT LOGIC FOR ID vs PHONE ===
-            if method == "id":
-                # Single booking lookup (existing logic)
-                booking = db.query(Booking).filter(
-                    Booking.event_id == event_name,
-                    Booking.id_number.ilike(f"%{query}%")
-                ).first()
-
-                if not booking:
-                    await update.message.reply_text(f"❌ No booking found for ID: {query}")
-                    return
-
-                await show_booking_selection(update, [booking], method)
-
-            else:  # method == "phone" - GROUP CHECK-IN
-                # Find all bookings with this phone number
-                bookings = db.query(Booking).filter(
-                    Booking.event_id == event_name,
-                    Booking.phone.ilike(f"%{query}%")
-                ).all()
-
-                if not bookings:
-                    await update.message.reply_text(f"❌ No bookings found for phone: {query}")
-                    return
-
-                # If only one booking, treat as single check-in
-                if len(bookings) == 1:
-                    await show_booking_selection(update, bookings, method)
-                else:
-                    # Multiple bookings - show group selection
-                    await show_group_selection(update, bookings, query)
+
+            # If only one booking, treat as single check-in
+            if len(bookings) == 1:
+                await show_booking_selection(update, bookings, method, ctx=ctx)
+            else:
+                # Multiple bookings - show group selection
+                await show_group_selection(update, bookings, query)
 
     except Exception as e:
         log_and_raise("Checkin", f"handling /{method}", e)
@@ -151,20 +147,19 @@ async def show_group_selection(update: Update, bookings: list, phone_number: str
         log_and_raise("Checkin", "showing group selection", e)
 
 
-async def show_booking_selection(update: Update, bookings: list, method: str):
+async def show_booking_selection(update: Update, bookings: list, method: str, ctx: BoardingContext = None):
     """Show check-in options for single or selected booking(s)."""
     try:
         # For single booking or individual selection from group
         booking = bookings[0]  # First booking in list
         
-        # Get active session to determine leg type
-        with get_db() as db:
-            session = db.query(BoardingSession).filter(BoardingSession.is_active.is_(True)).first()
-            if not session:
-                await update.message.reply_text("⚠️ No active boat session. Use /boatready first.")
-                return
+        # Active session determines leg type (reuse caller's snapshot when given)
+        ctx = ctx or get_boarding_context()
+        if not ctx.has_session:
+            await update.message.reply_text("⚠️ No active boat session. Use /boatready first.")
+            return
 
-            leg_type = session.leg_type
+        leg_type = ctx.leg_type
 
         # Check which leg is needed based on session leg_type
         if leg_type == "arrival":
@@ -214,7 +209,7 @@ async def show_booking_selection(update: Update, bookings: list, method: str):
         # Handle photo display (existing logic)
         if booking.id_doc_url:
             try:
-                photo_bytes = fetch_signed_file(booking.id_doc_url, expiry=60)
+                photo_bytes = await fetch_signed_file(booking.id_doc_url, expiry=60)
                 await update.message.reply_photo(
                     photo=io.BytesIO(photo_bytes),
                     caption=caption,
@@ -256,142 +251,108 @@ async def handle_group_selection(update: Update, context: ContextTypes.DEFAULT_T
 
 async def handle_individual_selection(update: Update, context: ContextTypes.DEFAULT_TYPE, booking_id: int):
     """Show check-in options for individually selected passenger."""
-    with get_db() as db:
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            await update.callback_query.edit_message_text("❌ Booking not found.")
-            return
+    async with get_async_db() as db:
+        booking = await db.get(Booking, booking_id)
+    if not booking:
+        await update.callback_query.edit_message_text("❌ Booking not found.")
+        return
 
     await show_booking_selection(update, [booking], "individual")
 
+def _group_checkin_tx(db, phone_number: str, session: BoardingContext, user_id: str):
+    """
+    Seat claim + bulk check-in for a phone group, in the caller's transaction
+    (runs on a sync Session via AsyncSession.run_sync). Returns (error_message, checked_in_count).
+    """
+    # Get all bookings for this phone number that need check-in (locked for the seat claim)
+    bookings = find_bookings_by_phone(db, session.event_name, phone_number, for_update=True)
+    if not bookings:
+        return "❌ No bookings found for this group.", 0
+
+    leg_type = session.leg_type
+
+    # ✅ Get IDs of bookings that need check-in for this leg
+    if leg_type == "arrival":
+        needs_checkin_ids = [b.id for b in bookings if not b.arrival_boat_boarded]
+    else:  # departure
+        needs_checkin_ids = [b.id for b in bookings if not b.departure_boat_boarded]
+
+    # Reserve all seats for the group in one conditional UPDATE (all or nothing)
+    claimed, occupied, capacity = claim_seats(db, session.boat_number, leg_type, len(needs_checkin_ids))
+    if not claimed:
+        return (
+            f"🚫 Boat {session.boat_number} doesn't have enough capacity for this group.\n"
+            f"Current: {occupied}/{capacity}\n"
+            f"Group needs: {len(needs_checkin_ids)} seats\n"
+            f"Please ask admin to /editseats or check in passengers individually."
+        ), 0
+
+    # ✅ One bulk UPDATE for the whole group (only the current leg, only if still empty)
+    now = get_maldives_time()
+    leg_column = Booking.arrival_boat_boarded if leg_type == "arrival" else Booking.departure_boat_boarded
+    checked_in_ids = db.execute(
+        sa_update(Booking)
+        .where(Booking.id.in_(needs_checkin_ids), leg_column.is_(None))
+        .values({leg_column.key: session.boat_number, "status": "checked_in", "checkin_time": now})
+        .returning(Booking.id)
+    ).scalars().all()
+    checked_in_count = len(checked_in_ids)
+
+    # Return any seats we reserved but didn't use
+    if checked_in_count < len(needs_checkin_ids):
+        release_seats(db, session.boat_number, leg_type, len(needs_checkin_ids) - checked_in_count)
+
+    # ✅ One multi-row insert for the check-in logs
+    if checked_in_ids:
+        db.execute(insert(CheckinLog), [
+            {
+                "booking_id": booking_id,
+                "boat_number": session.boat_number,
+                "confirmed_by": user_id,
+                "method": f"group-{leg_type}",
+            }
+            for booking_id in checked_in_ids
+        ])
+
+    # ✅ Append the group to the boat's manifest in boarding order
+    record_boarding(db, session.boat_number, leg_type, checked_in_ids, boarded_at=now)
+
+    # ✅ Queue the Sheets rows in the same transaction (the bulk UPDATE synchronized
+    # the in-session objects, no re-query needed)
+    checked_in_set = set(checked_in_ids)
+    for booking in bookings:
+        if booking.id in checked_in_set:
+            enqueue_update(db, booking.event_id, build_master_row(booking, booking.event_id))
+
+    return None, checked_in_count
+
+
 async def handle_group_checkin(update: Update, context: ContextTypes.DEFAULT_TYPE, phone_number: str, action: str):
     """Check in entire group or handle group actions."""
     try:
         query = update.callback_query
         user_id = str(query.from_user.id)
 
-        with get_db() as db:
-            # Get all bookings for this phone number that need check-in
-            bookings = db.query(Booking).filter(
-                Booking.phone.ilike(f"%{phone_number}%")
-            ).all()
-
-            print(f"[DEBUG] Found {len(bookings)} bookings for phone {phone_number}")
+        # Check capacity before proceeding
+        session = get_boarding_context()
+        if not session.has_session:
+            await query.edit_message_text("⚠️ No active boat session.")
+            return
 
-            if not bookings:
-                await query.edit_message_text("❌ No bookings found for this group.")
-                return
+        if session.capacity is None:
+            await query.edit_message_text("❌ Boat not found.")
+            return
 
-            # Check capacity before proceeding
-            session = db.query(BoardingSession).filter(BoardingSession.is_active.is_(True)).first()
-            if not session:
-                await query.edit_message_text("⚠️ No active boat session.")
-                return
+        leg_type = session.leg_type
 
-            boat = db.query(Boat).filter(Boat.boat_number == session.boat_number).first()
-            if not boat:
-                await query.edit_message_text("❌ Boat not found.")
-                return
+        async with get_async_db() as db:
+            error, checked_in_count = await db.run_sync(_group_checkin_tx, phone_number, session, user_id)
 
-            leg_type = session.leg_type
-            print(f"[DEBUG] Active leg: {leg_type}, Boat: {session.boat_number}")
-
-            # Count current passengers for this leg
-            if leg_type == "arrival":
-                current_passenger_count = db.query(Booking).filter(
-                    Booking.arrival_boat_boarded == session.boat_number
-                ).count()
-            else:  # departure
-                current_passenger_count = db.query(Booking).filter(
-                    Booking.departure_boat_boarded == session.boat_number
-                ).count()
-
-            print(f"[DEBUG] Current passengers: {current_passenger_count}/{boat.capacity}")
-
-            # ✅ Get IDs of bookings that need check-in for this leg
-            if leg_type == "arrival":
-                needs_checkin_ids = [b.id for b in bookings if not b.arrival_boat_boarded]
-            else:  # departure
-                needs_checkin_ids = [b.id for b in bookings if not b.departure_boat_boarded]
-            
-            print(f"[DEBUG] Group needs checkin: {len(needs_checkin_ids)} passengers")
-
-            if current_passenger_count + len(needs_checkin_ids) > boat.capacity:
-                await query.edit_message_text(
-                    f"🚫 Boat {session.boat_number} doesn't have enough capacity for this group.\n"
-                    f"Current: {current_passenger_count}/{boat.capacity}\n"
-                    f"Group needs: {len(needs_checkin_ids)} seats\n"
-                    f"Please ask admin to /editseats or check in passengers individually."
-                )
-                return
+        if error:
+            await query.edit_message_text(error)
+            return
 
-            # ✅ Process each booking individually (like individual check-in)
-            now = get_maldives_time()
-            checked_in_count = 0
-
-            for booking_id in needs_checkin_ids:
-                # Get fresh booking object within session (like individual check-in)
-                booking = db.query(Booking).filter(Booking.id == booking_id).first()
-                
-                print(f"[DEBUG] Processing booking {booking.id} - {booking.name}")
-                print(f"[DEBUG] Before: arrival_boat={booking.arrival_boat_boarded}, departure_boat={booking.departure_boat_boarded}, status={booking.status}")
-
-                # ✅ UPDATE ONLY THE CURRENT ACTIVE LEG (like individual check-in)
-                if leg_type == "arrival":
-                    # Only update arrival boat if not already checked in
-                    if not booking.arrival_boat_boarded:
-                        print(f"[DEBUG] Setting arrival boat for booking {booking.id}")
-                        booking.arrival_boat_boarded = session.boat_number
-                        legs_checked = ["arrival"]
-                elif leg_type == "departure":
-                    # Only update departure boat if not already checked in
-                    if not booking.departure_boat_boarded:
-                        print(f"[DEBUG] Setting departure boat for booking {booking.id}")
-                        booking.departure_boat_boarded = session.boat_number
-                        legs_checked = ["departure"]
-
-                # Update status to checked_in only if at least one leg is completed
-                if booking.arrival_boat_boarded or booking.departure_boat_boarded:
-                    print(f"[DEBUG] Setting status to checked_in for booking {booking.id}")
-                    booking.status = "checked_in"
-                    booking.checkin_time = now
-
-                # Log check-in for the specific leg only
-                if 'legs_checked' in locals():
-                    print(f"[DEBUG] Adding checkin log for booking {booking.id}")
-                    checkin_log = CheckinLog(
-                        booking_id=booking.id,
-                        boat_number=session.boat_number,
-                        confirmed_by=user_id,
-                        method=f"group-{'-'.join(legs_checked)}"
-                    )
-                    db.add(checkin_log)
-                    checked_in_count += 1
-
-            print(f"[DEBUG] About to commit {checked_in_count} bookings")
-            # ✅ COMMIT ALL DATABASE CHANGES FIRST (after all updates)
-            db.commit()
-            print(f"[DEBUG] Commit completed")
-
-            # ✅ UPDATE SHEETS INSIDE WITH BLOCK (like individual check-in)
-            for booking_id in needs_checkin_ids:
-                booking = db.query(Booking).filter(Booking.id == booking_id).first()
-                try:
-                    from sheets.manager import update_booking
-                    from utils.booking_schema import build_master_row, build_event_row
-
-                    # Update both Master and Event tabs
-                    master_row = build_master_row(booking, booking.event_id)
-                    event_row = build_event_row(master_row)
-                    update_booking(booking.event_id, master_row, event_row)
-                    print(f"[DEBUG] Updated sheet for booking {booking.id}")
-                except Exception as e:
-                    print(f"[DEBUG] Failed to update sheet for booking {booking.id}: {e}")
-                    logger.error(f"[Sheets] Failed to update sheet for booking {booking.id}: {e}")
-                    # ❌ DON'T ROLLBACK - just log the error and continue
-
-        print(f"[DEBUG] Database session closed, sending success message")
-        # Success message (outside with block)
+        # Success message (after commit)
         leg_emoji = "🛬" if leg_type == "arrival" else "🛫"
         await query.message.reply_text(
             f"✅ Group check-in completed!\n"
@@ -404,7 +365,6 @@ async def handle_group_checkin(update: Update, context: ContextTypes.DEFAULT_TYP
         logger.info(f"[Checkin] Group check-in for phone {phone_number}: {checked_in_count} passengers by {user_id}")
 
     except Exception as e:
-        print(f"[DEBUG] Exception occurred: {e}")
         log_and_raise("Checkin", "handling group check-in", e)
 
 async def handle_group_skip(update: Update, context: ContextTypes.DEFAULT_TYPE, phone_number: str):
@@ -413,12 +373,12 @@ async def handle_group_skip(update: Update, context: ContextTypes.DEFAULT_TYPE,
         query = update.callback_query
         user_id = str(query.from_user.id)
 
-        with get_db() as db:
-            bookings = db.query(Booking).filter(Booking.phone.ilike(f"%{phone_number}%")).all()
-            
-            # NO database changes for skip actions
-            # Just get the count and log for audit
-            logger.info(f"[Checkin] Skipped group for phone {phone_number}: {len(bookings)} passengers by {user_id}")
+        async with get_async_db() as db:
+            bookings = await db.run_sync(find_bookings_by_phone, get_boarding_context().event_name, phone_number)
+
+        # NO database changes for skip actions
+        # Just get the count and log for audit
+        logger.info(f"[Checkin] Skipped group for phone {phone_number}: {len(bookings)} passengers by {user_id}")
 
         await query.edit_message_text(
             f"⏭️ Skipped entire group for phone: {phone_number}\n"
@@ -429,36 +389,57 @@ async def handle_group_skip(update: Update, context: ContextTypes.DEFAULT_TYPE,
     except Exception as e:
         log_and_raise("Checkin", "skipping group", e)
 
-@require_role("checkin_staff")
-async def skip_checkin(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Skip individual passenger - no CheckinLog records created."""
-    try:
-        query = update.callback_query
-        await query.answer()
-
-        parts = query.data.split(":")
-        booking_id = int(parts[1])
-        user_id = str(query.from_user.id)
-
-        with get_db() as db:
-            booking = db.query(Booking).filter(Booking.id == booking_id).first()
-            if not booking:
-                await query.edit_message_text("❌ Booking not found.")
-                return
-
-            # NO CheckinLog records created for skip actions
-            # Just log the skip action for audit purposes
-            logger.info(f"[Checkin] Skipped booking {booking.id} ({booking.name}) by {user_id}")
-
-        await query.edit_message_text(
-            f"⏭️ Skipped {booking.name} ({booking.id_number}). Still available for check-in later."
-        )
-
-    except Exception as e:
-        log_and_raise("Checkin", "skipping passenger", e)
+# ===== Confirm boarding callback =====
+def _confirm_boarding_tx(db, booking_id: int, leg: str, session: BoardingContext, user_id: str):
+    """
+    Seat claim + single-leg check-in in the caller's transaction (runs on a sync
+    Session via AsyncSession.run_sync). Returns (error_message, booking).
+    """
+    # Row lock so two phones confirming the same passenger can't both claim a seat
+    booking = db.query(Booking).filter(Booking.id == booking_id).with_for_update().first()
+    if not booking:
+        return "❌ Booking not found.", None
+
+    already_boarded = booking.arrival_boat_boarded if leg == "arrival" else booking.departure_boat_boarded
+    if already_boarded:
+        return f"✅ {booking.name} is already checked in for {leg.upper()} on Boat {already_boarded}.", None
+
+    # === ATOMIC CAPACITY CHECK + SEAT CLAIM (seat ledger) ===
+    claimed, occupied, capacity = claim_seats(db, session.boat_number, leg, 1)
+    if not claimed:
+        return (
+            f"🚫 Boat {session.boat_number} is now full ({occupied}/{capacity}).\n"
+            f"Please ask admin to /editseats or start /boatready with the next available boat."
+        ), None
+
+    # === UPDATE ONLY THE SELECTED LEG ===
+    now = get_maldives_time()
+    if leg == "arrival":
+        booking.arrival_boat_boarded = session.boat_number
+    else:
+        booking.departure_boat_boarded = session.boat_number
+
+    # Update status to checked_in only if at least one leg is completed
+    if booking.arrival_boat_boarded or booking.departure_boat_boarded:
+        booking.status = "checked_in"
+        booking.checkin_time = now
+
+    # Log check-in for the specific leg only
+    db.add(CheckinLog(
+        booking_id=booking.id,
+        boat_number=session.boat_number,
+        confirmed_by=user_id,
+        method=f"{leg}-manual"
+    ))
+
+    # === MANIFEST PROJECTION (same transaction) ===
+    record_boarding(db, session.boat_number, leg, [booking.id], boarded_at=now)
+
+    # === SHEETS UPDATE (queued in the same transaction) ===
+    enqueue_update(db, booking.event_id, build_master_row(booking, booking.event_id))
+    return None, booking
 
 
-# ===== Confirm boarding callback =====
 @require_role("checkin_staff")
 async def confirm_boarding(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
@@ -470,129 +451,31 @@ async def confirm_boarding(update: Update, context: ContextTypes.DEFAULT_TYPE):
         booking_id = int(parts[2])
         user_id = str(query.from_user.id)
 
-        with get_db() as db:
-            booking = db.query(Booking).filter(Booking.id == booking_id).first()
-            if not booking:
-                await query.edit_message_text("❌ Booking not found.")
-                return
-
-            session = db.query(BoardingSession).filter(BoardingSession.is_active.is_(True)).first()
-            if not session:
-                await query.edit_message_text("⚠️ No active boat session.")
-                return
-
-            # Verify leg matches session leg_type
-            if leg != session.leg_type:
-                await query.edit_message_text(
-                    f"❌ Current session is for {session.leg_type.upper()} boarding.\n"
-                    f"Cannot check in for {leg.upper()} boarding.\n"
-                    f"Please start a new session with /boatready for {leg} boarding."
-                )
-                return
+        session = get_boarding_context()
+        if not session.has_session:
+            await query.edit_message_text("⚠️ No active boat session.")
+            return
 
-            # Verify leg matches session leg_type
-            if leg != session.leg_type:
-                await query.edit_message_text(
-                    f"❌ Current session is for {session.leg_type.upper()} boarding.\n"
-                    f"Cannot check in for {leg.upper()} boarding.\n"
-                    f"Please start a new session with /boatready for {leg} boarding."
-                )
-                return
+        # Verify leg matches session leg_type
+        if leg != session.leg_type:
+            await query.edit_message_text(
+                f"❌ Current session is for {session.leg_type.upper()} boarding.\n"
+                f"Cannot check in for {leg.upper()} boarding.\n"
+                f"Please start a new session with /boatready for {leg} boarding."
+            )
+            return
 
-            # === FIXED CAPACITY CHECK ===
-            if leg == "arrival":
-                # Count bookings with arrival on THIS boat (regardless of status)
-                current_passenger_count = db.query(Booking).filter(
-                    Booking.arrival_boat_boarded == session.boat_number
-                ).count()
-            else:  # departure
-                # Count bookings with departure on THIS boat (regardless of status)
-                current_passenger_count = db.query(Booking).filter(
-                    Booking.departure_boat_boarded == session.boat_number
-                ).count()
-
-            boat = db.query(Boat).filter(Boat.boat_number == session.boat_number).first()
-            if not boat:
-                await query.edit_message_text("❌ Boat not found in inventory.")
-                return
+        if session.capacity is None:
+            await query.edit_message_text("❌ Boat not found in inventory.")
+            return
 
-            if current_passenger_count >= boat.capacity:
-                await query.edit_message_text(
-                    f"🚫 Boat {session.boat_number} is now full ({current_passenger_count}/{boat.capacity}).\n"
-                    f"Please ask admin to /editseats or start /boatready with the next available boat."
-                )
-                return
+        async with get_async_db() as db:
+            error, booking = await db.run_sync(_confirm_boarding_tx, booking_id, leg, session, user_id)
 
-            # === UPDATE ONLY THE SELECTED LEG ===
-            now = get_maldives_time()
-            
-            if leg == "arrival":
-                # Only update arrival boat
-                booking.arrival_boat_boarded = session.boat_number
-                leg_text = "Arrival"
-            elif leg == "departure":
-                # Only update departure boat  
-                booking.departure_boat_boarded = session.boat_number
-                leg_text = "Departure"
-
-            # Update status to checked_in only if at least one leg is completed
-            if booking.arrival_boat_boarded or booking.departure_boat_boarded:
-                booking.status = "checked_in"
-                booking.checkin_time = now
-
-            # Log check-in for the specific leg only
-            checkin_log = CheckinLog(
-                booking_id=booking.id,
-                boat_number=session.boat_number,
-                confirmed_by=user_id,
-                method=f"{leg}-manual"
-            )
-            db.add(checkin_log)
-            db.commit()
-            db.refresh(booking)
-
-            # === SHEETS UPDATE ===
-            event_name = booking.event_id
-            booking_dict = {
-                "ticket_ref": booking.ticket_ref,
-                "name": booking.name,
-                "id_number": booking.id_number,
-                "phone": booking.phone,
-                "male_dep": booking.male_dep,
-                "resort_dep": booking.resort_dep,
-                "arrival_time": booking.arrival_time,
-                "departure_time": booking.departure_time,
-                "paid_amount": booking.paid_amount,
-                "transfer_ref": booking.transfer_ref,
-                "ticket_type": booking.ticket_type,
-                "status": booking.status,
-                "id_doc_url": booking.id_doc_url,
-                "group_id": booking.group_id,
-                "created_at": booking.created_at,
-                "ArrivalBoatBoarded": booking.arrival_boat_boarded,
-                "DepartureBoatBoarded": booking.departure_boat_boarded,
-                "checkin_time": booking.checkin_time,
-            }
-            master_row = build_master_row(booking_dict, event_name)
-            event_row = build_event_row(master_row)
-
-            def serialize_datetimes(row):
-                """Convert all datetime values in a dict or list to ISO strings."""
-                if isinstance(row, dict):
-                    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in row.items()}
-                elif isinstance(row, list):
-                    return [(v.isoformat() if isinstance(v, datetime) else v) for v in row]
-                return row
-
-            master_row = serialize_datetimes(master_row)
-            event_row = serialize_datetimes(event_row)
-
-        # Push update to Sheets
-        if not DRY_RUN:
-            try:
-                update_booking(event_name, master_row, event_row)
-            except Exception as e:
-                logger.error(f"[Sheets] Failed to update booking {booking.id} in Sheets: {e}")
+        if error:
+            await query.edit_message_text(error)
+            return
+        leg_text = "Arrival" if leg == "arrival" else "Departure"
 
         # Show updated status
         arrival_status = f"✅ Boat {booking.arrival_boat_boarded}" if booking.arrival_boat_boarded else "❌ Not checked in"
@@ -629,15 +512,15 @@ async def skip_checkin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         booking_id = int(parts[1])
         user_id = str(query.from_user.id)
 
-        with get_db() as db:
-            booking = db.query(Booking).filter(Booking.id == booking_id).first()
-            if not booking:
-                await query.edit_message_text("❌ Booking not found.")
-                return
+        async with get_async_db() as db:
+            booking = await db.get(Booking, booking_id)
+        if not booking:
+            await query.edit_message_text("❌ Booking not found.")
+            return
 
-            # NO database changes for skip actions
-            # Just log for audit
-            logger.info(f"[Checkin] Skipped booking {booking.id} ({booking.name}) by {user_id}")
+        # NO database changes for skip actions
+        # Just log for audit
+        logger.info(f"[Checkin] Skipped booking {booking.id} ({booking.name}) by {user_id}")
 
         await query.edit_message_text(
             f"⏭️ Skipped {booking.name} ({booking.id_number}). Still available for check-in later."
@@ -647,6 +530,44 @@ async def skip_checkin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         log_and_raise("Checkin", "skipping passenger", e)
 
 # ===== Reset Booking Command =====
+def _reset_booking_tx(db, identifier: str, user_id: str):
+    """Clear both legs, return the seats and log the reset. Returns (booking, old_arrival, old_departure, old_status)."""
+    # Try ticket_ref first, then id_number
+    booking = db.query(Booking).filter(Booking.ticket_ref == identifier).first()
+    if not booking:
+        booking = db.query(Booking).filter(Booking.id_number == identifier).first()
+    if not booking:
+        return None, None, None, None
+
+    # Store old values for logging
+    old_arrival = booking.arrival_boat_boarded
+    old_departure = booking.departure_boat_boarded
+    old_status = booking.status
+
+    # Give the seats back to the ledger
+    if old_arrival:
+        release_seats(db, old_arrival, "arrival")
+    if old_departure:
+        release_seats(db, old_departure, "departure")
+
+    remove_boarding(db, booking.id)
+
+    # Reset check-in data
+    booking.arrival_boat_boarded = None
+    booking.departure_boat_boarded = None
+    booking.status = "booked"
+    booking.checkin_time = None
+
+    # Log the reset action
+    db.add(CheckinLog(
+        booking_id=booking.id,
+        boat_number=None,
+        confirmed_by=user_id,
+        method="admin-reset"
+    ))
+    return booking, old_arrival, old_departure, old_status
+
+
 @require_role("admin")
 async def reset_booking(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reset a booking's check-in status (admin only)."""
@@ -661,36 +582,12 @@ async def reset_booking(update: Update, context: ContextTypes.DEFAULT_TYPE):
         identifier = context.args[0].strip()
         user_id = str(update.effective_user.id)
 
-        with get_db() as db:
-            # Try ticket_ref first, then id_number
-            booking = db.query(Booking).filter(Booking.ticket_ref == identifier).first()
-            if not booking:
-                booking = db.query(Booking).filter(Booking.id_number == identifier).first()
-            
-            if not booking:
-                await update.message.reply_text(f"❌ No booking found for: {identifier}")
-                return
+        async with get_async_db() as db:
+            booking, old_arrival, old_departure, old_status = await db.run_sync(_reset_booking_tx, identifier, user_id)
 
-            # Store old values for logging
-            old_arrival = booking.arrival_boat_boarded
-            old_departure = booking.departure_boat_boarded
-            old_status = booking.status
-
-            # Reset check-in data
-            booking.arrival_boat_boarded = None
-            booking.departure_boat_boarded = None
-            booking.status = "booked"
-            booking.checkin_time = None
-
-            # Log the reset action
-            reset_log = CheckinLog(
-                booking_id=booking.id,
-                boat_number=None,
-                confirmed_by=user_id,
-                method="admin-reset"
-            )
-            db.add(reset_log)
-            db.commit()
+        if not booking:
+            await update.message.reply_text(f"❌ No booking found for: {identifier}")
+            return
 
         await update.message.reply_text(
             f"🔄 Booking reset for: {booking.name}\n"
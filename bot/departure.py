@@ -1,3 +1,4 @@
+import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from config.logger import logger, log_and_raise
@@ -6,11 +7,12 @@ from db.init import get_db
 from db.models import Boat, BoardingSession, Booking, Config
 from datetime import datetime
 from utils.timezone import get_maldives_time, format_maldives_time
-from utils.pdf_generator import generate_manifest_pdf
-from utils.idcards import generate_idcards_pdf
-from utils.supabase_storage import upload_manifest, upload_idcard
+from utils.async_storage import upload_manifest, upload_idcard
+from services.render_pool import render_departure_pdfs
+from utils.pdf_cache import uploaded_key, mark_uploaded
 from sqlalchemy.exc import OperationalError
 from bot.utils.roles import require_role
+from services.boarding_context import invalidate_boarding_context
 
 # ===== /departed Command =====
 @require_role("admin")
@@ -108,32 +110,57 @@ async def departed(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             db.commit()
 
-        # Generate and upload PDFs
-        manifest_pdf = generate_manifest_pdf(str(boat_number), event_name=event_name)
-        idcards_pdf = generate_idcards_pdf(str(boat_number), event_name=event_name)
+        invalidate_boarding_context(f"boat {boat_number} departed")
+
+        # Reply right away; PDFs render in the background and the message is edited when done
+        summary = f"🛥️ Boat {boat_number} departed at {departure_display}.\n\n{manifest_text}"
+        status_message = await update.message.reply_text(f"{summary}\n\n⏳ Rendering manifest and ID cards…")
+        logger.info(f"[Departure] Boat {boat_number} marked as departed at {departure_display}")
+
+        context.application.create_task(
+            _finish_departure(status_message, summary, boat_number, event_name),
+            update=update,
+        )
+
+    except Exception as e:
+        log_and_raise("Departure", "running /departed", e)
+
+
+async def _finish_departure(status_message, summary: str, boat_number: int, event_name: str):
+    """Render and upload the departure PDFs, then edit the status message with the result."""
+    try:
+        manifest, idcards = await render_departure_pdfs(boat_number, event_name)
 
         if not DRY_RUN:
-            manifest_path = upload_manifest(manifest_pdf, event_name=event_name, boat_number=str(boat_number))
-            if idcards_pdf:
-                idcards_path = upload_idcard(idcards_pdf, event_name=event_name, ticket_ref=f"boat_{boat_number}")
-                logger.info(f"[Departure] Uploaded manifest to {manifest_path} and ID cards to {idcards_path}")
-            else:
-                logger.warning(f"[Departure] No ID cards PDF generated for Boat {boat_number}")
-                idcards_path = None
+            # Content-addressed: skip the upload when Storage already has this exact version
+            for kind, doc, upload, kwargs in (
+                ("manifest", manifest, upload_manifest, {"boat_number": str(boat_number)}),
+                ("idcards", idcards, upload_idcard, {"ticket_ref": f"boat_{boat_number}"}),
+            ):
+                if not doc:
+                    logger.warning(f"[Departure] No {kind} PDF generated for Boat {boat_number}")
+                    continue
+                if uploaded_key(kind, event_name, boat_number) == doc.key:
+                    logger.info(f"[Departure] {kind} for Boat {boat_number} unchanged, upload skipped")
+                    continue
+                path = await upload(doc.pdf, event_name=event_name, **kwargs)
+                await asyncio.to_thread(mark_uploaded, kind, event_name, boat_number, doc.key)
+                logger.info(f"[Departure] Uploaded {kind} to {path}")
 
         # Reply with summary + export buttons
-        buttons = [
-            [InlineKeyboardButton("📄 Export Manifest (PDF)", callback_data=f"exportpdf:{boat_number}")],
-            [InlineKeyboardButton("🪪 Export ID Cards (PDF)", callback_data=f"exportidcards:{boat_number}")]
-        ]
-        reply_markup = InlineKeyboardMarkup(buttons)
-
-        await update.message.reply_text(
-            f"🛥️ Boat {boat_number} departed at {departure_display}.\n\n"
-            f"{manifest_text}",
-            reply_markup=reply_markup
+        buttons = []
+        if manifest:
+            buttons.append([InlineKeyboardButton("📄 Export Manifest (PDF)", callback_data=f"exportpdf:{boat_number}")])
+        if idcards:
+            buttons.append([InlineKeyboardButton("🪪 Export ID Cards (PDF)", callback_data=f"exportidcards:{boat_number}")])
+        failed = [name for name, doc in (("manifest", manifest), ("ID cards", idcards)) if not doc]
+        note = f"\n\n⚠️ Could not generate: {', '.join(failed)}." if failed else ""
+
+        await status_message.edit_text(
+            f"{summary}{note}",
+            reply_markup=InlineKeyboardMarkup(buttons) if buttons else None
         )
-        logger.info(f"[Departure] Boat {boat_number} marked as departed at {departure_display}")
 
     except Exception as e:
-        log_and_raise("Departure", "running /departed", e)
\ No newline at end of file
+        logger.error(f"[Departure] Failed to export PDFs for Boat {boat_number}: {e}", exc_info=True)
+        await status_message.edit_text(f"{summary}\n\n❌ PDF export failed. Please contact an admin.")
@@ -0,0 +1,180 @@
+import asyncio
+import concurrent.futures
+import time
+from collections import deque
+from config.logger import logger
+from config.envs import WEBHOOK_WORKERS, WEBHOOK_QUEUE_MAX
+
+# ===== Update dispatcher =====
+# Sits between the webhook and application.process_update(). Updates are keyed by
+# effective_chat.id: each chat has its own FIFO drained by one task, so a chat's
+# multi-step flows (photo after /attachphoto, group selection callbacks) see their
+# updates strictly in order, while different staff phones run concurrently up to
+# WEBHOOK_WORKERS at a time. A busy chat never parks a worker: only chats with a
+# runnable update compete for a slot. Past WEBHOOK_QUEUE_MAX pending updates the
+# webhook answers 503 and Telegram redelivers later.
+
+_SAMPLES = 500
+_TOP_KEYS = 20
+
+
+class KeyedDispatcher:
+    """Per-key ordered, cross-key concurrent runner for Telegram updates."""
+
+    def __init__(self, application, max_concurrent: int, max_pending: int):
+        self.application = application
+        self.loop = asyncio.get_running_loop()
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self._queues = {}   # key -> deque[(update, queued_at)]
+        self._drainers = {}  # key -> Task draining that key's queue
+        self._pending = 0
+        self._busy = 0
+        self.counts = {"received": 0, "processed": 0, "failed": 0, "rejected": 0, "max_pending": 0}
+        self._wait_ms = deque(maxlen=_SAMPLES)
+        self._handle_ms = deque(maxlen=_SAMPLES)
+
+    @staticmethod
+    def key_for(update):
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return f"update:{update.update_id}"  # no chat (e.g. poll updates): no ordering constraint
+
+    def submit(self, update) -> bool:
+        """Queue an update behind earlier ones from the same chat. False when full."""
+        if self._pending >= self.max_pending:
+            self.counts["rejected"] += 1
+            logger.warning(f"[Dispatcher] {self._pending} updates pending, rejecting update {update.update_id}")
+            return False
+        key = self.key_for(update)
+        self._queues.setdefault(key, deque()).append((update, time.perf_counter()))
+        self._pending += 1
+        self.counts["received"] += 1
+        self.counts["max_pending"] = max(self.counts["max_pending"], self._pending)
+        if key not in self._drainers:
+            self._drainers[key] = asyncio.get_running_loop().create_task(self._drain(key))
+        return True
+
+    async def _drain(self, key):
+        queue = self._queues[key]
+        try:
+            while queue:
+                update, queued_at = queue[0]
+                async with self._slots:
+                    self._wait_ms.append((time.perf_counter() - queued_at) * 1000)
+                    await self._run(update)
+                queue.popleft()
+                self._pending -= 1
+        finally:
+            # Nothing awaits between the last popleft and here, so no update can be stranded
+            self._drainers.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+
+    async def _run(self, update):
+        self._busy += 1
+        started = time.perf_counter()
+        try:
+            await self.application.process_update(update)
+            self.counts["processed"] += 1
+        except Exception as e:
+            self.counts["failed"] += 1
+            logger.error(f"[Dispatcher] Update {update.update_id} failed: {e}", exc_info=True)
+        finally:
+            self._busy -= 1
+            self._handle_ms.append((time.perf_counter() - started) * 1000)
+
+    async def stop(self, drain_timeout: float = 10):
+        """Let pending updates finish (up to drain_timeout seconds), then cancel the rest."""
+        tasks = list(self._drainers.values())
+        if tasks:
+            done, running = await asyncio.wait(tasks, timeout=drain_timeout)
+            if running:
+                logger.warning(f"[Dispatcher] {self._pending} pending updates dropped at shutdown.")
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def queue_lengths(self, top: int = _TOP_KEYS) -> dict:
+        """Pending updates per chat, longest queues first."""
+        longest = sorted(self._queues.items(), key=lambda kv: len(kv[1]), reverse=True)[:top]
+        return {str(key): len(queue) for key, queue in longest}
+
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "pending": self._pending,
+            "limit": self.max_pending,
+            "concurrency": self.max_concurrent,
+            "busy": self._busy,
+            "active_chats": len(self._drainers),
+            "per_chat": self.queue_lengths(),
+            "queue_wait": _summary(self._wait_ms),
+            "handling": _summary(self._handle_ms),
+        }
+
+
+def _summary(samples) -> dict:
+    samples = sorted(samples)
+    if not samples:
+        return {"avg_ms": None, "p95_ms": None}
+    return {
+        "avg_ms": round(sum(samples) / len(samples), 1),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+    }
+
+
+# ===== Module-level instance (one Application per process) =====
+_dispatcher = None
+
+
+def start_dispatcher(application) -> KeyedDispatcher:
+    """Attach a dispatcher to the initialized Application (called from init_bot)."""
+    global _dispatcher
+    _dispatcher = KeyedDispatcher(application, WEBHOOK_WORKERS, WEBHOOK_QUEUE_MAX)
+    logger.info(f"[Dispatcher] Per-chat dispatcher ready ({WEBHOOK_WORKERS} concurrent, limit {WEBHOOK_QUEUE_MAX}).")
+    return _dispatcher
+
+
+async def stop_dispatcher():
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
+        logger.info("[Dispatcher] Stopped.")
+
+
+def submit_update(update) -> bool:
+    """Hand a webhook update to the dispatcher. False when full or not started."""
+    return _dispatcher.submit(update) if _dispatcher is not None else False
+
+
+def dispatcher_stats(timeout: float = 5) -> dict:
+    """
+    Dispatcher stats, safe to call from any thread. The queues are only mutated on
+    the event loop, so callers elsewhere (e.g. the sync /metrics route running in
+    FastAPI's threadpool) get a snapshot taken on the loop.
+    """
+    dispatcher = _dispatcher
+    if dispatcher is None:
+        return {}
+    try:
+        on_loop = asyncio.get_running_loop() is dispatcher.loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        return dispatcher.stats()
+
+    snapshot = concurrent.futures.Future()
+
+    def _take():
+        try:
+            snapshot.set_result(dispatcher.stats())
+        except Exception as e:
+            snapshot.set_exception(e)
+
+    dispatcher.loop.call_soon_threadsafe(_take)
+    return snapshot.result(timeout=timeout)
@@ -3,8 +3,8 @@ from telegram.ext import ContextTypes
 from config.logger import logger, log_and_raise
 from db.init import get_db
 from db.models import Booking, BookingEditLog
-from sheets.manager import update_booking_row
-from utils.booking_schema import build_master_row, build_event_row
+from utils.booking_schema import build_master_row
+from services.sheets_outbox import enqueue_update
 from bot.utils.roles import require_role
 
 
@@ -121,9 +121,6 @@ async def editbooking(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("ℹ️ No changes applied.")
                 return
 
-            db.commit()
-            db.refresh(booking)
-
             # Audit log
             for field, old_val, new_val in changes:
                 log_entry = BookingEditLog(
@@ -134,29 +131,10 @@ async def editbooking(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     edited_by=str(update.effective_user.id),
                 )
                 db.add(log_entry)
-            db.commit()
 
-            # Sheets sync
-            booking_dict = {
-                "ticket_ref": booking.ticket_ref,
-                "name": booking.name,
-                "id_number": booking.id_number,
-                "phone": booking.phone,
-                "male_dep": booking.male_dep,
-                "resort_dep": booking.resort_dep,
-                "arrival_time": booking.arrival_time,
-                "departure_time": booking.departure_time,
-                "paid_amount": booking.paid_amount,
-                "transfer_ref": booking.transfer_ref,
-                "ticket_type": booking.ticket_type,
-                "status": booking.status,
-                "id_doc_url": booking.id_doc_url,
-                "group_id": booking.group_id,
-                "created_at": booking.created_at,
-            }
-            master_row = build_master_row(booking_dict, booking.event_name)
-            event_row = build_event_row(master_row)
-            update_booking_row(booking.event_name, master_row, event_row)
+            # Sheets sync (queued with the edit, flushed by the outbox worker)
+            enqueue_update(db, booking.event_id, build_master_row(booking, booking.event_id))
+            db.commit()
 
         # Feedback
         msg = [f"✅ Booking {ticket_ref} updated:"]
@@ -14,16 +14,19 @@ from telegram.ext import (
 )
 from config.logger import logger, log_and_raise
 from config.envs import TELEGRAM_TOKEN, PUBLIC_URL
-from bot.admin import cpe, boatready, boatready_callback, checkinmode, editseats, register, unregister
+from bot.admin import cpe, boatready, boatready_callback, checkinmode, editseats, manifest, register, unregister, resyncsheets
 from bot.bookings import newbooking, attach_photo_callback, handle_booking_photo
 from bot.checkin import checkin_by_id, checkin_by_phone, register_checkin_handlers, reset_booking
 from bot.stats import stats_command
 from bot.editbooking import editbooking
 from bot.departure import departed
 from bot import bookings_bulk
-from utils.supabase_storage import fetch_signed_file
+from utils.async_storage import fetch_signed_file
+from services.render_pool import render_manifest, render_idcards
 from db.init import get_db
-from db.models import User, Config
+from db.models import Config
+from bot.utils.roles import get_user_role
+from bot.dispatcher import start_dispatcher
 
 # Global application instance so FastAPI route can access it
 application = None
@@ -33,9 +36,7 @@ bot_ready = False  # ✅ Used by /health endpoint
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user_id = str(update.effective_user.id)
-        with get_db() as db:
-            user = db.query(User).filter(User.chat_id == user_id).first()
-            role = user.role if user else "viewer"
+        role = get_user_role(user_id) or "viewer"
 
         logger.info(f"[Bot] /start used by {user_id} ({role})")
 
@@ -48,14 +49,16 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "• /checkinmode — Enable check-in mode\n"
                 "• /editseats — Adjust boat capacity\n"
                 "• /departed — Mark boat departed\n"
+                "• /manifest — Live manifest for a boat\n"
                 "• /newbooking — Add a single booking\n"
                 "• /editbooking — Search and edit bookings\n"
-                "• /newbookings [EventName] — Bulk import bookings\n"
+                "• /newbookings [EventName] [upsert] — Bulk import bookings\n"
                 "• /attachphoto — Attach an ID photo\n"
                 "• /i — Check-in by ID\n"
                 "• /p — Check-in by phone\n"
                 "• /sleeptime — Gracefully shut down the bot\n"
                 "• /stats — Show event statistics\n"
+                "• /resyncsheets — Re-check sheet headers after manual edits\n"
                 "• /start — Show this help menu"
             )
         elif role in ["checkin_staff", "booking_staff"]:
@@ -64,10 +67,11 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "Here are your available commands:\n"
                 "• /newbooking — Add a single booking\n"
                 "• /editbooking — Search and edit bookings\n"
-                "• /newbookings [EventName] — Bulk import bookings\n"
+                "• /newbookings [EventName] [upsert] — Bulk import bookings\n"
                 "• /attachphoto — Attach an ID photo\n"
                 "• /i — Check-in by ID\n"
                 "• /p — Check-in by phone\n"
+                "• /manifest — Live manifest for a boat\n"
                 "• /start — Show this help menu"
             )
         else:
@@ -93,8 +97,8 @@ async def export_pdf_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
             active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
             event_name = active_event_cfg.value if active_event_cfg else "General"
 
-        path = f"manifests/{event_name}/boat_{boat_number}.pdf"
-        pdf_bytes = fetch_signed_file(path)
+        # Built from the manifest projection: served from the local PDF cache when unchanged
+        pdf_bytes = (await render_manifest(int(boat_number), event_name)).pdf
 
         pdf_stream = BytesIO(pdf_bytes)
         pdf_stream.name = f"Boat_{boat_number}_Manifest.pdf"
@@ -118,8 +122,16 @@ async def export_idcards_callback(update: Update, context: ContextTypes.DEFAULT_
             active_event_cfg = db.query(Config).filter(Config.key == "active_event").first()
             event_name = active_event_cfg.value if active_event_cfg else "General"
 
-        path = f"ids/{event_name}/idcards/boat_{boat_number}.pdf"
-        pdf_bytes = fetch_signed_file(path)
+        # Current passenger set: local PDF cache hit, or re-rendered off the event loop
+        try:
+            pdf_bytes = (await render_idcards(int(boat_number), event_name)).pdf
+        except Exception as e:
+            logger.warning(f"[Callback] ID cards render failed for Boat {boat_number}: {e}")
+            pdf_bytes = None
+        if not pdf_bytes:
+            # Last resort: the copy uploaded at /departed (may predate later changes)
+            path = f"ids/{event_name}/idcards/boat_{boat_number}.pdf"
+            pdf_bytes = await fetch_signed_file(path)
 
         pdf_stream = BytesIO(pdf_bytes)
         pdf_stream.name = f"Boat_{boat_number}_IDCards.pdf"
@@ -136,9 +148,7 @@ async def export_idcards_callback(update: Update, context: ContextTypes.DEFAULT_
 async def sleeptime(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user_id = str(update.effective_user.id)
-        with get_db() as db:
-            user = db.query(User).filter(User.chat_id == user_id).first()
-            role = user.role if user else "viewer"
+        role = get_user_role(user_id) or "viewer"
 
         if role != "admin":
             await update.message.reply_text("❌ Only admins can put the bot to sleep.")
@@ -179,12 +189,14 @@ async def init_bot():
         app.add_handler(CommandHandler("i", checkin_by_id))
         app.add_handler(CommandHandler("p", checkin_by_phone))
         app.add_handler(CommandHandler("departed", departed))
+        app.add_handler(CommandHandler("manifest", manifest))
         app.add_handler(CommandHandler("register", register))
         app.add_handler(CommandHandler("unregister", unregister))
         app.add_handler(CommandHandler("editbooking", editbooking))
         app.add_handler(CommandHandler("sleeptime", sleeptime))
         app.add_handler(CommandHandler("resetbooking", reset_booking))
         app.add_handler(CommandHandler("stats", stats_command))
+        app.add_handler(CommandHandler("resyncsheets", resyncsheets))
 
         bookings_bulk.register_handlers(app)
         register_checkin_handlers(app)
@@ -205,6 +217,9 @@ async def init_bot():
         await app.start()
         print("[DEBUG] app.start() complete for webhook mode.")
 
+        # Webhook updates run per-chat ordered, cross-chat concurrent
+        start_dispatcher(app)
+
         application = app
         bot_ready = True
 
@@ -1,13 +1,28 @@
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 from config.logger import logger
+from config.envs import ROLE_CACHE_TTL, ROLE_CACHE_MAX_SIZE
 from db.init import get_db
 from db.models import User
 
 # Role hierarchy: higher index = more privileges
 ROLE_ORDER = ["viewer", "checkin_staff", "booking_staff", "admin"]
 
+# ===== Role cache =====
+# chat_id -> (role or None, expires_at). Unregistered users are cached as None so
+# repeated taps from strangers don't hit the DB either.
+_role_cache = OrderedDict()
+_role_cache_lock = threading.Lock()
+_role_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+# Bumped by every invalidation; a DB load only fills the cache if none happened
+# meanwhile, so /unregister can't be undone by a lookup already in flight
+_role_cache_generation = 0
+
+
 def has_role(user_role: str, required_role: str) -> bool:
     """Check if user_role >= required_role in hierarchy."""
     try:
@@ -15,6 +30,59 @@ def has_role(user_role: str, required_role: str) -> bool:
     except ValueError:
         return False
 
+
+def get_user_role(chat_id: str):
+    """Resolve a user's role (None if not registered), served from the TTL cache when possible."""
+    chat_id = str(chat_id)
+    now = time.monotonic()
+
+    with _role_cache_lock:
+        entry = _role_cache.get(chat_id)
+        if entry and entry[1] > now:
+            _role_cache.move_to_end(chat_id)
+            _role_cache_stats["hits"] += 1
+            return entry[0]
+        _role_cache_stats["misses"] += 1
+        generation = _role_cache_generation
+
+    with get_db() as db:
+        user = db.query(User).filter(User.chat_id == chat_id).first()
+        role = user.role if user else None
+
+    with _role_cache_lock:
+        if _role_cache_generation != generation:
+            return role  # invalidated while loading: serve the answer, don't cache it
+        _role_cache[chat_id] = (role, now + ROLE_CACHE_TTL)
+        _role_cache.move_to_end(chat_id)
+        while len(_role_cache) > ROLE_CACHE_MAX_SIZE:
+            _role_cache.popitem(last=False)
+            _role_cache_stats["evictions"] += 1
+    return role
+
+
+def invalidate_role_cache(chat_id: str = None):
+    """Drop one user's cached role (or the whole cache). Call after changing users."""
+    global _role_cache_generation
+    with _role_cache_lock:
+        _role_cache_generation += 1
+        if chat_id is None:
+            _role_cache.clear()
+        else:
+            _role_cache.pop(str(chat_id), None)
+        _role_cache_stats["invalidations"] += 1
+
+
+def role_cache_stats() -> dict:
+    """Return hit/miss counters and current size of the role cache."""
+    with _role_cache_lock:
+        lookups = _role_cache_stats["hits"] + _role_cache_stats["misses"]
+        return {
+            **_role_cache_stats,
+            "size": len(_role_cache),
+            "hit_ratio": round(_role_cache_stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
 def require_role(required_role: str):
     """Decorator to enforce role checks on bot commands."""
     def decorator(func):
@@ -22,20 +90,19 @@ def require_role(required_role: str):
         async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
             user_id = str(update.effective_user.id)
 
-            # Look up user in DB
-            with get_db() as db:
-                user = db.query(User).filter(User.chat_id == user_id).first()
+            # Look up user role (cached)
+            role = get_user_role(user_id)
 
-            if not user:
+            if not role:
                 await update.message.reply_text("⛔ You are not registered in the system.")
                 logger.warning(f"[Auth] Unauthorized attempt by {user_id} (not in DB)")
                 return
 
-            if not has_role(user.role, required_role):
+            if not has_role(role, required_role):
                 await update.message.reply_text("⛔ You are not authorized to run this command.")
-                logger.warning(f"[Auth] Unauthorized attempt by {user_id} (role={user.role}, required={required_role})")
+                logger.warning(f"[Auth] Unauthorized attempt by {user_id} (role={role}, required={required_role})")
                 return
 
             return await func(update, context, *args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
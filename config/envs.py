@@ -13,41 +13,98 @@ def get_int_env(key: str, default: int = 0) -> int:
     except (TypeError, ValueError):
         return default
 
+_MISSING_REQUIRED = []
+
+def get_required_env(key: str):
+    """
+    Read a required variable. A missing one is recorded rather than raised, so
+    importing config (scripts, render workers, tests) never needs credentials;
+    validate_envs() fails startup instead.
+    """
+    value = os.getenv(key)
+    if not value:
+        _MISSING_REQUIRED.append(key)
+    return value
+
+def validate_envs():
+    """Raise (and alert) if any required variable is missing. Call once at startup."""
+    if _MISSING_REQUIRED:
+        log_and_raise("Env", "loading required settings", Exception(f"not set: {', '.join(_MISSING_REQUIRED)}"))
+
 # ===== Database =====
-DB_URL = os.getenv("DB_URL")
-if not DB_URL:
-    log_and_raise("Env", "loading DB_URL", Exception("DB_URL is not set"))
+DB_URL = get_required_env("DB_URL")
+
+# Connection pools (sync engine for workers/scripts, async engine for handlers)
+DB_POOL_SIZE = get_int_env("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = get_int_env("DB_MAX_OVERFLOW", 0)
+DB_ASYNC_POOL_SIZE = get_int_env("DB_ASYNC_POOL_SIZE", 10)
+DB_ASYNC_MAX_OVERFLOW = get_int_env("DB_ASYNC_MAX_OVERFLOW", 10)
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = get_int_env("DB_POOL_TIMEOUT", 30)
+# Replace connections older than this many seconds (-1 = never)
+DB_POOL_RECYCLE = get_int_env("DB_POOL_RECYCLE", 1800)
+# Liveness check on checkout: "always" (every checkout), "idle" (only after
+# DB_PRE_PING_IDLE_SECONDS unused), or "off"
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle").lower()
+DB_PRE_PING_IDLE_SECONDS = get_int_env("DB_PRE_PING_IDLE_SECONDS", 60)
+# Checkouts waiting longer than this are logged as pool starvation
+DB_POOL_SLOW_CHECKOUT_MS = get_int_env("DB_POOL_SLOW_CHECKOUT_MS", 250)
+# DB_URL points at a server-side pooler in transaction mode (PgBouncer / Supabase
+# port 6543): disable prepared statements, which don't survive connection hand-off
+DB_SERVER_POOLER = get_bool_env("DB_SERVER_POOLER", False)
+
+# Rows per multi-row INSERT in bulk imports
+BULK_INSERT_CHUNK_SIZE = get_int_env("BULK_INSERT_CHUNK_SIZE", 1000)
+# Rows parsed and committed per chunk by the streaming /newbookings import
+IMPORT_CHUNK_SIZE = get_int_env("IMPORT_CHUNK_SIZE", 500)
 
 # ===== Telegram Bot =====
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-if not TELEGRAM_TOKEN:
-    log_and_raise("Env", "loading TELEGRAM_TOKEN", Exception("TELEGRAM_TOKEN is not set"))
+TELEGRAM_TOKEN = get_required_env("TELEGRAM_TOKEN")
 
-ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")
-if not ADMIN_CHAT_ID:
-    log_and_raise("Env", "loading ADMIN_CHAT_ID", Exception("ADMIN_CHAT_ID is not set"))
+ADMIN_CHAT_ID = get_required_env("ADMIN_CHAT_ID")
 
 # ===== Google Sheets =====
-GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
-if not GOOGLE_SHEET_ID:
-    log_and_raise("Env", "loading GOOGLE_SHEET_ID", Exception("GOOGLE_SHEET_ID is not set"))
+GOOGLE_SHEET_ID = get_required_env("GOOGLE_SHEET_ID")
+
+GOOGLE_CREDS_JSON = get_required_env("GOOGLE_CREDS_JSON")
+
+# How long a successful header-alignment check is trusted (seconds)
+SHEETS_ALIGNMENT_TTL = get_int_env("SHEETS_ALIGNMENT_TTL", 900)
+
+# Sheets outbox worker (write-behind queue for Sheets mutations)
+SHEETS_OUTBOX_POLL_INTERVAL = get_int_env("SHEETS_OUTBOX_POLL_INTERVAL", 2)  # seconds
+SHEETS_OUTBOX_BATCH_SIZE = get_int_env("SHEETS_OUTBOX_BATCH_SIZE", 200)
+SHEETS_OUTBOX_MAX_ATTEMPTS = get_int_env("SHEETS_OUTBOX_MAX_ATTEMPTS", 8)
+
+# SheetsBatch flush thresholds: queued operations, or age of the oldest one (seconds).
+# The age is checked when the batch is used, not on a timer, so it isn't a latency bound.
+SHEETS_BATCH_MAX_OPS = get_int_env("SHEETS_BATCH_MAX_OPS", 500)
+SHEETS_BATCH_MAX_AGE = get_int_env("SHEETS_BATCH_MAX_AGE", 5)
 
-GOOGLE_CREDS_JSON = os.getenv("GOOGLE_CREDS_JSON")
-if not GOOGLE_CREDS_JSON:
-    log_and_raise("Env", "loading GOOGLE_CREDS_JSON", Exception("GOOGLE_CREDS_JSON is not set"))
+# Chunked appends: rows per append request, retries per chunk, shared write quota
+SHEETS_APPEND_CHUNK_ROWS = get_int_env("SHEETS_APPEND_CHUNK_ROWS", 500)
+SHEETS_APPEND_MAX_RETRIES = get_int_env("SHEETS_APPEND_MAX_RETRIES", 5)
+SHEETS_WRITE_REQUESTS_PER_MINUTE = get_int_env("SHEETS_WRITE_REQUESTS_PER_MINUTE", 60)
 
 # ===== Supabase =====
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-if not SUPABASE_URL:
-    log_and_raise("Env", "loading SUPABASE_URL", Exception("SUPABASE_URL is not set"))
+SUPABASE_URL = get_required_env("SUPABASE_URL")
 
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-if not SUPABASE_KEY:
-    log_and_raise("Env", "loading SUPABASE_KEY", Exception("SUPABASE_KEY is not set"))
+SUPABASE_KEY = get_required_env("SUPABASE_KEY")
 
-SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET")
-if not SUPABASE_BUCKET:
-    log_and_raise("Env", "loading SUPABASE_BUCKET", Exception("SUPABASE_BUCKET is not set"))
+SUPABASE_BUCKET = get_required_env("SUPABASE_BUCKET")
+
+# Concurrent photo downloads (ID card PDFs): worker threads and pooled connections
+PHOTO_FETCH_WORKERS = get_int_env("PHOTO_FETCH_WORKERS", 8)
+# Async Storage client (utils/async_storage.py): in-flight request cap, retries, timeout in seconds
+STORAGE_MAX_CONCURRENCY = get_int_env("STORAGE_MAX_CONCURRENCY", 8)
+STORAGE_MAX_RETRIES = get_int_env("STORAGE_MAX_RETRIES", 3)
+STORAGE_TIMEOUT = get_int_env("STORAGE_TIMEOUT", 30)
+# Local disk LRU of card-sized ID photo thumbnails
+THUMB_CACHE_DIR = os.getenv("THUMB_CACHE_DIR", "/tmp/eventdaybuddy/thumbs")
+THUMB_CACHE_MAX_MB = get_int_env("THUMB_CACHE_MAX_MB", 200)
+# Local disk tier of content-addressed manifest / ID card PDFs
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/tmp/eventdaybuddy/pdfs")
+PDF_CACHE_MAX_MB = get_int_env("PDF_CACHE_MAX_MB", 200)
 
 # ===== Optional Settings =====
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -61,14 +118,24 @@ PHOTO_REQUIRED = get_bool_env("PHOTO_REQUIRED", False)
 # MAX_SEATS_DEFAULT = get_int_env("MAX_SEATS_DEFAULT", 60)
 
 # Public URL for webhook
-PUBLIC_URL = os.getenv("PUBLIC_URL")
-if not PUBLIC_URL:
-    log_and_raise("Env", "loading PUBLIC_URL", Exception("PUBLIC_URL is not set"))
+PUBLIC_URL = get_required_env("PUBLIC_URL")
+
+# Role cache (require_role) sizing
+ROLE_CACHE_TTL = get_int_env("ROLE_CACHE_TTL", 300)  # seconds
+ROLE_CACHE_MAX_SIZE = get_int_env("ROLE_CACHE_MAX_SIZE", 512)
 
 # Boarding flow toggles
 WAITLIST_AUTO_ASSIGN = get_bool_env("WAITLIST_AUTO_ASSIGN", False)
 GROUP_CHECKIN_PROMPT = get_bool_env("GROUP_CHECKIN_PROMPT", False)
 
+# Worker processes for PDF rendering (/departed manifest + ID cards)
+RENDER_WORKERS = get_int_env("RENDER_WORKERS", 2)
+
+# Update dispatcher (bot/dispatcher.py): chats processed concurrently, and the
+# pending-update limit beyond which Telegram gets 503 and redelivers later
+WEBHOOK_WORKERS = get_int_env("WEBHOOK_WORKERS", 8)
+WEBHOOK_QUEUE_MAX = get_int_env("WEBHOOK_QUEUE_MAX", 500)
+
 # ===== CORS Settings =====
 # Comma-separated list of allowed origins in production, e.g. "https://myapp.com,https://admin.myapp.com"
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*")
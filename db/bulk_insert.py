@@ -0,0 +1,53 @@
+from sqlalchemy import insert
+from config.logger import logger
+from db.models import Booking
+from services.booking_service import generate_ticket_ref
+from services.group_service import upsert_groups
+
+# ===== Set-based booking insert =====
+# One group upsert for all phones, then one executemany INSERT ... RETURNING id
+# per chunk (batched by SQLAlchemy's insertmanyvalues) — instead of a SELECT/flush
+# per phone and a flush per booking. Postgres doesn't promise RETURNING rows come
+# back in VALUES order, so sort_by_parameter_order has SQLAlchemy match them up.
+
+# ~13 bind params per row; Postgres caps a statement at 65535 params
+DEFAULT_CHUNK_SIZE = 1000
+
+_BOOKING_FIELDS = (
+    "name", "id_number", "phone", "male_dep", "resort_dep",
+    "paid_amount", "transfer_ref", "ticket_type",
+)
+
+
+def insert_bookings(db, rows: list[dict], event_name: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[int]:
+    """
+    Insert parsed booking rows for one event inside the caller's transaction.
+    Returns the new booking IDs in the same order as rows.
+    """
+    if not rows:
+        return []
+
+    phone_to_group = upsert_groups(db, (row.get("phone") for row in rows), event_name)
+
+    values = []
+    for row in rows:
+        record = {field: row.get(field) for field in _BOOKING_FIELDS}
+        record.update(
+            event_id=event_name,
+            ticket_ref=row.get("ticket_ref") or generate_ticket_ref(str(event_name)),
+            status="booked",
+            group_id=phone_to_group.get(row.get("phone")),
+        )
+        values.append(record)
+
+    inserted_ids = []
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        result = db.execute(insert(Booking).returning(Booking.id, sort_by_parameter_order=True), chunk)
+        inserted_ids.extend(result.scalars().all())
+
+    logger.info(
+        f"[DB] Inserted {len(inserted_ids)} bookings in {-(-len(values) // chunk_size)} statement(s), "
+        f"{len(phone_to_group)} groups for event_name={event_name}"
+    )
+    return inserted_ids
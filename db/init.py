@@ -1,30 +1,95 @@
+import asyncio
 import time
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import contextmanager, asynccontextmanager
 from config.logger import logger, log_and_raise
-from config.envs import DB_URL, LOG_LEVEL
+from config.envs import (
+    DB_URL,
+    LOG_LEVEL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_ASYNC_POOL_SIZE,
+    DB_ASYNC_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_PRE_PING,
+    DB_SERVER_POOLER,
+)
 from db.models import Base
+from db.pool import engine_options, instrument_engine, pool_stats
+
+# ===== Engines (created on first use) =====
+# Creating an engine does no I/O, but it is deferred anyway so importing db.init
+# (scripts, render workers, tests) needs neither DB_URL nor a reachable database.
+# The connection check with retry/backoff runs in the startup warm-up instead.
+_engine = None
+_async_engine = None
+
+
+def get_engine():
+    """Sync engine (outbox worker, threads, scripts)."""
+    global _engine
+    if _engine is None:
+        _engine = instrument_engine(create_engine(
+            DB_URL,
+            echo=(LOG_LEVEL == "DEBUG"),
+            **engine_options("eventdaybuddy-api", DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE),
+        ))
+    return _engine
+
+
+def get_async_engine():
+    """
+    Same database through psycopg's async driver. AsyncSession.run_sync() lets the
+    existing sync helpers (lookups, seat ledger, outbox, manifest) run unchanged
+    while their I/O is awaited instead of blocking the loop.
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            make_url(DB_URL).set(drivername="postgresql+psycopg"),
+            echo=(LOG_LEVEL == "DEBUG"),
+            **engine_options(
+                "eventdaybuddy-api-async", DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                DB_POOL_RECYCLE, is_async=True,
+            ),
+        )
+        instrument_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
-# ===== Engine creation with retry/backoff =====
-def init_engine_with_retry(url: str, retries: int = 5, backoff: int = 2):
-    """Create SQLAlchemy engine with retry/backoff for transient DB errors."""
+# ===== Connection check with retry/backoff =====
+def _log_connected():
+    logger.info(
+        f"[DB] ✅ Connected to database (pool {DB_POOL_SIZE}+{DB_MAX_OVERFLOW}, "
+        f"async pool {DB_ASYNC_POOL_SIZE}+{DB_ASYNC_MAX_OVERFLOW}, pre-ping {DB_PRE_PING}, "
+        f"server pooler {'on' if DB_SERVER_POOLER else 'off'})."
+    )
+
+
+def wait_for_db(retries: int = 5, backoff: int = 2):
+    """Block until the sync engine can connect, with retry/backoff for transient DB errors."""
     attempt = 0
     while True:
         try:
-            engine = create_engine(
-                DB_URL,
-                connect_args={"application_name": "eventdaybuddy-api"},
-                pool_size=5,
-                max_overflow=0,
-                pool_pre_ping=True,
-                echo=(LOG_LEVEL == "DEBUG"),
-            )
-            # ✅ test connection immediately using SQLAlchemy 2.0 style
-            with engine.connect() as conn:
+            with get_engine().connect() as conn:
                 conn.execute(text("SELECT 1"))
-            logger.info("[DB] ✅ Connected to database.")
-            return engine
+            _log_connected()
+            return
         except Exception as e:
             attempt += 1
             if attempt >= retries:
@@ -33,23 +98,32 @@ def init_engine_with_retry(url: str, retries: int = 5, backoff: int = 2):
             logger.warning(f"[DB] Connection failed (attempt {attempt}), retrying in {wait}s...")
             time.sleep(wait)
 
-# ===== Create engine and session factory =====
-engine = init_engine_with_retry(DB_URL)
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    expire_on_commit=False,
-)
+
+async def warm_up_async_db(retries: int = 5, backoff: int = 2):
+    """Open the async pool's first connection without blocking the loop (startup warm-up)."""
+    attempt = 0
+    while True:
+        try:
+            async with get_async_engine().connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return
+        except Exception as e:
+            attempt += 1
+            if attempt >= retries:
+                log_and_raise("DB Init", f"async engine failed after {retries} attempts", e)
+            wait = backoff ** attempt
+            logger.warning(f"[DB] Async connection failed (attempt {attempt}), retrying in {wait}s...")
+            await asyncio.sleep(wait)
 
 # ===== Initialize tables safely =====
 def init_db():
-    """Create all tables if they do not exist."""
+    """Wait for the database, then create all tables if they do not exist."""
+    wait_for_db()
     try:
         # ✅ Use engine.connect() to avoid session contamination
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))  # optional ping
+        with get_engine().connect() as conn:
             Base.metadata.create_all(bind=conn)
+            conn.commit()
         logger.info("[DB] ✅ Tables created or verified.")
     except Exception as e:
         log_and_raise("DB Init", "creating tables", e)
@@ -61,7 +135,7 @@ def get_db():
     Provide a transactional scope around a series of operations.
     Ensures commit on success, rollback on failure, and session close.
     """
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
         db.commit()
@@ -72,10 +146,48 @@ def get_db():
     finally:
         db.close()
 
+# ===== Async sessions (handlers on the event loop) =====
+@asynccontextmanager
+async def get_async_db():
+    """
+    Async counterpart of get_db(): commit on success, rollback on failure, close.
+    Use `await db.run_sync(fn, ...)` to call helpers written for a sync Session.
+    """
+    db = AsyncSessionLocal(bind=get_async_engine())
+    try:
+        yield db
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"[DB] ❌ Async transaction rolled back due to error: {e}", exc_info=True)
+        raise
+    finally:
+        await db.close()
+
+
+async def close_async_engine():
+    """Dispose of the async engine's pooled connections."""
+    if _async_engine is None:
+        return
+    try:
+        await _async_engine.dispose()
+        logger.info("[DB] ✅ Async engine disposed.")
+    except Exception as e:
+        logger.error(f"[DB] ❌ Async engine disposal failed: {e}", exc_info=True)
+
+
+def db_pool_stats() -> dict:
+    """Pool gauges and checkout waits for both engines (see db/pool.py)."""
+    engines = [e for e in (_engine, _async_engine and _async_engine.sync_engine) if e is not None]
+    return pool_stats(*engines)
+
+
 def close_engine():
     """Dispose of the engine and release all pooled connections."""
+    if _engine is None:
+        return
     try:
-        engine.dispose()
+        _engine.dispose()
         logger.info("[DB] ✅ Engine disposed, all connections released.")
     except Exception as e:
         logger.error(f"[DB] ❌ Engine disposal failed: {e}", exc_info=True)
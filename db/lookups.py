@@ -0,0 +1,83 @@
+import re
+from sqlalchemy import func, literal, literal_column
+from config.logger import logger
+from db.models import Booking
+
+# ===== Tiered booking lookup for /i and /p =====
+# 1. exact match on a normalized expression  (expression index, equality)
+# 2. suffix match on the reversed expression (text_pattern_ops index, prefix LIKE)
+# 3. ILIKE '%q%' fallback                    (sequential scan, last resort)
+#
+# The expressions below must stay identical to the indexes created in
+# migrations/versions/5d2b8e47c1a9_booking_lookup_indexes.py, otherwise the
+# planner can't use them.
+
+_NON_DIGITS = "[^0-9]"
+
+
+def normalize_id_number(value: str) -> str:
+    """ID numbers compare case-insensitively with surrounding spaces ignored."""
+    return (value or "").strip().upper()
+
+
+def normalize_phone(value: str) -> str:
+    """Phones compare on digits only ("+960 777-1234" → "9607771234")."""
+    return re.sub(_NON_DIGITS, "", value or "")
+
+
+def _id_expr():
+    return func.upper(Booking.id_number)
+
+
+def _phone_expr():
+    # Inline constants (not bind params) so the expression matches the index definition
+    return func.regexp_replace(
+        Booking.phone, literal_column(f"'{_NON_DIGITS}'"), literal_column("''"), literal_column("'g'")
+    )
+
+
+def _suffix_filter(expr, normalized: str):
+    """reverse(expr) LIKE reverse(q) || '%' — served by the reversed text_pattern_ops index."""
+    escaped = normalized[::-1].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    # Rendered inline: a bound LIKE pattern can't use the index under a generic plan
+    return func.reverse(expr).like(literal(escaped + "%", literal_execute=True), escape="\\")
+
+
+def _tiered(db, event_name: str, raw: str, normalized: str, expr, column, limit=None, for_update=False):
+    """Run the three tiers in order and return (bookings, tier) from the first that matches."""
+    def run(condition):
+        q = db.query(Booking).filter(Booking.event_id == event_name, condition).order_by(Booking.id)
+        if limit:
+            q = q.limit(limit)
+        if for_update:
+            q = q.with_for_update()
+        return q.all()
+
+    tiers = []
+    if normalized:
+        tiers.append(("exact", expr == normalized))
+        tiers.append(("suffix", _suffix_filter(expr, normalized)))
+    tiers.append(("fuzzy", column.ilike(f"%{raw.strip()}%")))
+
+    for tier, condition in tiers:
+        bookings = run(condition)
+        if bookings:
+            logger.info(f"[Lookup] '{raw}' matched {len(bookings)} booking(s) via {tier} tier")
+            return bookings, tier
+    return [], None
+
+
+def find_bookings_by_id(db, event_name: str, query: str, limit: int = None, for_update: bool = False) -> list:
+    """Bookings in an event whose ID number matches query (exact → suffix → fuzzy)."""
+    bookings, _ = _tiered(
+        db, event_name, query, normalize_id_number(query), _id_expr(), Booking.id_number, limit, for_update
+    )
+    return bookings
+
+
+def find_bookings_by_phone(db, event_name: str, query: str, limit: int = None, for_update: bool = False) -> list:
+    """Bookings in an event whose phone matches query (exact → suffix → fuzzy)."""
+    bookings, _ = _tiered(
+        db, event_name, query, normalize_phone(query), _phone_expr(), Booking.phone, limit, for_update
+    )
+    return bookings
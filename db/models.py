@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, DateTime, ForeignKey, Numeric, Boolean, Enum, UniqueConstraint
+    Column, String, Integer, DateTime, ForeignKey, Numeric, Boolean, Enum, UniqueConstraint, JSON, Index, text
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,8 @@ UserRoleEnum = Enum(
     name="user_role"
 )
 
+LegTypeEnum = Enum("arrival", "departure", name="leg_type")
+
 class TimestampMixin:
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -38,6 +40,25 @@ class Event(Base, TimestampMixin):
 # ===== Core Booking =====
 class Booking(Base, TimestampMixin):
     __tablename__ = "bookings"
+    # Hot queries filter by event plus one of these columns; boat columns are
+    # mostly NULL, so their indexes only cover boarded rows
+    __table_args__ = (
+        Index("ix_bookings_event_id_number", "event_id", "id_number"),
+        Index("ix_bookings_event_phone", "event_id", "phone"),
+        Index("ix_bookings_event_status", "event_id", "status"),
+        Index("ix_bookings_arrival_boat_event", "arrival_boat_boarded", "event_id",
+              postgresql_where=text("arrival_boat_boarded IS NOT NULL")),
+        Index("ix_bookings_departure_boat_event", "departure_boat_boarded", "event_id",
+              postgresql_where=text("departure_boat_boarded IS NOT NULL")),
+        # /i and /p tiered lookups (db/lookups.py, migration 5d2b8e47c1a9); the
+        # expressions must match the queries exactly for the planner to use them
+        Index("ix_bookings_event_id_number_norm", "event_id", text("upper(id_number)")),
+        Index("ix_bookings_event_phone_norm", "event_id", text("regexp_replace(phone, '[^0-9]', '', 'g')")),
+        Index("ix_bookings_event_id_number_rev", "event_id",
+              text("reverse(upper(id_number)) text_pattern_ops")),
+        Index("ix_bookings_event_phone_rev", "event_id",
+              text("reverse(regexp_replace(phone, '[^0-9]', '', 'g')) text_pattern_ops")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -106,6 +127,7 @@ class BookingEditLog(Base):
 # ===== Booking Group =====
 class BookingGroup(Base, TimestampMixin):
     __tablename__ = "booking_groups"
+    __table_args__ = (UniqueConstraint("event_id", "phone", name="uq_booking_groups_event_phone"),)
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(String, ForeignKey("events.name", ondelete="CASCADE"), nullable=False, index=True)  # MUST have nullable=False
@@ -178,7 +200,7 @@ class BoardingSession(Base, TimestampMixin):
     id = Column(Integer, primary_key=True, index=True)
     boat_number = Column(Integer, ForeignKey("boats.boat_number", ondelete="CASCADE"), nullable=False, index=True)
     started_by = Column(String, ForeignKey("users.chat_id", ondelete="CASCADE"), nullable=False, index=True)
-    leg_type = Column(Enum("arrival", "departure", name="leg_type"), nullable=False, default="arrival", index=True)
+    leg_type = Column(LegTypeEnum, nullable=False, default="arrival", index=True)
     is_active = Column(Boolean, default=True, index=True)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True), nullable=True)
@@ -189,6 +211,39 @@ class BoardingSession(Base, TimestampMixin):
     def __repr__(self):
         return f"<BoardingSession boat={self.boat_number} leg={self.leg_type} event={self.event_id} active={self.is_active}>"
 
+# ===== Seat Ledger =====
+class SeatLedger(Base, TimestampMixin):
+    """Per-boat/per-leg occupied seat counter, claimed with a conditional UPDATE."""
+    __tablename__ = "seat_ledger"
+    __table_args__ = (UniqueConstraint("boat_number", "leg_type", name="uq_seat_ledger_boat_leg"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    boat_number = Column(Integer, ForeignKey("boats.boat_number", ondelete="CASCADE"), nullable=False)
+    leg_type = Column(LegTypeEnum, nullable=False)
+    occupied = Column(Integer, nullable=False, default=0)
+    capacity = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<SeatLedger boat={self.boat_number} leg={self.leg_type} {self.occupied}/{self.capacity}>"
+
+# ===== Manifest Projection =====
+class ManifestEntry(Base, TimestampMixin):
+    """One boarded passenger on a boat/leg, appended at check-in in boarding order."""
+    __tablename__ = "manifest_entries"
+    __table_args__ = (
+        UniqueConstraint("boat_number", "leg_type", "booking_id", name="uq_manifest_boat_leg_booking"),
+        Index("ix_manifest_entries_boat_leg_order", "boat_number", "leg_type", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    boat_number = Column(Integer, ForeignKey("boats.boat_number", ondelete="CASCADE"), nullable=False)
+    leg_type = Column(LegTypeEnum, nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
+    boarded_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ManifestEntry boat={self.boat_number} leg={self.leg_type} booking={self.booking_id}>"
+
 # ===== Check-in Log =====
 
 class CheckinLog(Base, TimestampMixin):
@@ -206,6 +261,24 @@ class CheckinLog(Base, TimestampMixin):
     def __repr__(self):
         return f"<CheckinLog booking_id={self.booking_id} boat={self.boat_number} method={self.method}>"
 
+# ===== Sheets Outbox =====
+class SheetsOutbox(Base, TimestampMixin):
+    """Pending Google Sheets mutation, written in the same transaction as the DB change."""
+    __tablename__ = "sheets_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_name = Column(String, nullable=False)
+    ticket_ref = Column(String, nullable=False, index=True)
+    op = Column(String, nullable=False)  # "append" | "update" | "photo"
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | processing | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SheetsOutbox id={self.id} op={self.op} ticket={self.ticket_ref} status={self.status}>"
+
 # ===== Waitlist Tracker =====
 class WaitlistEntry(Base, TimestampMixin):
     __tablename__ = "waitlist"
@@ -0,0 +1,157 @@
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from config.logger import logger
+from config.envs import (
+    DB_PRE_PING,
+    DB_PRE_PING_IDLE_SECONDS,
+    DB_POOL_SLOW_CHECKOUT_MS,
+    DB_SERVER_POOLER,
+)
+
+# ===== Connection pool telemetry =====
+# Both engines use a QueuePool subclass that times how long each checkout waited
+# for a free connection. Together with in-use/overflow gauges this shows pool
+# starvation during boarding rushes on /metrics, and which knob to turn
+# (DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_ASYNC_*).
+
+_WAIT_SAMPLES = 500
+_SLOW_LOG_INTERVAL = 30  # seconds between starvation warnings per pool
+
+
+class PoolMetrics:
+    """Checkout counters and recent wait times (ms) for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.slow_checkouts = 0
+        self.pings = 0
+        self.stale_connections = 0
+        self.waits = deque(maxlen=_WAIT_SAMPLES)
+        self._last_slow_log = 0.0
+
+    def record_wait(self, wait_ms: float, pool):
+        self.checkouts += 1
+        self.waits.append(wait_ms)
+        if pool.overflow() > 0:
+            self.overflow_checkouts += 1
+        if wait_ms >= DB_POOL_SLOW_CHECKOUT_MS:
+            self.slow_checkouts += 1
+            now = time.monotonic()
+            if now - self._last_slow_log >= _SLOW_LOG_INTERVAL:
+                self._last_slow_log = now
+                logger.warning(
+                    f"[DB] Pool '{self.name}' checkout waited {wait_ms:.0f} ms "
+                    f"({pool.checkedout()} in use, overflow {pool.overflow()})"
+                )
+
+    def snapshot(self, pool) -> dict:
+        samples = sorted(self.waits)
+        return {
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "pings": self.pings,
+            "stale_connections": self.stale_connections,
+            "wait_avg_ms": round(sum(samples) / len(samples), 2) if samples else None,
+            "wait_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2) if samples else None,
+            "wait_max_ms": round(samples[-1], 2) if samples else None,
+        }
+
+
+class _TimedPool:
+    """Mixin timing QueuePool._do_get (the wait for a free or new connection)."""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            logger.error(f"[DB] Pool '{self.metrics.name}' exhausted: checkout timed out")
+            raise
+        self.metrics.record_wait((time.perf_counter() - started) * 1000, self)
+        return conn
+
+
+def timed_pool_class(name: str, is_async: bool = False):
+    """
+    Pool class for create_engine(poolclass=...). Metrics live on the generated
+    class, so they survive engine.dispose() (which recreates the pool).
+    """
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return type(f"Timed{base.__name__}", (_TimedPool, base), {"metrics": PoolMetrics(name)})
+
+
+# ===== Pre-ping on idle =====
+def _install_idle_ping(engine, metrics: PoolMetrics, idle_seconds: int):
+    """
+    Ping only connections that sat unused for idle_seconds; during a rush
+    connections cycle constantly and skip the extra round-trip to Postgres.
+    Raising DisconnectionError makes the pool drop the connection and retry.
+    """
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        last = record.info.get("checked_in_at")
+        if last is None or time.monotonic() - last < idle_seconds:
+            return
+        metrics.pings += 1
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            metrics.stale_connections += 1
+            logger.warning(f"[DB] Pool '{metrics.name}' dropped stale connection: {e}")
+            raise exc.DisconnectionError() from e
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+def engine_options(name: str, pool_size: int, max_overflow: int, timeout: int, recycle: int,
+                   is_async: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments for the pool settings in envs."""
+    connect_args = {"application_name": name}
+    if DB_SERVER_POOLER:
+        # Transaction-mode poolers hand each transaction to any server connection,
+        # so psycopg's server-side prepared statements must stay off
+        connect_args["prepare_threshold"] = None
+    return {
+        "connect_args": connect_args,
+        "poolclass": timed_pool_class(name, is_async),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": timeout,
+        "pool_recycle": recycle,
+        "pool_pre_ping": DB_PRE_PING == "always",
+    }
+
+
+def instrument_engine(engine):
+    """Attach idle pre-ping (DB_PRE_PING=idle) to an engine built from engine_options()."""
+    pool = engine.pool
+    if DB_PRE_PING == "idle":
+        _install_idle_ping(engine, pool.metrics, DB_PRE_PING_IDLE_SECONDS)
+    return engine
+
+
+def pool_stats(*engines) -> dict:
+    """Gauges and checkout-wait stats per engine, keyed by pool name."""
+    return {e.pool.metrics.name: e.pool.metrics.snapshot(e.pool) for e in engines}
@@ -0,0 +1,93 @@
+from sqlalchemy import update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from config.logger import logger
+from db.models import Booking, Boat, SeatLedger
+
+
+def _leg_column(leg_type: str):
+    """Booking column holding the boat for a given leg."""
+    return Booking.arrival_boat_boarded if leg_type == "arrival" else Booking.departure_boat_boarded
+
+
+def sync_seat_ledger(db, boat_number: int, leg_type: str, capacity: int) -> int:
+    """
+    Create or reconcile the ledger row for a boat/leg from the bookings table.
+    Runs once per /boatready, so the COUNT is paid per session, not per passenger.
+    Returns the reconciled occupied count.
+    """
+    occupied = db.query(func.count(Booking.id)).filter(_leg_column(leg_type) == boat_number).scalar() or 0
+    stmt = pg_insert(SeatLedger).values(
+        boat_number=boat_number, leg_type=leg_type, occupied=occupied, capacity=capacity
+    ).on_conflict_do_update(
+        constraint="uq_seat_ledger_boat_leg",
+        set_={"occupied": occupied, "capacity": capacity, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+    logger.info(f"[SeatLedger] Synced boat {boat_number} {leg_type}: {occupied}/{capacity}")
+    return occupied
+
+
+def set_ledger_capacity(db, boat_number: int, capacity: int):
+    """Propagate a boat capacity change (/editseats) to all of its ledger rows."""
+    db.execute(
+        update(SeatLedger)
+        .where(SeatLedger.boat_number == boat_number)
+        .values(capacity=capacity, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_seats(db, boat_number: int, leg_type: str, count: int = 1) -> tuple[bool, int, int]:
+    """
+    Atomically reserve `count` seats on a boat/leg inside the caller's transaction:
+        UPDATE seat_ledger SET occupied = occupied + n
+        WHERE boat_number = :b AND leg_type = :l AND occupied + n <= capacity
+        RETURNING occupied, capacity
+    Returns (claimed, occupied, capacity). When refused, occupied/capacity are the current values.
+    """
+    stmt = (
+        update(SeatLedger)
+        .where(
+            SeatLedger.boat_number == boat_number,
+            SeatLedger.leg_type == leg_type,
+            SeatLedger.occupied + count <= SeatLedger.capacity,
+        )
+        .values(occupied=SeatLedger.occupied + count, updated_at=func.now())
+        .returning(SeatLedger.occupied, SeatLedger.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+    if row:
+        return True, row.occupied, row.capacity
+
+    current = db.query(SeatLedger.occupied, SeatLedger.capacity).filter(
+        SeatLedger.boat_number == boat_number,
+        SeatLedger.leg_type == leg_type,
+    ).first()
+    if current:
+        return False, current.occupied, current.capacity
+
+    # No ledger row yet (e.g. session started before the ledger existed) — build it and retry once
+    boat = db.query(Boat).filter(Boat.boat_number == boat_number).first()
+    if not boat:
+        return False, 0, 0
+    logger.warning(f"[SeatLedger] Missing ledger row for boat {boat_number} {leg_type}, rebuilding.")
+    sync_seat_ledger(db, boat_number, leg_type, boat.capacity)
+    row = db.execute(stmt).first()
+    if row:
+        return True, row.occupied, row.capacity
+    current = db.query(SeatLedger.occupied, SeatLedger.capacity).filter(
+        SeatLedger.boat_number == boat_number,
+        SeatLedger.leg_type == leg_type,
+    ).first()
+    return False, current.occupied, current.capacity
+
+
+def release_seats(db, boat_number: int, leg_type: str, count: int = 1):
+    """Give back seats (e.g. /resetbooking), never dropping below zero."""
+    db.execute(
+        update(SeatLedger)
+        .where(SeatLedger.boat_number == boat_number, SeatLedger.leg_type == leg_type)
+        .values(occupied=func.greatest(SeatLedger.occupied - count, 0), updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
@@ -2,13 +2,12 @@ import uvicorn
 import traceback
 
 from config.logger import logger, log_and_raise
-from config.envs import DRY_RUN, LOG_LEVEL
-from db.init import init_db
+from config.envs import DRY_RUN, LOG_LEVEL, validate_envs
 from web.server import app, PORT
 from utils.timezone import set_maldives_timezone
 
 def main():
-    """Main entrypoint for EventDayBuddy — starts DB and web server."""
+    """Main entrypoint for EventDayBuddy — validates settings and starts the web server."""
     try:
         print("[DEBUG] main() starting...")
         logger.info("🚀 EventDayBuddy starting up...")
@@ -17,11 +16,9 @@ def main():
         set_maldives_timezone()
         logger.info("🕐 Set application timezone to Maldives time (GMT+5)")
 
-        print("[DEBUG] Initializing database...")
-        # Initialize database safely
-        init_db()
-        print("[DEBUG] Database initialized.")
-        logger.info("✅ Database initialized successfully.")
+        # Fail fast on missing settings; DB, Sheets, Supabase and the bot are
+        # connected concurrently by the FastAPI startup warm-up (services/warmup.py)
+        validate_envs()
 
         if DRY_RUN:
             logger.warning("[Main] DRY_RUN mode enabled — bot external writes are limited.")
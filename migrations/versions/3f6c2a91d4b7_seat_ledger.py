@@ -0,0 +1,55 @@
+"""seat_ledger
+
+Revision ID: 3f6c2a91d4b7
+Revises: 9bc7eaa492a8
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a91d4b7'
+down_revision: Union[str, None] = '9bc7eaa492a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('seat_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('boat_number', sa.Integer(), nullable=False),
+    sa.Column('leg_type', postgresql.ENUM('arrival', 'departure', name='leg_type', create_type=False), nullable=False),
+    sa.Column('occupied', sa.Integer(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['boat_number'], ['boats.boat_number'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('boat_number', 'leg_type', name='uq_seat_ledger_boat_leg')
+    )
+    op.create_index(op.f('ix_seat_ledger_id'), 'seat_ledger', ['id'], unique=False)
+
+    # Seed the ledger from bookings already boarded so existing boats stay consistent
+    op.execute("""
+        INSERT INTO seat_ledger (boat_number, leg_type, occupied, capacity)
+        SELECT b.boat_number, legs.leg_type::leg_type, COALESCE(cnt.occupied, 0), b.capacity
+        FROM boats b
+        CROSS JOIN (VALUES ('arrival'), ('departure')) AS legs(leg_type)
+        LEFT JOIN (
+            SELECT arrival_boat_boarded AS boat_number, 'arrival' AS leg_type, COUNT(*) AS occupied
+            FROM bookings WHERE arrival_boat_boarded IS NOT NULL GROUP BY arrival_boat_boarded
+            UNION ALL
+            SELECT departure_boat_boarded, 'departure', COUNT(*)
+            FROM bookings WHERE departure_boat_boarded IS NOT NULL GROUP BY departure_boat_boarded
+        ) cnt ON cnt.boat_number = b.boat_number AND cnt.leg_type = legs.leg_type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_seat_ledger_id'), table_name='seat_ledger')
+    op.drop_table('seat_ledger')
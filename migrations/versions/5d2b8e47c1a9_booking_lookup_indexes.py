@@ -0,0 +1,42 @@
+"""booking lookup indexes
+
+Revision ID: 5d2b8e47c1a9
+Revises: a71e5c0b28f3
+Create Date: 2026-10-16 13:05:22.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e47c1a9'
+down_revision: Union[str, None] = 'a71e5c0b28f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expressions must match db/lookups.py exactly
+ID_NORM = "upper(id_number)"
+PHONE_NORM = "regexp_replace(phone, '[^0-9]', '', 'g')"
+
+
+def upgrade() -> None:
+    # Tier 1: exact normalized match
+    op.create_index('ix_bookings_event_id_number_norm', 'bookings',
+                    ['event_id', sa.text(ID_NORM)], unique=False)
+    op.create_index('ix_bookings_event_phone_norm', 'bookings',
+                    ['event_id', sa.text(PHONE_NORM)], unique=False)
+    # Tier 2: suffix match via prefix LIKE on the reversed value
+    op.create_index('ix_bookings_event_id_number_rev', 'bookings',
+                    ['event_id', sa.text(f"reverse({ID_NORM}) text_pattern_ops")], unique=False)
+    op.create_index('ix_bookings_event_phone_rev', 'bookings',
+                    ['event_id', sa.text(f"reverse({PHONE_NORM}) text_pattern_ops")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_event_phone_rev', table_name='bookings')
+    op.drop_index('ix_bookings_event_id_number_rev', table_name='bookings')
+    op.drop_index('ix_bookings_event_phone_norm', table_name='bookings')
+    op.drop_index('ix_bookings_event_id_number_norm', table_name='bookings')
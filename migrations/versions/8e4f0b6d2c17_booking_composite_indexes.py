@@ -0,0 +1,36 @@
+"""booking composite indexes
+
+Revision ID: 8e4f0b6d2c17
+Revises: 5d2b8e47c1a9
+Create Date: 2026-10-16 14:21:09.377512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f0b6d2c17'
+down_revision: Union[str, None] = '5d2b8e47c1a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_event_id_number', 'bookings', ['event_id', 'id_number'], unique=False)
+    op.create_index('ix_bookings_event_phone', 'bookings', ['event_id', 'phone'], unique=False)
+    op.create_index('ix_bookings_event_status', 'bookings', ['event_id', 'status'], unique=False)
+    op.create_index('ix_bookings_arrival_boat_event', 'bookings', ['arrival_boat_boarded', 'event_id'],
+                    unique=False, postgresql_where=sa.text('arrival_boat_boarded IS NOT NULL'))
+    op.create_index('ix_bookings_departure_boat_event', 'bookings', ['departure_boat_boarded', 'event_id'],
+                    unique=False, postgresql_where=sa.text('departure_boat_boarded IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_departure_boat_event', table_name='bookings')
+    op.drop_index('ix_bookings_arrival_boat_event', table_name='bookings')
+    op.drop_index('ix_bookings_event_status', table_name='bookings')
+    op.drop_index('ix_bookings_event_phone', table_name='bookings')
+    op.drop_index('ix_bookings_event_id_number', table_name='bookings')
@@ -0,0 +1,47 @@
+"""sheets_outbox
+
+Revision ID: a71e5c0b28f3
+Revises: 3f6c2a91d4b7
+Create Date: 2026-10-16 11:40:03.527761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71e5c0b28f3'
+down_revision: Union[str, None] = '3f6c2a91d4b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sheets_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_name', sa.String(), nullable=False),
+    sa.Column('ticket_ref', sa.String(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sheets_outbox_id'), 'sheets_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_sheets_outbox_ticket_ref'), 'sheets_outbox', ['ticket_ref'], unique=False)
+    op.create_index(op.f('ix_sheets_outbox_status'), 'sheets_outbox', ['status'], unique=False)
+    op.create_index(op.f('ix_sheets_outbox_available_at'), 'sheets_outbox', ['available_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sheets_outbox_available_at'), table_name='sheets_outbox')
+    op.drop_index(op.f('ix_sheets_outbox_status'), table_name='sheets_outbox')
+    op.drop_index(op.f('ix_sheets_outbox_ticket_ref'), table_name='sheets_outbox')
+    op.drop_index(op.f('ix_sheets_outbox_id'), table_name='sheets_outbox')
+    op.drop_table('sheets_outbox')
@@ -0,0 +1,41 @@
+"""booking group unique phone
+
+Revision ID: c3a9d51e7f02
+Revises: 8e4f0b6d2c17
+Create Date: 2026-10-16 15:02:48.915230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9d51e7f02'
+down_revision: Union[str, None] = '8e4f0b6d2c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge duplicate groups (same event + phone) into the oldest one before enforcing uniqueness
+    op.execute("""
+        WITH keep AS (
+            SELECT id, MIN(id) OVER (PARTITION BY event_id, phone) AS keep_id
+            FROM booking_groups
+        )
+        UPDATE bookings b SET group_id = keep.keep_id
+        FROM keep
+        WHERE b.group_id = keep.id AND keep.id <> keep.keep_id
+    """)
+    op.execute("""
+        DELETE FROM booking_groups g
+        USING booking_groups older
+        WHERE g.event_id = older.event_id AND g.phone = older.phone AND g.id > older.id
+    """)
+    op.create_unique_constraint('uq_booking_groups_event_phone', 'booking_groups', ['event_id', 'phone'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_booking_groups_event_phone', 'booking_groups', type_='unique')
@@ -0,0 +1,58 @@
+"""manifest_entries
+
+Revision ID: e7b41c0d9a35
+Revises: c3a9d51e7f02
+Create Date: 2026-10-16 15:02:11.406318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b41c0d9a35'
+down_revision: Union[str, None] = 'c3a9d51e7f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('manifest_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('boat_number', sa.Integer(), nullable=False),
+    sa.Column('leg_type', postgresql.ENUM('arrival', 'departure', name='leg_type', create_type=False), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('boarded_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['boat_number'], ['boats.boat_number'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('boat_number', 'leg_type', 'booking_id', name='uq_manifest_boat_leg_booking')
+    )
+    op.create_index(op.f('ix_manifest_entries_id'), 'manifest_entries', ['id'], unique=False)
+    op.create_index(op.f('ix_manifest_entries_booking_id'), 'manifest_entries', ['booking_id'], unique=False)
+    op.create_index('ix_manifest_entries_boat_leg_order', 'manifest_entries', ['boat_number', 'leg_type', 'id'], unique=False)
+
+    # Seed from passengers already boarded, in check-in order
+    op.execute("""
+        INSERT INTO manifest_entries (boat_number, leg_type, booking_id, boarded_at)
+        SELECT boat_number, leg_type::leg_type, booking_id, checkin_time FROM (
+            SELECT arrival_boat_boarded AS boat_number, 'arrival' AS leg_type, id AS booking_id, checkin_time
+            FROM bookings WHERE arrival_boat_boarded IS NOT NULL
+            UNION ALL
+            SELECT departure_boat_boarded, 'departure', id, checkin_time
+            FROM bookings WHERE departure_boat_boarded IS NOT NULL
+        ) boarded
+        ORDER BY checkin_time NULLS FIRST, booking_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_manifest_entries_boat_leg_order', table_name='manifest_entries')
+    op.drop_index(op.f('ix_manifest_entries_booking_id'), table_name='manifest_entries')
+    op.drop_index(op.f('ix_manifest_entries_id'), table_name='manifest_entries')
+    op.drop_table('manifest_entries')
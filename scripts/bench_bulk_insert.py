@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk booking import: the legacy per-row add/flush loop versus the
+set-based path in db/bulk_insert.py (one group upsert + chunked multi-row
+INSERT ... RETURNING). Runs in a throwaway schema that is dropped afterwards.
+
+    DB_URL=postgresql+psycopg://... python scripts/bench_bulk_insert.py
+    python scripts/bench_bulk_insert.py --dsn ... --rows 2000,20000 --chunk-size 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from db.models import Base, Booking, Event
+from db.bulk_insert import insert_bookings, DEFAULT_CHUNK_SIZE
+from services.booking_service import generate_ticket_ref
+from services.group_service import get_or_create_group
+
+SCHEMA = "bench_bulk_insert"
+EVENT = "BenchEvent"
+
+
+def make_rows(n: int) -> list[dict]:
+    """Synthetic parsed rows; every phone is shared by ~3 passengers like a family booking."""
+    return [
+        {
+            "name": f"Guest {i}",
+            "id_number": f"A{i:07d}",
+            "phone": f"+960 7{i // 3:06d}",
+            "male_dep": "08:00",
+            "resort_dep": "17:00",
+            "paid_amount": 400,
+            "transfer_ref": f"TR{i}",
+            "ticket_type": "Standard",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_insert(db, rows: list[dict], event_name: str) -> list[int]:
+    """The loop bulk_insert_bookings used before: SELECT+flush per phone, flush per booking."""
+    phone_to_group = {}
+    for phone in {row.get("phone") for row in rows if row.get("phone")}:
+        phone_to_group[phone] = get_or_create_group(db, phone, event_name)
+    inserted_ids = []
+    for row in rows:
+        group = phone_to_group.get(row.get("phone"))
+        booking = Booking(
+            event_id=event_name,
+            ticket_ref=row.get("ticket_ref") or generate_ticket_ref(event_name),
+            name=row.get("name"),
+            id_number=row.get("id_number"),
+            phone=row.get("phone"),
+            male_dep=row.get("male_dep"),
+            resort_dep=row.get("resort_dep"),
+            paid_amount=row.get("paid_amount"),
+            transfer_ref=row.get("transfer_ref"),
+            ticket_type=row.get("ticket_type"),
+            status="booked",
+            group_id=group.id if group else None,
+        )
+        db.add(booking)
+        db.flush()
+        inserted_ids.append(booking.id)
+    return inserted_ids
+
+
+def timed_run(engine, fn, rows) -> float:
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bookings, booking_groups RESTART IDENTITY CASCADE"))
+    t0 = time.perf_counter()
+    with Session(engine) as db:
+        ids = fn(db, rows)
+        db.commit()
+    elapsed = time.perf_counter() - t0
+    assert len(ids) == len(rows), f"expected {len(rows)} ids, got {len(ids)}"
+    return elapsed
+
+
+def run(dsn: str, sizes: list[int], chunk_size: int):
+    admin = create_engine(dsn)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(make_url(dsn).update_query_dict({"options": f"-csearch_path={SCHEMA}"}))
+    try:
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            db.add(Event(name=EVENT))
+            db.commit()
+
+        print(f"{'rows':>7} | {'path':<10} | {'seconds':>8} | {'rows/sec':>9}")
+        print("-" * 45)
+        for n in sizes:
+            rows = make_rows(n)
+            legacy = timed_run(engine, lambda db, r: legacy_insert(db, r, EVENT), rows)
+            bulk = timed_run(engine, lambda db, r: insert_bookings(db, r, EVENT, chunk_size), rows)
+            print(f"{n:>7} | {'legacy':<10} | {legacy:>8.2f} | {n / legacy:>9.0f}")
+            print(f"{n:>7} | {'set-based':<10} | {bulk:>8.2f} | {n / bulk:>9.0f}   ({legacy / bulk:.1f}x)")
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DB_URL"), help="SQLAlchemy URL (defaults to $DB_URL)")
+    parser.add_argument("--rows", default="500,2000,10000", help="comma-separated import sizes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per INSERT statement")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: pass --dsn or set DB_URL")
+    run(args.dsn, [int(s) for s in args.rows.split(",")], args.chunk_size)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark /i and /p booking lookups at 10k, 100k and 1M bookings.
+
+Compares the legacy ILIKE '%q%' scan with the tiered lookup in db/lookups.py
+(exact normalized match, reversed-suffix match). Runs in a throwaway schema
+that is dropped afterwards, so it is safe against a dev database:
+
+    DB_URL=postgresql+psycopg://... python scripts/bench_lookup.py
+    python scripts/bench_lookup.py --dsn postgresql+psycopg://... --sizes 10000,100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from db.models import Base, Booking
+from db.lookups import find_bookings_by_id, find_bookings_by_phone
+
+SCHEMA = "bench_lookup"
+EVENT = "BenchEvent"
+
+def seed(engine, start: int, stop: int):
+    """Insert bookings start..stop (inclusive) in one statement and refresh stats."""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO bookings (event_id, ticket_ref, name, id_number, phone, status)
+            SELECT :event, 'BENCH-' || g, 'Guest ' || g,
+                   'A' || lpad(g::text, 7, '0'),
+                   '+960 ' || (7000000 + g)::text,
+                   'booked'
+            FROM generate_series(:start, :stop) AS g
+        """), {"event": EVENT, "start": start, "stop": stop})
+        conn.execute(text("ANALYZE bookings"))
+
+
+def timed(fn, queries) -> tuple[float, float]:
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def run(dsn: str, sizes: list[int], repeat: int):
+    admin = create_engine(dsn)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine = create_engine(dsn, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    try:
+        # create_all builds the lookup expression indexes declared on Booking
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO events (name) VALUES (:name)"), {"name": EVENT})
+
+        print(f"{'rows':>9} | {'lookup':<22} | {'p50 ms':>8} | {'p95 ms':>8}")
+        print("-" * 56)
+        seeded = 0
+        for size in sizes:
+            seed(engine, seeded + 1, size)
+            seeded = size
+            picks = [random.randint(1, size) for _ in range(repeat)]
+
+            with Session(engine) as db:
+                cases = {
+                    "legacy ILIKE id": lambda g: db.query(Booking).filter(
+                        Booking.event_id == EVENT, Booking.id_number.ilike(f"%{g:07d}%")).first(),
+                    "legacy ILIKE phone": lambda g: db.query(Booking).filter(
+                        Booking.event_id == EVENT, Booking.phone.ilike(f"%{7000000 + g}%")).all(),
+                    "tier 1 exact id": lambda g: find_bookings_by_id(db, EVENT, f"a{g:07d}", limit=1),
+                    "tier 1 exact phone": lambda g: find_bookings_by_phone(db, EVENT, f"960{7000000 + g}"),
+                    "tier 2 suffix phone": lambda g: find_bookings_by_phone(db, EVENT, str(7000000 + g)),
+                }
+                for label, fn in cases.items():
+                    p50, p95 = timed(fn, picks)
+                    print(f"{size:>9} | {label:<22} | {p50:>8.2f} | {p95:>8.2f}")
+            print("-" * 56)
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DB_URL"), help="SQLAlchemy URL (defaults to $DB_URL)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated booking counts")
+    parser.add_argument("--repeat", type=int, default=50, help="lookups per case and size")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: pass --dsn or set DB_URL")
+    run(args.dsn, sorted(int(s) for s in args.sizes.split(",")), args.repeat)
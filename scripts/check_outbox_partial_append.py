@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Check that a half-failed outbox flush doesn't duplicate rows in the sheet.
+
+Drives services.sheets_outbox._coalesce/_flush against an in-memory Sheets
+service. The first drain makes one event tab's append lane fail while Master
+and the other event tab succeed; the second drain retries what failed. Afterwards
+every ticket must appear exactly once in Master and once in its event tab, and
+every outbox entry must be done. No database or Google credentials are used.
+
+    python scripts/check_outbox_partial_append.py
+    python scripts/check_outbox_partial_append.py --tickets 300 --mode after-write
+
+--mode before-write: the failing append is rejected (nothing written).
+--mode after-write: the rows are written but the call still raises, like a
+response lost on the way back.
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.pop("TELEGRAM_TOKEN", None)  # no admin alerts from log_and_raise
+os.environ.setdefault("GOOGLE_SHEET_ID", "check")
+
+import sheets.booking_io as booking_io
+import sheets.row_index as row_index
+from sheets.constants import MASTER_TAB, MASTER_HEADERS, EVENT_HEADERS
+from services.sheets_outbox import _coalesce, _flush
+
+EVENTS = ["Check Event A", "Check Event B"]
+_RANGE_RE = re.compile(r"^(?P<tab>.+)!(?P<col>[A-Z]+)\d+")
+
+
+class _Call:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeSheets:
+    """Just enough of spreadsheets().values() for appends and TicketRef column reads."""
+
+    def __init__(self, fail_tab: str, mode: str):
+        self.tabs = {}   # tab -> rows, header row first
+        self.fail_tab = fail_tab
+        self.mode = mode
+        self.failures_left = 1
+        self._lock = threading.Lock()
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        tab = range.rsplit("!", 1)[0]
+        return _Call(lambda: self._append(tab, body["values"]))
+
+    def get(self, spreadsheetId, range):
+        match = _RANGE_RE.match(range)
+        col = _col_index(match.group("col"))
+        tab = match.group("tab")
+        with self._lock:
+            rows = self.tabs.get(tab, [[]])[1:]
+        return _Call(lambda: {"values": [[row[col]] if len(row) > col else [] for row in rows]})
+
+    def _append(self, tab, values):
+        with self._lock:
+            failing = tab == self.fail_tab and self.failures_left > 0
+            if failing:
+                self.failures_left -= 1
+            if failing and self.mode == "before-write":
+                raise RuntimeError(f"injected failure appending to '{tab}'")
+            rows = self.tabs.setdefault(tab, [["header"]])
+            start = len(rows) + 1
+            rows.extend(list(v) for v in values)
+            end = len(rows)
+        if failing:
+            raise RuntimeError(f"injected failure after appending to '{tab}'")
+        return {"updates": {"updatedRange": f"'{tab}'!A{start}:Z{end}"}}
+
+    def ticket_counts(self, tab: str, col: int) -> Counter:
+        return Counter(row[col] for row in self.tabs.get(tab, [[]])[1:])
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - ord("A") + 1
+    return n - 1
+
+
+def make_entries(tickets: int) -> list:
+    idx_ticket = MASTER_HEADERS.index("TicketRef")
+    entries = []
+    for i in range(tickets):
+        row = [""] * len(MASTER_HEADERS)
+        row[0] = str(i + 1)
+        row[idx_ticket] = f"CHK{i:05d}"
+        entries.append(SimpleNamespace(
+            id=i + 1,
+            event_name=EVENTS[i % len(EVENTS)],
+            ticket_ref=row[idx_ticket],
+            op="append",
+            payload={"master_row": row},
+            attempts=0,
+        ))
+    return entries
+
+
+def drain(pending: list) -> list:
+    """One drain_outbox_once without the database: failed entries come back with attempts + 1."""
+    done, failed = _flush(_coalesce(pending))
+    print(f"  drained {len(pending)} entries: {len(done)} done, {len(failed)} failed")
+    retry = []
+    for entry in pending:
+        if entry.id in failed:
+            entry.attempts += 1
+            retry.append(entry)
+    return retry
+
+
+def main(tickets: int, mode: str) -> int:
+    fake = FakeSheets(fail_tab=EVENTS[0], mode=mode)
+    booking_io.get_thread_service = lambda: fake
+    booking_io.validate_sheet_alignment = lambda *args, **kwargs: True
+    row_index.get_service = lambda: fake
+    row_index.invalidate_row_index()
+
+    pending = make_entries(tickets)
+    for attempt in (1, 2, 3):
+        print(f"drain {attempt}:")
+        pending = drain(pending)
+        if not pending:
+            break
+
+    idx_ticket = MASTER_HEADERS.index("TicketRef")
+    expected = {f"CHK{i:05d}" for i in range(tickets)}
+    problems = []
+    if pending:
+        problems.append(f"{len(pending)} entries still not done")
+    master = fake.ticket_counts(MASTER_TAB, idx_ticket)
+    event_col = EVENT_HEADERS.index("T. Reference")
+    event = sum((fake.ticket_counts(tab, event_col) for tab in EVENTS), Counter())
+    for tab, counts in ((MASTER_TAB, master), ("event tabs", event)):
+        duplicated = sorted(ref for ref, n in counts.items() if n > 1)
+        missing = sorted(expected - set(counts))
+        print(f"{tab}: {sum(counts.values())} rows, {len(duplicated)} duplicated, {len(missing)} missing")
+        if duplicated:
+            problems.append(f"{tab} has duplicates, e.g. {duplicated[:5]}")
+        if missing:
+            problems.append(f"{tab} is missing rows, e.g. {missing[:5]}")
+
+    if problems:
+        print("FAIL: " + "; ".join(problems))
+        return 1
+    print("OK: every ticket written once per tab")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=120, help="append entries to queue")
+    parser.add_argument("--mode", choices=["before-write", "after-write"], default="before-write",
+                        help="whether the injected failure happens before or after the rows are written")
+    args = parser.parse_args()
+    sys.exit(main(args.tickets, args.mode))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the hot booking queries.
+
+Migrates a throwaway schema to head with Alembic (so the real migration
+indexes are under test), seeds it with realistic volumes, runs EXPLAIN on
+every hot query and exits non-zero if any of them plans a sequential scan on
+bookings or checkin_logs. The schema is dropped afterwards.
+
+    DB_URL=postgresql+psycopg://localhost/eventdaybuddy_dev python scripts/explain_hot_queries.py
+    python scripts/explain_hot_queries.py --dsn ... --bookings 500000 --verbose
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.engine import make_url
+
+from db.models import Booking, CheckinLog
+from db.lookups import _id_expr, _phone_expr, _suffix_filter
+from db.seat_ledger import _leg_column
+
+SCHEMA = "explain_hot_queries"
+WATCHED_TABLES = {"bookings", "checkin_logs"}
+
+EVENTS = 20
+BOATS = 50
+
+
+def hot_queries(event: str, boat: int) -> dict:
+    """name -> SQLAlchemy select, mirroring the handlers that run on every check-in tap."""
+    return {
+        # bot/checkin.py → db/lookups.py tiers
+        "checkin /i exact": select(Booking).where(Booking.event_id == event, _id_expr() == "A0001234"),
+        "checkin /i suffix": select(Booking).where(Booking.event_id == event, _suffix_filter(_id_expr(), "1234")),
+        "checkin /p exact": select(Booking).where(Booking.event_id == event, _phone_expr() == "9607001234"),
+        "checkin /p suffix": select(Booking).where(Booking.event_id == event, _suffix_filter(_phone_expr(), "7001234")),
+        # services/booking_service.py duplicate check, bot/editbooking.py search
+        "booking dedupe": select(Booking).where(Booking.event_id == event, Booking.id_number == "A0001234"),
+        "booking by phone": select(Booking).where(Booking.event_id == event, Booking.phone == "+960 7001234"),
+        "ticket lookup": select(Booking).where(Booking.ticket_ref == "T-1234"),
+        # bot/stats.py
+        "stats bookings": select(Booking).where(
+            Booking.event_id == event, or_(Booking.male_dep.isnot(None), Booking.resort_dep.isnot(None))
+        ),
+        "stats checked in": select(func.count(Booking.id)).where(
+            Booking.event_id == event, Booking.status == "checked_in"
+        ),
+        "stats checkin logs": select(func.count(CheckinLog.id)).where(CheckinLog.booking_id.in_([1, 2, 3, 4, 5])),
+        # utils/pdf_generator.py, utils/idcards.py, bot/departure.py
+        "manifest by boat": select(Booking).where(
+            or_(Booking.arrival_boat_boarded == boat, Booking.departure_boat_boarded == boat),
+            Booking.event_id == event,
+        ),
+        "departure by boat": select(Booking).where(
+            or_(Booking.arrival_boat_boarded == boat, Booking.departure_boat_boarded == boat)
+        ),
+        # db/seat_ledger.py
+        "seat ledger sync": select(func.count(Booking.id)).where(_leg_column("arrival") == boat),
+    }
+
+
+def seed(conn, bookings: int):
+    conn.execute(text("INSERT INTO events (name) SELECT 'Event ' || g FROM generate_series(1, :n) g"), {"n": EVENTS})
+    conn.execute(text(
+        "INSERT INTO boats (boat_number, capacity, status) SELECT g, 40, 'open' FROM generate_series(1, :n) g"
+    ), {"n": BOATS})
+    conn.execute(text("INSERT INTO users (chat_id, role) VALUES ('1', 'admin')"))
+    # ~10% of passengers boarded per leg, spread across boats
+    conn.execute(text("""
+        INSERT INTO bookings (event_id, ticket_ref, name, id_number, phone, male_dep, resort_dep,
+                              status, arrival_boat_boarded, departure_boat_boarded)
+        SELECT 'Event ' || (1 + g % :events), 'T-' || g, 'Guest ' || g,
+               'A' || lpad(g::text, 7, '0'), '+960 ' || (7000000 + g)::text,
+               CASE WHEN g % 3 = 0 THEN '08:00' END, CASE WHEN g % 4 = 0 THEN '17:00' END,
+               (CASE WHEN g % 10 = 0 THEN 'checked_in' ELSE 'booked' END)::booking_status,
+               CASE WHEN g % 10 = 0 THEN 1 + g % :boats END,
+               CASE WHEN g % 10 = 5 THEN 1 + g % :boats END
+        FROM generate_series(1, :n) g
+    """), {"n": bookings, "events": EVENTS, "boats": BOATS})
+    conn.execute(text("""
+        INSERT INTO checkin_logs (booking_id, boat_number, confirmed_by, method)
+        SELECT id, coalesce(arrival_boat_boarded, departure_boat_boarded), '1', 'seed'
+        FROM bookings WHERE status = 'checked_in'
+    """))
+    conn.execute(text("ANALYZE"))
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Relations read with a Seq Scan anywhere in a JSON plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def run(dsn: str, bookings: int, verbose: bool) -> int:
+    admin = create_engine(dsn)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    scoped_url = make_url(dsn).update_query_dict({"options": f"-csearch_path={SCHEMA}"})
+    engine = create_engine(scoped_url)
+    failures = 0
+    try:
+        # migrations/env.py reads DB_URL
+        os.environ["DB_URL"] = scoped_url.render_as_string(hide_password=False)
+        command.upgrade(AlembicConfig(os.path.join(ROOT, "alembic.ini")), "head")
+
+        with engine.begin() as conn:
+            seed(conn, bookings)
+
+        with engine.connect() as conn:
+            for name, stmt in hot_queries("Event 7", 7).items():
+                sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                scans = seq_scans(plan)
+                status = "FAIL" if scans else "ok"
+                failures += bool(scans)
+                print(f"[{status:>4}] {name:<22} {plan['Node Type']}"
+                      + (f"  (seq scan on {', '.join(scans)})" if scans else ""))
+                if verbose or scans:
+                    print(json.dumps(plan, indent=2))
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+    print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} fell back to a sequential scan.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DB_URL"), help="SQLAlchemy URL (defaults to $DB_URL)")
+    parser.add_argument("--bookings", type=int, default=200_000, help="bookings to seed")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: pass --dsn or set DB_URL")
+    sys.exit(run(args.dsn, args.bookings, args.verbose))
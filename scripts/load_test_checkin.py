@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Load-test concurrent check-in taps: blocking sync Session on the event loop vs
+AsyncSession + run_sync (db/init.get_async_db).
+
+Each simulated tap does what /i + "Confirm" does: tiered ID lookup, then a
+locked booking read, seat claim, leg update and check-in log in one transaction.
+A heartbeat task measures how long the event loop was stalled meanwhile, which
+is what every other staff member's update waits on. Runs in a throwaway schema
+that is dropped afterwards, so it is safe against a dev database:
+
+    DB_URL=postgresql+psycopg://... python scripts/load_test_checkin.py
+    python scripts/load_test_checkin.py --dsn postgresql+psycopg://... --taps 500 --concurrency 20,50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models import Base, Booking, CheckinLog
+from db.lookups import find_bookings_by_id
+from db.seat_ledger import claim_seats
+
+SCHEMA = "load_checkin"
+EVENT = "LoadEvent"
+BOAT = 1
+STAFF = "load-test"
+
+
+def seed(engine, bookings: int):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO events (name) VALUES (:name)"), {"name": EVENT})
+        conn.execute(text("INSERT INTO users (chat_id, name, role) VALUES (:c, 'Load', 'admin')"), {"c": STAFF})
+        conn.execute(text("INSERT INTO boats (boat_number, capacity, status) VALUES (:b, :n, 'open')"),
+                     {"b": BOAT, "n": bookings})
+        conn.execute(text("INSERT INTO seat_ledger (boat_number, leg_type, occupied, capacity) "
+                          "VALUES (:b, 'arrival', 0, :n)"), {"b": BOAT, "n": bookings})
+        conn.execute(text("""
+            INSERT INTO bookings (event_id, ticket_ref, name, id_number, phone, status)
+            SELECT :event, 'LOAD-' || g, 'Guest ' || g, 'A' || lpad(g::text, 7, '0'),
+                   '+960 ' || (7000000 + g)::text, 'booked'
+            FROM generate_series(1, :n) AS g
+        """), {"event": EVENT, "n": bookings})
+        conn.execute(text("ANALYZE bookings"))
+
+
+def reset(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM checkin_logs"))
+        conn.execute(text("UPDATE bookings SET arrival_boat_boarded = NULL, status = 'booked', checkin_time = NULL"))
+        conn.execute(text("UPDATE seat_ledger SET occupied = 0"))
+
+
+def tap(db, guest: int):
+    """Sync body of one check-in (same steps as bot/checkin._confirm_boarding_tx)."""
+    found = find_bookings_by_id(db, EVENT, f"A{guest:07d}", limit=1)
+    if not found:
+        return
+    booking = db.query(Booking).filter(Booking.id == found[0].id).with_for_update().first()
+    if booking.arrival_boat_boarded:
+        return
+    claimed, _, _ = claim_seats(db, BOAT, "arrival", 1)
+    if claimed:
+        booking.arrival_boat_boarded = BOAT
+        booking.status = "checked_in"
+        db.add(CheckinLog(booking_id=booking.id, boat_number=BOAT, confirmed_by=STAFF, method="arrival-load"))
+
+
+async def run_mode(mode: str, sync_engine, async_engine, guests: list[int], concurrency: int) -> dict:
+    gate = asyncio.Semaphore(concurrency)
+    latencies, stalls = [], []
+    done = asyncio.Event()
+
+    async def heartbeat(interval=0.01):
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append((time.perf_counter() - t0 - interval) * 1000)
+
+    async def one(guest: int):
+        async with gate:
+            t0 = time.perf_counter()
+            if mode == "sync":
+                # What the handlers did before: blocking DB I/O directly on the loop
+                with Session(sync_engine) as db:
+                    tap(db, guest)
+                    db.commit()
+            else:
+                async with AsyncSession(async_engine) as db:
+                    await db.run_sync(tap, guest)
+                    await db.commit()
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(g) for g in guests))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await beat
+
+    latencies.sort()
+    return {
+        "throughput": len(guests) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "max_stall": max(stalls, default=0.0),
+    }
+
+
+async def run(dsn: str, taps: int, levels: list[int], pool_size: int):
+    admin = create_engine(dsn)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    options = {"options": f"-csearch_path={SCHEMA}"}
+    sync_engine = create_engine(dsn, connect_args=options, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(
+        make_url(dsn).set(drivername="postgresql+psycopg"), connect_args=options, pool_size=pool_size, max_overflow=0
+    )
+    try:
+        Base.metadata.create_all(sync_engine)
+        seed(sync_engine, taps)
+
+        print(f"{'conc':>5} | {'mode':<6} | {'taps/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'max loop stall ms':>17}")
+        print("-" * 68)
+        for concurrency in levels:
+            for mode in ("sync", "async"):
+                reset(sync_engine)
+                guests = random.sample(range(1, taps + 1), taps)
+                r = await run_mode(mode, sync_engine, async_engine, guests, concurrency)
+                print(f"{concurrency:>5} | {mode:<6} | {r['throughput']:>8.1f} | {r['p50']:>8.2f} | "
+                      f"{r['p95']:>8.2f} | {r['max_stall']:>17.1f}")
+            print("-" * 68)
+    finally:
+        await async_engine.dispose()
+        sync_engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DB_URL"), help="SQLAlchemy URL (defaults to $DB_URL)")
+    parser.add_argument("--taps", type=int, default=300, help="check-ins per run (one per seeded booking)")
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrent tap levels")
+    parser.add_argument("--pool-size", type=int, default=10, help="connections per engine")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no database: pass --dsn or set DB_URL")
+    asyncio.run(run(args.dsn, args.taps, [int(c) for c in args.concurrency.split(",")], args.pool_size))
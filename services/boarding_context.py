@@ -0,0 +1,90 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from config.logger import logger
+from db.init import get_db
+from db.models import BoardingSession, Boat, Config
+
+# ===== Boarding Context Snapshot =====
+# Check-in handlers need the active event, the active boarding session and the
+# boat capacity on every tap. These change only through a handful of admin
+# commands (/cpe, /boatready, /editseats, /departed), so we keep an in-process
+# snapshot and let those writers invalidate it.
+
+_lock = threading.Lock()
+_version = 0
+_snapshot = None
+
+
+@dataclass(frozen=True)
+class BoardingContext:
+    """Immutable view of the current boarding state."""
+    version: int
+    event_name: Optional[str]
+    session_id: Optional[int]
+    boat_number: Optional[int]
+    leg_type: Optional[str]
+    capacity: Optional[int]
+
+    @property
+    def has_session(self) -> bool:
+        return self.session_id is not None
+
+    @property
+    def has_event(self) -> bool:
+        return bool(self.event_name)
+
+
+def _load_from_db(version: int) -> BoardingContext:
+    """Build a fresh snapshot from the database (one session, three small queries)."""
+    with get_db() as db:
+        cfg = db.query(Config).filter(Config.key == "active_event").first()
+        event_name = cfg.value.strip() if cfg and cfg.value else None
+
+        session = db.query(BoardingSession).filter(BoardingSession.is_active.is_(True)).first()
+        capacity = None
+        if session:
+            boat = db.query(Boat).filter(Boat.boat_number == session.boat_number).first()
+            capacity = boat.capacity if boat else None
+
+        return BoardingContext(
+            version=version,
+            event_name=event_name,
+            session_id=session.id if session else None,
+            boat_number=session.boat_number if session else None,
+            leg_type=session.leg_type if session else None,
+            capacity=capacity,
+        )
+
+
+def get_boarding_context() -> BoardingContext:
+    """
+    Return the cached boarding context, loading it from DB only after an invalidation.
+    A load that races with an invalidation is returned to its caller but not cached.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None:
+        return snapshot
+
+    with _lock:
+        version = _version
+    fresh = _load_from_db(version)
+
+    with _lock:
+        if _version == version:
+            _snapshot = fresh
+    logger.info(
+        f"[BoardingContext] Loaded v{version}: event={fresh.event_name}, "
+        f"boat={fresh.boat_number}, leg={fresh.leg_type}, capacity={fresh.capacity}"
+    )
+    return fresh
+
+
+def invalidate_boarding_context(reason: str = ""):
+    """Drop the cached snapshot so the next reader reloads it. Call after committing a write."""
+    global _snapshot, _version
+    with _lock:
+        _version += 1
+        _snapshot = None
+    logger.info(f"[BoardingContext] Invalidated (v{_version}){f' — {reason}' if reason else ''}")
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from db.models import BookingGroup
 from config.logger import logger
 
@@ -26,4 +27,23 @@ def get_or_create_group(db: Session, phone: str, event_name: str) -> BookingGrou
         
     except Exception as e:
         logger.error(f"[Group] Failed to get/create group for {phone} in {event_name}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def upsert_groups(db: Session, phones, event_name: str) -> dict[str, int]:
+    """
+    Get or create the groups for many phones in one event with a single
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING. Returns {phone: group_id}.
+    The no-op DO UPDATE makes existing rows come back in RETURNING too.
+    """
+    phones = sorted({p for p in phones if p})
+    if not phones:
+        return {}
+    stmt = pg_insert(BookingGroup).values([{"event_id": event_name, "phone": p} for p in phones])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_booking_groups_event_phone",
+        set_={"phone": stmt.excluded.phone},
+    ).returning(BookingGroup.phone, BookingGroup.id)
+    phone_to_group = {phone: group_id for phone, group_id in db.execute(stmt)}
+    logger.info(f"[Group] Upserted {len(phone_to_group)} groups in event {event_name}")
+    return phone_to_group
@@ -0,0 +1,104 @@
+from decimal import Decimal
+from config.logger import logger
+from db.models import Booking
+
+# ===== Import de-duplication =====
+# Before a bulk import inserts anything, every incoming row is classified against
+# the bookings already in the event (loaded once, as compact key → fingerprint maps):
+#   new        — neither its ticket_ref nor its (event, id_number) exists yet
+#   duplicate  — same passenger already imported with identical details
+#   conflict   — keys exist but details differ, or the keys point at different passengers
+
+# Fields that make two rows "the same booking" for duplicate detection
+_COMPARED_FIELDS = ("name", "phone", "male_dep", "resort_dep", "paid_amount", "transfer_ref", "ticket_type")
+
+# Fields an upsert overwrites on the existing booking (keys and check-in state are kept)
+UPSERT_FIELDS = _COMPARED_FIELDS
+
+
+def _norm(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    return str(value).strip()
+
+
+def fingerprint(row) -> int:
+    """Hash of the compared fields for a parsed row (dict) or a DB tuple in _COMPARED_FIELDS order."""
+    values = [row.get(f) for f in _COMPARED_FIELDS] if isinstance(row, dict) else row
+    return hash(tuple(_norm(v) for v in values))
+
+
+class ImportKeyIndex:
+    """Existing (and already-imported) keys for one event."""
+
+    def __init__(self, event_name: str):
+        self.event_name = event_name
+        self.by_ticket: dict[str, tuple[int, str]] = {}     # ticket_ref -> (booking_id, id_number)
+        self.by_id_number: dict[str, tuple[int, str, int]] = {}  # id_number -> (booking_id, ticket_ref, fingerprint)
+
+    @classmethod
+    def load(cls, db, event_name: str) -> "ImportKeyIndex":
+        """Build the index with a single query over the event's bookings."""
+        index = cls(event_name)
+        rows = db.query(
+            Booking.id, Booking.ticket_ref, Booking.id_number,
+            *(getattr(Booking, f) for f in _COMPARED_FIELDS),
+        ).filter(Booking.event_id == event_name).all()
+        for booking_id, ticket_ref, id_number, *fields in rows:
+            index.add(booking_id, ticket_ref, id_number, fingerprint(fields))
+        logger.info(f"[ImportDedup] Loaded {len(rows)} existing keys for event '{event_name}'")
+        return index
+
+    def add(self, booking_id, ticket_ref: str, id_number: str, fp: int):
+        id_number = (id_number or "").strip().upper()
+        if ticket_ref:
+            self.by_ticket[ticket_ref] = (booking_id, id_number)
+        if id_number:
+            self.by_id_number[id_number] = (booking_id, ticket_ref, fp)
+
+    def refresh(self, id_number: str, fp: int):
+        """Record new details for an existing ID (after an upsert)."""
+        booking_id, ticket_ref, _ = self.by_id_number[id_number]
+        self.by_id_number[id_number] = (booking_id, ticket_ref, fp)
+
+    def partition(self, rows: list[dict], foreign_tickets: set = frozenset()) -> dict:
+        """
+        Split parsed rows into {"new": [...], "duplicate": [...], "conflict": [...]}.
+        Conflicts are (row, booking_id_or_None, reason); booking_id is set only when the
+        row clearly targets one existing booking and could be upserted onto it.
+        foreign_tickets are ticket refs already used by other events.
+        """
+        buckets = {"new": [], "duplicate": [], "conflict": []}
+        for row in rows:
+            ticket_ref = row.get("ticket_ref") or ""
+            id_number = row["id_number"]
+            by_ticket = self.by_ticket.get(ticket_ref) if ticket_ref else None
+            by_id = self.by_id_number.get(id_number)
+
+            if ticket_ref in foreign_tickets:
+                buckets["conflict"].append((row, None, f"ticket {ticket_ref} belongs to another event"))
+            elif by_ticket and by_ticket[1] != id_number:
+                buckets["conflict"].append((row, None, f"ticket {ticket_ref} belongs to ID {by_ticket[1]}"))
+            elif by_id and ticket_ref and by_id[1] != ticket_ref:
+                buckets["conflict"].append((row, None, f"ID {id_number} already has ticket {by_id[1]}"))
+            elif by_id:
+                if by_id[2] == fingerprint(row):
+                    buckets["duplicate"].append(row)
+                else:
+                    buckets["conflict"].append((row, by_id[0], f"ID {id_number} exists with different details"))
+            else:
+                buckets["new"].append(row)
+                # Reserve the keys so a repeat later in the same file is caught
+                self.add(None, ticket_ref, id_number, fingerprint(row))
+        return buckets
+
+
+def find_foreign_tickets(db, event_name: str, rows: list[dict]) -> set:
+    """Ticket refs in rows that already exist under another event (ticket_ref is globally unique)."""
+    refs = {row["ticket_ref"] for row in rows if row.get("ticket_ref")}
+    if not refs:
+        return set()
+    found = db.query(Booking.ticket_ref).filter(Booking.ticket_ref.in_(refs), Booking.event_id != event_name).all()
+    return {ref for (ref,) in found}
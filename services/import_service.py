@@ -1,12 +1,21 @@
 from config.logger import logger, log_and_raise
-from utils.booking_parser import parse_bookings_file
+from config.envs import IMPORT_CHUNK_SIZE, BULK_INSERT_CHUNK_SIZE
+from utils.booking_parser import iter_booking_chunks
 from utils.import_summary import format_import_summary
-from db import booking_ops
+from sqlalchemy import update as sa_update
+from db.bulk_insert import insert_bookings
 from db.init import get_db
 from db.models import Booking, Event, Config
-from sheets import booking_io
+from services.sheets_outbox import enqueue_append, enqueue_update
+from services.import_dedup import (
+    ImportKeyIndex, find_foreign_tickets, fingerprint, UPSERT_FIELDS,
+)
+from services.group_service import upsert_groups
 from utils.booking_schema import build_master_row  # use canonical builder
 
+_MISSING_PHOTO_PREVIEW = 10
+_CONFLICT_PREVIEW = 10
+
 
 def _map_rows_for_sheets(valid_rows: list[dict], event_name: str) -> list[list]:
     """Convert parsed booking dicts into row lists aligned with MASTER_HEADERS."""
@@ -34,10 +43,29 @@ def _map_rows_for_sheets(valid_rows: list[dict], event_name: str) -> list[list]:
     return rows
 
 
-def run_bulk_import(file_bytes: bytes, triggered_by: str, event_name: str = None) -> dict:
+def _apply_upserts(db, rows_and_ids: list[tuple[dict, int]], event_name: str) -> list[int]:
+    """Overwrite existing bookings with the incoming details (one executemany UPDATE)."""
+    if not rows_and_ids:
+        return []
+    phone_to_group = upsert_groups(db, (row.get("phone") for row, _ in rows_and_ids), event_name)
+    db.execute(sa_update(Booking), [
+        {
+            "id": booking_id,
+            **{field: row.get(field) for field in UPSERT_FIELDS},
+            "group_id": phone_to_group.get(row.get("phone")),
+        }
+        for row, booking_id in rows_and_ids
+    ])
+    return [booking_id for _, booking_id in rows_and_ids]
+
+
+def run_bulk_import(source, triggered_by: str, event_name: str = None, filename: str = "", upsert: bool = False) -> dict:
     """
-    Orchestrates bulk import of bookings from a CSV/XLS file.
-    Ensures bookings are tied to the active Event row in DB.
+    Orchestrates bulk import of bookings from a CSV/XLSX file (bytes or binary file object).
+    Ensures bookings are tied to the active Event row in DB. Rows are streamed and
+    committed chunk by chunk, so a failure keeps the chunks committed before it.
+    Rows already in the event are skipped as duplicates; rows whose details changed
+    are reported as conflicts, or overwritten when upsert=True.
     """
     try:
         # Step 0: Resolve active event
@@ -56,86 +84,134 @@ def run_bulk_import(file_bytes: bytes, triggered_by: str, event_name: str = None
 
             event_name = event.name
 
-        # Step 1: Parse file
-        valid_rows, errors = parse_bookings_file(file_bytes)
-        logger.info(f"[Import] Parsed {len(valid_rows)} valid rows, {len(errors)} errors")
-
-        if not valid_rows:
-            return {
-                "inserted": 0,
-                "skipped": len(errors),
-                "errors": errors or ["No valid rows found"],
-                "missing_photos": []
-            }
-
-        # Step 2: Insert into DB (atomic transaction)
-        inserted_ids = booking_ops.bulk_insert_bookings(valid_rows, triggered_by, event_name=event_name)
-        logger.info(f"[Import] Inserted {len(inserted_ids)} bookings into DB for event '{event_name}'")
-
-        # Step 2.5: Fetch authoritative records back from DB
+        # Step 1: Load existing keys for the event once (single query)
         with get_db() as db:
-            inserted_bookings = db.query(Booking).filter(Booking.id.in_(inserted_ids)).all()
-            booking_dicts = []
-            for b in inserted_bookings:
-                booking_dicts.append({
-                    "ticket_ref": b.ticket_ref,
-                    "name": b.name,
-                    "id_number": b.id_number,
-                    "phone": b.phone,
-                    "male_dep": b.male_dep,
-                    "resort_dep": b.resort_dep,
-                    "arrival_time": b.arrival_time,
-                    "departure_time": b.departure_time,
-                    "paid_amount": b.paid_amount,
-                    "transfer_ref": b.transfer_ref,
-                    "ticket_type": b.ticket_type,
-                    "status": b.status,
-                    "id_doc_url": b.id_doc_url,
-                    "group_id": b.group_id,
-                    "created_at": b.created_at,
-                    "updated_at": b.updated_at,
-                })
-
-        # Step 3: Append to Sheets
-        sheet_rows = _map_rows_for_sheets(booking_dicts, event_name)
-        booking_io.bulk_append_bookings(event_name, sheet_rows)
-        logger.info(f"[Import] Appended {len(sheet_rows)} bookings to Sheets for event '{event_name}'")
-
-        # Step 4: Collect missing photos
-        missing_photos = [row["id_number"] for row in booking_dicts if row.get("id_number")]
-
-        # Step 5: Build result object
-        result = {
-            "inserted": len(valid_rows),
-            "skipped": len(errors),
-            "errors": errors,
+            key_index = ImportKeyIndex.load(db, event_name)
+
+        # Step 2-4 per chunk: parse → dedup → insert/upsert → queue Sheets → commit,
+        # so memory stays bounded by IMPORT_CHUNK_SIZE whatever the file size
+        inserted, updated, duplicates, skipped, chunks = 0, 0, 0, 0, 0
+        errors, conflicts, missing_photos = [], [], []
+        conflict_count = 0
+        for valid_rows, chunk_errors in iter_booking_chunks(source, filename, IMPORT_CHUNK_SIZE):
+            errors.extend(chunk_errors)
+            skipped += len(chunk_errors)
+            if not valid_rows:
+                continue
+
+            with get_db() as db:
+                buckets = key_index.partition(valid_rows, find_foreign_tickets(db, event_name, valid_rows))
+                duplicates += len(buckets["duplicate"])
+
+                to_update = [(row, booking_id) for row, booking_id, _ in buckets["conflict"] if upsert and booking_id]
+                for row, booking_id, reason in buckets["conflict"]:
+                    if upsert and booking_id:
+                        continue
+                    conflict_count += 1
+                    if len(conflicts) < _CONFLICT_PREVIEW:
+                        conflicts.append(f"{row['name']} ({row['id_number']}): {reason}")
+
+                new_rows = buckets["new"]
+                inserted_ids = insert_bookings(db, new_rows, event_name, chunk_size=BULK_INSERT_CHUNK_SIZE)
+                updated_ids = _apply_upserts(db, to_update, event_name)
+                for row, _ in to_update:
+                    key_index.refresh(row["id_number"], fingerprint(row))
+
+                # Fetch authoritative records back (ticket refs, group IDs, timestamps)
+                inserted_bookings = db.query(Booking).filter(Booking.id.in_(inserted_ids)).order_by(Booking.id).all()
+                booking_dicts = [
+                    {
+                        "ticket_ref": b.ticket_ref,
+                        "name": b.name,
+                        "id_number": b.id_number,
+                        "phone": b.phone,
+                        "male_dep": b.male_dep,
+                        "resort_dep": b.resort_dep,
+                        "arrival_time": b.arrival_time,
+                        "departure_time": b.departure_time,
+                        "paid_amount": b.paid_amount,
+                        "transfer_ref": b.transfer_ref,
+                        "ticket_type": b.ticket_type,
+                        "status": b.status,
+                        "id_doc_url": b.id_doc_url,
+                        "group_id": b.group_id,
+                        "created_at": b.created_at,
+                        "updated_at": b.updated_at,
+                    }
+                    for b in inserted_bookings
+                ]
+
+                # Sheets writes are queued in the same transaction and flushed by the outbox worker
+                if booking_dicts:
+                    enqueue_append(db, event_name, _map_rows_for_sheets(booking_dicts, event_name))
+                for b in db.query(Booking).filter(Booking.id.in_(updated_ids)).all():
+                    enqueue_update(db, event_name, build_master_row(b, event_name))
+                db.commit()
+
+            chunks += 1
+            inserted += len(inserted_ids)
+            updated += len(updated_ids)
+            missing_count = len(missing_photos)
+            missing_photos.extend(
+                row["id_number"] for row in booking_dicts[:max(_MISSING_PHOTO_PREVIEW - missing_count, 0)]
+            )
+            logger.info(
+                f"[Import] Chunk {chunks}: {len(inserted_ids)} new, {len(updated_ids)} updated, "
+                f"{len(buckets['duplicate'])} duplicate, {len(buckets['conflict']) - len(to_update)} conflicting "
+                f"(total inserted {inserted}) for '{event_name}' by {triggered_by}"
+            )
+
+        logger.info(
+            f"[Import] Imported {inserted} new, {updated} updated, {duplicates} duplicates, "
+            f"{conflict_count} conflicts in {chunks} chunks, {skipped} rows skipped"
+        )
+
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "duplicates": duplicates,
+            "conflicts": conflict_count,
+            "conflict_details": conflicts,
+            "skipped": skipped,
+            "errors": errors or ([] if inserted or updated or duplicates or conflict_count else ["No valid rows found"]),
             "missing_photos": missing_photos,
+            "missing_photos_count": inserted,  # imported bookings never carry a photo yet
         }
 
-        return result
-
     except Exception as e:
         log_and_raise("ImportService", "running bulk import", e)
 
 def summarize_import(result: dict) -> str:
     """
     Build a human-readable summary of the bulk import result.
-    Expected result keys: inserted, errors, skipped, missing_photos.
+    Expected result keys: inserted, updated, duplicates, conflicts, conflict_details,
+    errors, skipped, missing_photos, missing_photos_count.
     """
     inserted = result.get("inserted", 0)
+    updated = result.get("updated", 0)
+    duplicates = result.get("duplicates", 0)
+    conflicts = result.get("conflicts", 0)
     errors = result.get("errors", 0)
     skipped = result.get("skipped", 0)
     missing_photos = result.get("missing_photos", [])
+    missing_count = result.get("missing_photos_count", len(missing_photos))
 
     parts = [f"✅ Inserted: {inserted}"]
+    if updated:
+        parts.append(f"🔁 Updated: {updated}")
+    if duplicates:
+        parts.append(f"♻️ Already imported: {duplicates}")
+    if conflicts:
+        parts.append(f"⚔️ Conflicts: {conflicts} (re-run with 'upsert' to overwrite changed details)")
+        parts.extend(f"   • {c}" for c in result.get("conflict_details", [])[:3])
     if skipped:
         parts.append(f"⚠️ Skipped: {skipped}")
     if errors:
         # if errors is a list, show count
         parts.append(f"❌ Errors: {errors if isinstance(errors, int) else len(errors)}")
-    if missing_photos:
+    if missing_count:
         preview = ", ".join(missing_photos[:3])
-        more = f" (+{len(missing_photos)-3} more)" if len(missing_photos) > 3 else ""
-        parts.append(f"🖼 Missing Photos: {len(missing_photos)} [{preview}{more}]")
+        more = f" (+{missing_count-3} more)" if missing_count > 3 else ""
+        parts.append(f"🖼 Missing Photos: {missing_count} [{preview}{more}]")
 
     return "\n".join(parts)
\ No newline at end of file
@@ -0,0 +1,101 @@
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from config.logger import logger
+from db.models import Booking, ManifestEntry
+from db.seat_ledger import _leg_column
+
+# ===== Manifest Projection =====
+# Check-in appends one manifest_entries row per boarded passenger and leg, in the
+# same transaction as the booking update. Manifests (/manifest, /departed PDFs,
+# exports) read the boat's entries in boarding order instead of scanning bookings.
+# Passenger details are joined from bookings by primary key, so edits show up.
+
+
+def record_boarding(db: Session, boat_number: int, leg_type: str, booking_ids, boarded_at=None) -> int:
+    """Append boarded passengers to a boat/leg manifest (re-recording is a no-op)."""
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return 0
+    stmt = pg_insert(ManifestEntry).values([
+        {"boat_number": boat_number, "leg_type": leg_type, "booking_id": booking_id, "boarded_at": boarded_at}
+        for booking_id in booking_ids
+    ]).on_conflict_do_nothing(constraint="uq_manifest_boat_leg_booking")
+    db.execute(stmt)
+    return len(booking_ids)
+
+
+def remove_boarding(db: Session, booking_id: int, leg_type: str = None):
+    """Drop a passenger from manifests (all legs unless leg_type is given), e.g. on /resetbooking."""
+    stmt = delete(ManifestEntry).where(ManifestEntry.booking_id == booking_id)
+    if leg_type:
+        stmt = stmt.where(ManifestEntry.leg_type == leg_type)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def rebuild_manifest(db: Session, boat_number: int, leg_type: str) -> int:
+    """
+    Reconcile a boat/leg manifest from the bookings table (runs once per /boatready,
+    like sync_seat_ledger). Missing passengers are appended, stale entries removed.
+    """
+    leg_column = _leg_column(leg_type)
+    boarded = db.query(Booking.id, Booking.checkin_time).filter(leg_column == boat_number) \
+        .order_by(Booking.checkin_time.nullsfirst(), Booking.id).all()
+    db.execute(
+        delete(ManifestEntry)
+        .where(
+            ManifestEntry.boat_number == boat_number,
+            ManifestEntry.leg_type == leg_type,
+            ManifestEntry.booking_id.notin_([booking_id for booking_id, _ in boarded] or [0]),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if boarded:
+        db.execute(pg_insert(ManifestEntry).values([
+            {"boat_number": boat_number, "leg_type": leg_type, "booking_id": booking_id, "boarded_at": checkin_time}
+            for booking_id, checkin_time in boarded
+        ]).on_conflict_do_nothing(constraint="uq_manifest_boat_leg_booking"))
+    logger.info(f"[Manifest] Rebuilt boat {boat_number} {leg_type}: {len(boarded)} passengers")
+    return len(boarded)
+
+
+def load_manifest(db: Session, boat_number: int, event_name: str = None, leg_type: str = None) -> list[dict]:
+    """
+    Passengers on a boat in boarding order, as dicts for the manifest and ID card
+    renderers. Without leg_type, a passenger boarded on both legs is listed once.
+    """
+    q = (
+        db.query(ManifestEntry.leg_type, ManifestEntry.boarded_at, Booking)
+        .join(Booking, Booking.id == ManifestEntry.booking_id)
+        .filter(ManifestEntry.boat_number == boat_number)
+    )
+    if leg_type:
+        q = q.filter(ManifestEntry.leg_type == leg_type)
+    if event_name:
+        q = q.filter(Booking.event_id == event_name)
+
+    rows, seen = [], set()
+    for leg, boarded_at, b in q.order_by(ManifestEntry.id):
+        if b.id in seen:
+            continue
+        seen.add(b.id)
+        rows.append({
+            "Name": b.name,
+            "ID": b.id_number,
+            "Number": b.phone,
+            "TicketRef": b.ticket_ref,
+            "ArrivalBoatBoarded": b.arrival_boat_boarded,
+            "DepartureBoatBoarded": b.departure_boat_boarded,
+            "ID Doc URL": b.id_doc_url,
+            "Leg": leg,
+            "BoardedAt": boarded_at,
+            "UpdatedAt": b.updated_at,
+        })
+    return rows
+
+
+def manifest_counts(db: Session, boat_number: int) -> dict:
+    """{leg_type: passengers} for a boat, straight from the projection."""
+    counts = db.query(ManifestEntry.leg_type, func.count(ManifestEntry.id)) \
+        .filter(ManifestEntry.boat_number == boat_number).group_by(ManifestEntry.leg_type).all()
+    return {leg: count for leg, count in counts}
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from config.logger import logger
+from config.envs import RENDER_WORKERS
+from utils.pdf_generator import load_manifest_rows, render_manifest_pdf
+from utils.idcards import load_idcard_rows, prefetch_idcard_photos, render_idcards_pdf
+from utils.pdf_cache import pdf_cache, pdf_cache_key
+
+# ===== PDF Render Pool =====
+# ReportLab rendering is CPU-bound and would freeze the event loop (and every other
+# staff member's check-in) if run inline. Data loading and photo downloads stay in
+# threads of this process; the render functions themselves are pure and run in a
+# small spawn-based process pool, manifest and ID cards in parallel. Rendered PDFs
+# go through the content-addressed pdf_cache, so unchanged documents are not redrawn.
+
+RenderedPdf = namedtuple("RenderedPdf", ["pdf", "key", "cached"])
+
+_pool = None
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: workers must not inherit the parent's DB connections or event loop
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"[Render] Process pool started with {RENDER_WORKERS} workers")
+    return _pool
+
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        logger.info("[Render] Process pool stopped")
+
+
+async def render_manifest(boat_number: int, event_name: str = None) -> RenderedPdf:
+    """Manifest PDF from the manifest projection: local cache hit, or rendered off the event loop."""
+    rows = await asyncio.to_thread(load_manifest_rows, boat_number, event_name)
+    key = pdf_cache_key("manifest", event_name, boat_number, rows)
+    pdf = await asyncio.to_thread(pdf_cache.get, key)
+    if pdf is not None:
+        return RenderedPdf(pdf, key, True)
+
+    pdf = await asyncio.get_running_loop().run_in_executor(
+        get_render_pool(), render_manifest_pdf, boat_number, event_name, rows
+    )
+    await asyncio.to_thread(pdf_cache.put, key, pdf)
+    return RenderedPdf(pdf, key, False)
+
+
+async def render_idcards(boat_number: int, event_name: str = None) -> RenderedPdf:
+    """ID cards PDF: local cache hit (no photo downloads), or prefetched and rendered off the event loop."""
+    rows = await asyncio.to_thread(load_idcard_rows, boat_number, event_name)
+    key = pdf_cache_key("idcards", event_name, boat_number, rows)
+    pdf = await asyncio.to_thread(pdf_cache.get, key)
+    if pdf is not None:
+        return RenderedPdf(pdf, key, True)
+
+    photos = await asyncio.to_thread(prefetch_idcard_photos, rows)
+    # Failed downloads render as "Photo Error"; send None rather than pickling the exception
+    photos = {path: data if isinstance(data, bytes) else None for path, data in photos.items()}
+    pdf = await asyncio.get_running_loop().run_in_executor(
+        get_render_pool(), render_idcards_pdf, boat_number, event_name, rows, photos
+    )
+    if pdf:
+        await asyncio.to_thread(pdf_cache.put, key, pdf)
+    return RenderedPdf(pdf, key, False)
+
+
+async def render_departure_pdfs(boat_number: int, event_name: str = None) -> tuple:
+    """
+    Produce (manifest, idcards) RenderedPdf results for a boat off the event loop.
+    Either item is None if that document failed; errors are logged, not raised.
+    """
+    manifest, idcards = await asyncio.gather(
+        render_manifest(boat_number, event_name), render_idcards(boat_number, event_name), return_exceptions=True
+    )
+    if isinstance(manifest, BaseException):
+        logger.error(f"[Render] Manifest PDF failed for Boat {boat_number}: {manifest}")
+        manifest = None
+    if isinstance(idcards, BaseException) or (idcards and not idcards.pdf):
+        logger.error(f"[Render] ID cards PDF failed for Boat {boat_number}: {idcards}")
+        idcards = None
+    return manifest, idcards
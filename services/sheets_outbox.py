@@ -0,0 +1,286 @@
+import asyncio
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from config.logger import logger
+from config.envs import (
+    DRY_RUN,
+    SHEETS_OUTBOX_POLL_INTERVAL,
+    SHEETS_OUTBOX_BATCH_SIZE,
+    SHEETS_OUTBOX_MAX_ATTEMPTS,
+)
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased
+from db.init import get_db
+from db.models import SheetsOutbox
+from utils.booking_schema import MASTER_HEADERS
+from utils.timezone import get_maldives_time
+
+# ===== Sheets Outbox =====
+# Handlers never call the Sheets API directly. They add an outbox row in the same
+# DB transaction as their booking change; a background worker drains the outbox,
+# coalesces repeated writes to the same ticket and flushes them in batches.
+
+_TICKET_IDX = MASTER_HEADERS.index("TicketRef")
+_PHOTO_IDX = MASTER_HEADERS.index("ID Doc URL")
+_STALE_CLAIM = timedelta(minutes=10)
+
+_worker_task = None
+
+
+def _jsonable(value):
+    """Make a sheet cell JSON-safe (datetimes → ISO strings, Decimals → str)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _row_payload(master_row: list) -> list:
+    return [_jsonable(v) for v in master_row]
+
+
+# ===== Enqueue (call inside the handler's DB transaction) =====
+
+def enqueue_append(db, event_name: str, master_rows: list[list]):
+    """Queue new bookings to be appended to Master and the event tab."""
+    if DRY_RUN:
+        return
+    db.add_all([
+        SheetsOutbox(
+            event_name=event_name,
+            ticket_ref=str(row[_TICKET_IDX]),
+            op="append",
+            payload={"master_row": _row_payload(row)},
+            status="pending",
+            attempts=0,
+        )
+        for row in master_rows
+    ])
+
+
+def enqueue_update(db, event_name: str, master_row: list):
+    """Queue a full-row rewrite of an existing booking in Master and the event tab."""
+    if DRY_RUN:
+        return
+    db.add(SheetsOutbox(
+        event_name=event_name,
+        ticket_ref=str(master_row[_TICKET_IDX]),
+        op="update",
+        payload={"master_row": _row_payload(master_row)},
+        status="pending",
+        attempts=0,
+    ))
+
+
+def enqueue_photo(db, event_name: str, ticket_ref: str, photo_url: str):
+    """Queue an ID Doc URL change for a booking."""
+    if DRY_RUN:
+        return
+    db.add(SheetsOutbox(
+        event_name=event_name,
+        ticket_ref=str(ticket_ref),
+        op="photo",
+        payload={"photo_url": photo_url},
+        status="pending",
+        attempts=0,
+    ))
+
+
+# ===== Drain =====
+
+def _coalesce(entries: list) -> dict:
+    """
+    Collapse outbox entries per (event, ticket) into the minimal set of writes:
+    appends carry the latest row, later updates replace earlier ones, and a photo
+    change is folded into any row written after it.
+    "retry" marks an append that was attempted before, so its rows may already be in the sheet.
+    Returns {(event_name, ticket_ref): {"append": bool, "retry": bool, "row": list|None, "photo": str|None, "ids": [...]}}.
+    """
+    plans = {}
+    for entry in sorted(entries, key=lambda e: e.id):
+        plan = plans.setdefault(
+            (entry.event_name, entry.ticket_ref),
+            {"append": False, "retry": False, "row": None, "photo": None, "ids": []},
+        )
+        plan["ids"].append(entry.id)
+        if entry.op == "append":
+            plan["append"] = True
+            plan["retry"] = plan["retry"] or bool(entry.attempts)
+            plan["row"] = list(entry.payload["master_row"])
+        elif entry.op == "update":
+            plan["row"] = list(entry.payload["master_row"])
+            plan["photo"] = None  # the full row already carries the current photo URL
+        elif entry.op == "photo":
+            if plan["row"] is not None:
+                plan["row"][_PHOTO_IDX] = entry.payload["photo_url"]
+            else:
+                plan["photo"] = entry.payload["photo_url"]
+    return plans
+
+
+def _flush(plans: dict) -> tuple[list[int], dict[int, str]]:
+    """
+    Push coalesced plans to Sheets through a SheetsBatch, flushing whenever its size
+    or age threshold trips. Returns (done_ids, {failed_id: error}).
+
+    When a flush fails, append entries whose rows landed in both Master and the
+    event tab are still marked done; only the rest are retried, and retried appends
+    check the tabs first so rows written by a half-failed flush aren't added twice.
+    """
+    from sheets.manager import SheetsBatch, SheetsBatchError
+
+    done, failed = [], {}
+    batch = SheetsBatch()
+    append_ids, update_ids = {}, []   # (event_name, ticket_ref) -> ids, [ids]
+
+    def _flush_batch():
+        try:
+            batch.flush()
+            done.extend(i for ids in append_ids.values() for i in ids)
+            done.extend(update_ids)
+        except Exception as e:
+            landed = e.landed if isinstance(e, SheetsBatchError) else set()
+            retry = list(update_ids)
+            for key, ids in append_ids.items():
+                (done if key in landed else retry).extend(ids)
+            for i in retry:
+                failed[i] = str(e)[:500]
+        append_ids.clear()
+        update_ids.clear()
+
+    for (event_name, ticket_ref), plan in plans.items():
+        if plan["append"]:
+            batch.append(event_name, plan["row"], retry=plan["retry"])
+            # An appended plan writes the latest row, so its update/photo entries ride along
+            append_ids[(event_name, str(ticket_ref).strip())] = plan["ids"]
+        else:
+            if plan["row"] is not None:
+                batch.update_row(event_name, plan["row"])
+            elif plan["photo"] is not None:
+                batch.update_photo(event_name, ticket_ref, plan["photo"])
+            update_ids.extend(plan["ids"])
+        if batch.due():
+            _flush_batch()
+    _flush_batch()
+
+    return done, failed
+
+
+def drain_outbox_once() -> int:
+    """
+    Claim a batch of pending entries, flush them to Sheets and record the outcome.
+    Blocking — run it off the event loop. Returns the number of entries processed.
+    """
+    now = get_maldives_time()
+
+    # Claim: mark a batch as processing and commit, so no DB transaction spans Sheets I/O
+    with get_db() as db:
+        # Recover entries left in "processing" by a crashed worker. Counting it as an
+        # attempt makes a recovered append check the sheet before writing again.
+        db.query(SheetsOutbox).filter(
+            SheetsOutbox.status == "processing",
+            SheetsOutbox.updated_at < now - _STALE_CLAIM,
+        ).update({"status": "pending", "attempts": SheetsOutbox.attempts + 1}, synchronize_session=False)
+
+        # Per-ticket order: an entry waits while an older one for the same ticket is
+        # in flight or backing off, so a retried stale row can't overwrite a newer one
+        older = aliased(SheetsOutbox)
+        blocked = (
+            db.query(older.id)
+            .filter(
+                older.event_name == SheetsOutbox.event_name,
+                older.ticket_ref == SheetsOutbox.ticket_ref,
+                older.id < SheetsOutbox.id,
+                or_(
+                    older.status == "processing",
+                    and_(older.status == "pending", older.available_at > now),
+                ),
+            )
+            .exists()
+        )
+        entries = (
+            db.query(SheetsOutbox)
+            .filter(SheetsOutbox.status == "pending", SheetsOutbox.available_at <= now, ~blocked)
+            .order_by(SheetsOutbox.id)
+            .limit(SHEETS_OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not entries:
+            return 0
+        for entry in entries:
+            entry.status = "processing"
+            entry.updated_at = now
+        db.commit()
+
+    plans = _coalesce(entries)
+    done, failed = _flush(plans)
+
+    with get_db() as db:
+        if done:
+            db.query(SheetsOutbox).filter(SheetsOutbox.id.in_(done)).update(
+                {"status": "done", "last_error": None}, synchronize_session=False
+            )
+        for entry in entries:
+            if entry.id not in failed:
+                continue
+            attempts = entry.attempts + 1
+            backoff = timedelta(seconds=min(2 ** attempts, 300))
+            db.query(SheetsOutbox).filter(SheetsOutbox.id == entry.id).update({
+                "status": "failed" if attempts >= SHEETS_OUTBOX_MAX_ATTEMPTS else "pending",
+                "attempts": attempts,
+                "last_error": failed[entry.id],
+                "available_at": get_maldives_time() + backoff,
+            }, synchronize_session=False)
+
+    logger.info(
+        f"[Outbox] Flushed {len(entries)} entries as {len(plans)} ticket writes "
+        f"({len(done)} done, {len(failed)} failed)"
+    )
+    return len(entries)
+
+
+def outbox_stats() -> dict:
+    """Counts of outbox entries per status."""
+    from sqlalchemy import func
+    with get_db() as db:
+        rows = db.query(SheetsOutbox.status, func.count(SheetsOutbox.id)).group_by(SheetsOutbox.status).all()
+    return {status: count for status, count in rows}
+
+
+# ===== Background worker =====
+
+async def _worker_loop():
+    logger.info("[Outbox] Sheets outbox worker started.")
+    while True:
+        try:
+            processed = await asyncio.to_thread(drain_outbox_once)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Outbox] Drain failed: {e}", exc_info=True)
+            processed = 0
+        if not processed:
+            await asyncio.sleep(SHEETS_OUTBOX_POLL_INTERVAL)
+
+
+def start_outbox_worker():
+    """Start the background drain task on the running event loop (idempotent)."""
+    global _worker_task
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.get_running_loop().create_task(_worker_loop())
+    return _worker_task
+
+
+async def stop_outbox_worker():
+    """Cancel the drain task and wait for it to exit."""
+    global _worker_task
+    if _worker_task and not _worker_task.done():
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+    _worker_task = None
+    logger.info("[Outbox] Sheets outbox worker stopped.")
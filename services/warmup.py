@@ -0,0 +1,60 @@
+import asyncio
+import time
+from config.logger import logger
+
+# ===== Startup warm-up =====
+# External clients are created lazily, so nothing touches the network at import.
+# FastAPI startup calls warm_up() to build them concurrently, so the first staff
+# request doesn't pay for it. Sheets or Supabase failures are logged and retried
+# lazily on first use; the database and the bot are essential (see web/server.py).
+
+_timings = {}
+
+
+def _init_sheets():
+    from sheets.client import get_service
+
+    get_service()
+
+
+def _init_supabase():
+    from utils.supabase_storage import get_supabase
+
+    get_supabase()
+
+
+async def _timed(name: str, coro):
+    started = time.perf_counter()
+    try:
+        await coro
+        _timings[name] = {"ok": True, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        _timings[name] = {"ok": False, "ms": round((time.perf_counter() - started) * 1000, 1), "error": str(e)}
+        logger.warning(f"[Startup] Warm-up of {name} failed: {e}")
+
+
+async def warm_up(*extra) -> dict:
+    """
+    Connect the DB (create tables, open the async pool) and build the Sheets and
+    Supabase clients concurrently, alongside any extra (name, coroutine) pairs
+    such as the bot initialization. Returns per-component timings.
+    """
+    from db.init import init_db, warm_up_async_db
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        _timed("db", asyncio.to_thread(init_db)),
+        _timed("db_async", warm_up_async_db()),
+        _timed("sheets", asyncio.to_thread(_init_sheets)),
+        _timed("supabase", asyncio.to_thread(_init_supabase)),
+        *(_timed(name, coro) for name, coro in extra),
+    )
+    _timings["total"] = {"ok": all(t["ok"] for t in _timings.values()),
+                         "ms": round((time.perf_counter() - started) * 1000, 1)}
+    logger.info(f"[Startup] Warm-up finished in {_timings['total']['ms']} ms: "
+                + ", ".join(f"{k}={v['ms']}ms{'' if v['ok'] else ' (failed)'}" for k, v in _timings.items()))
+    return dict(_timings)
+
+
+def warmup_stats() -> dict:
+    return dict(_timings)
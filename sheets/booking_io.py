@@ -1,8 +1,19 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
 from config.logger import logger, log_and_raise
-from .client import service, SPREADSHEET_ID
+from config.envs import (
+    SHEETS_BATCH_MAX_OPS,
+    SHEETS_BATCH_MAX_AGE,
+    SHEETS_APPEND_CHUNK_ROWS,
+    SHEETS_APPEND_MAX_RETRIES,
+)
+from .client import get_service, SPREADSHEET_ID, get_thread_service
+from .throttle import write_limiter
 from .constants import MASTER_TAB, MASTER_HEADERS, EVENT_HEADERS, ROW_FETCH_LIMIT
-from .validators import validate_sheet_alignment
+from .validators import validate_sheet_alignment, invalidate_alignment_cache
+from .row_index import record_append, get_row, get_rows, invalidate_row_index
 from utils.booking_schema import build_event_row
 
 
@@ -17,13 +28,134 @@ def excel_col(n: int) -> str:
     return result
 
 
+def _reset_tab_caches(*tabs: str):
+    """After a failed write, distrust memoized headers and row positions for these tabs."""
+    for tab in tabs:
+        invalidate_alignment_cache(tab)
+        invalidate_row_index(tab)
+
+
+# --- Chunked parallel appends ---
+# Large appends are split into bounded payloads. Each tab is a lane whose chunks
+# go out in order; lanes (Master, event tabs) run concurrently, each thread with
+# its own API client, all sharing the write-quota limiter.
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_MAX_APPEND_LANES = 4
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, HttpError):
+        return e.resp.status in _RETRYABLE_STATUS
+    return isinstance(e, (TimeoutError, ConnectionError, OSError))
+
+
+class AppendLanesError(Exception):
+    """
+    An append lane gave up. `landed` is {tab: set of ticket refs} known to be in
+    each tab (including rows written by lanes or chunks that succeeded), so the
+    caller retries only what is missing.
+    """
+
+    def __init__(self, error: Exception, landed: dict[str, set]):
+        super().__init__(str(error))
+        self.landed = landed
+        self.__cause__ = error
+
+
+def _missing_rows(client, tab: str, values: list[list], ticket_refs: list[str], ticket_col: int):
+    """Drop rows whose ticket is already in the tab. Returns (values, ticket_refs) still to send."""
+    landed = get_rows(tab, ticket_refs, ticket_col, client)
+    keep = [i for i, ref in enumerate(ticket_refs) if str(ref).strip() not in landed]
+    return [values[i] for i in keep], [ticket_refs[i] for i in keep]
+
+
+def _append_chunk(client, tab: str, values: list[list], ticket_refs: list[str], ticket_col: int,
+                  verify_first: bool = False) -> int:
+    """
+    Append one chunk with per-chunk retries. Returns the number of append requests sent.
+    verify_first checks the tab before the first attempt too: set it when an earlier
+    call (e.g. a previous outbox drain) may already have written some of these rows.
+    """
+    sent = 0
+    for attempt in range(1, SHEETS_APPEND_MAX_RETRIES + 1):
+        if attempt > 1 or verify_first:
+            # A failed attempt may still have landed — only resend rows the tab doesn't have
+            values, ticket_refs = _missing_rows(client, tab, values, ticket_refs, ticket_col)
+            if not values:
+                return sent
+        write_limiter.acquire()
+        try:
+            sent += 1
+            response = client.spreadsheets().values().append(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"{tab}!A1",
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": values}
+            ).execute()
+            record_append(response, ticket_refs)
+            return sent
+        except Exception as e:
+            if attempt == SHEETS_APPEND_MAX_RETRIES or not _is_retryable(e):
+                raise
+            backoff = min(2 ** attempt, 30)
+            logger.warning(
+                f"[Sheets] Append of {len(values)} rows to '{tab}' failed (attempt {attempt}): {e} — retrying in {backoff}s"
+            )
+            invalidate_row_index(tab)
+            time.sleep(backoff)
+
+
+def _append_lane(tab: str, values: list[list], ticket_refs: list[str], ticket_col: int, chunk_rows: int,
+                 verify_first: bool, landed: set) -> int:
+    """Append a tab's rows chunk by chunk, adding each completed chunk's tickets to `landed`."""
+    client = get_thread_service()
+    sent = 0
+    for start in range(0, len(values), chunk_rows):
+        refs = ticket_refs[start:start + chunk_rows]
+        sent += _append_chunk(client, tab, values[start:start + chunk_rows], refs, ticket_col, verify_first)
+        landed.update(str(ref).strip() for ref in refs)
+    return sent
+
+
+def append_lanes(lanes: dict[str, tuple[list[list], list[str], int]], chunk_rows: int = SHEETS_APPEND_CHUNK_ROWS,
+                 verify_first: bool = False) -> int:
+    """
+    Append rows to several tabs concurrently.
+    lanes is {tab: (rows, ticket_refs, ticket_col)}. Every lane runs to completion;
+    if any lane fails, AppendLanesError is raised afterwards with the tickets that
+    did land per tab. verify_first skips rows a tab already has (see _append_chunk).
+    Returns append requests sent.
+    """
+    lanes = {tab: lane for tab, lane in lanes.items() if lane[0]}
+    if not lanes:
+        return 0
+    landed = {tab: set() for tab in lanes}
+    with ThreadPoolExecutor(max_workers=min(len(lanes), _MAX_APPEND_LANES), thread_name_prefix="sheets-append") as pool:
+        futures = {
+            tab: pool.submit(_append_lane, tab, rows, refs, col, chunk_rows, verify_first, landed[tab])
+            for tab, (rows, refs, col) in lanes.items()
+        }
+    sent, first_error = 0, None
+    for tab, future in futures.items():
+        try:
+            sent += future.result()
+        except Exception as e:
+            logger.error(f"[Sheets] Append lane '{tab}' failed: {e}")
+            first_error = first_error or e
+    if first_error:
+        raise AppendLanesError(first_error, landed)
+    return sent
+
+
 # --- Core I/O functions ---
 
 def create_event_tab(event_name: str):
     """Create a new event tab with correct headers (no Event column)."""
     try:
         logger.info(f"[Sheets] Creating event tab: {event_name}")
-        metadata = service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID).execute()
+        metadata = get_service().spreadsheets().get(spreadsheetId=SPREADSHEET_ID).execute()
         existing_sheets = [s["properties"]["title"] for s in metadata.get("sheets", [])]
         if event_name in existing_sheets:
             logger.warning(f"[Sheets] Sheet '{event_name}' already exists — skipping creation.")
@@ -40,12 +172,12 @@ def create_event_tab(event_name: str):
                 }
             }
         }]
-        service.spreadsheets().batchUpdate(
+        get_service().spreadsheets().batchUpdate(
             spreadsheetId=SPREADSHEET_ID,
             body={"requests": requests}
         ).execute()
 
-        service.spreadsheets().values().update(
+        get_service().spreadsheets().values().update(
             spreadsheetId=SPREADSHEET_ID,
             range=f"{event_name}!A1",
             valueInputOption="RAW",
@@ -62,15 +194,17 @@ def create_event_tab(event_name: str):
 def append_to_master(event_name: str, booking_row: list):
     """Append a booking to the Master tab (with Event column)."""
     try:
-        service.spreadsheets().values().append(
+        response = get_service().spreadsheets().values().append(
             spreadsheetId=SPREADSHEET_ID,
             range=f"{MASTER_TAB}!A1",   # ✅ changed from !A:A
             valueInputOption="RAW",
             insertDataOption="INSERT_ROWS",
             body={"values": [booking_row]}
         ).execute()
+        record_append(response, [booking_row[MASTER_HEADERS.index("TicketRef")]])
         logger.info(f"[Sheets] Booking appended to Master for event '{event_name}'.")
     except Exception as e:
+        _reset_tab_caches(MASTER_TAB)
         log_and_raise("Sheets", "appending booking to Master", e)
 
 
@@ -78,22 +212,25 @@ def append_to_event(event_name: str, master_row: list):
     """Append a booking to the event tab using schema mapping."""
     try:
         event_row = build_event_row(master_row)
-        service.spreadsheets().values().append(
+        response = get_service().spreadsheets().values().append(
             spreadsheetId=SPREADSHEET_ID,
             range=f"{event_name}!A1",   # ✅ changed from !A:A
             valueInputOption="RAW",
             insertDataOption="INSERT_ROWS",
             body={"values": [event_row]}
         ).execute()
+        record_append(response, [event_row[EVENT_HEADERS.index("T. Reference")]])
         logger.info(f"[Sheets] Booking appended to event tab '{event_name}'.")
     except Exception as e:
+        _reset_tab_caches(event_name)
         log_and_raise("Sheets", f"appending booking to event tab {event_name}", e)
 
 
 def bulk_append_bookings(event_name: str, master_rows: list[list]):
     """
     Append multiple bookings to both Master and Event tabs.
-    master_rows should be aligned with MASTER_HEADERS.
+    master_rows should be aligned with MASTER_HEADERS. Rows are sent in chunks of
+    SHEETS_APPEND_CHUNK_ROWS, Master and event tab in parallel, retrying failed chunks.
     """
     try:
         if not master_rows:
@@ -103,132 +240,379 @@ def bulk_append_bookings(event_name: str, master_rows: list[list]):
         validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
         validate_sheet_alignment(event_name, EVENT_HEADERS)
 
-        # Append to Master
-        service.spreadsheets().values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{MASTER_TAB}!A1",   # ✅ changed from !A:A
-            valueInputOption="RAW",
-            insertDataOption="INSERT_ROWS",
-            body={"values": master_rows}
-        ).execute()
-
-        # Derive and append to Event
+        ticket_refs = [row[MASTER_HEADERS.index("TicketRef")] for row in master_rows]
         event_rows = [build_event_row(row) for row in master_rows]
-        service.spreadsheets().values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{event_name}!A1",   # ✅ changed from !A:A
-            valueInputOption="RAW",
-            insertDataOption="INSERT_ROWS",
-            body={"values": event_rows}
-        ).execute()
+
+        # Master and event tab are written concurrently, each in bounded chunks
+        append_lanes({
+            MASTER_TAB: (master_rows, ticket_refs, MASTER_HEADERS.index("TicketRef")),
+            event_name: (event_rows, ticket_refs, EVENT_HEADERS.index("T. Reference")),
+        })
 
         logger.info(f"[Sheets] Bulk appended {len(master_rows)} bookings to Master and '{event_name}' tabs.")
 
     except Exception as e:
+        _reset_tab_caches(MASTER_TAB, event_name)
         log_and_raise("Sheets", f"bulk appending bookings for {event_name}", e)
 
 
 def update_booking_row(event_name: str, master_row: list, event_row: list):
     """
     Update an existing booking in both Master and Event tabs.
-    Looks up by TicketRef (dynamic index from headers).
+    Rows are located through the TicketRef row index, so a hit costs no reads.
     """
     try:
         ticket_ref = master_row[MASTER_HEADERS.index("TicketRef")]
 
         # --- Update Master ---
         validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
-        master_result = service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{MASTER_TAB}!A2:{excel_col(len(MASTER_HEADERS))}{ROW_FETCH_LIMIT}"
-        ).execute()
-        master_rows = master_result.get("values", [])
-
-        idx_ticket_master = MASTER_HEADERS.index("TicketRef")
-        for idx, row in enumerate(master_rows, start=2):
-            if len(row) > idx_ticket_master and row[idx_ticket_master].strip() == ticket_ref:
-                service.spreadsheets().values().update(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=f"{MASTER_TAB}!A{idx}:{excel_col(len(MASTER_HEADERS))}{idx}",
-                    valueInputOption="RAW",
-                    body={"values": [master_row]}
-                ).execute()
-                logger.info(f"[Sheets] Updated Master row {idx} for ticket {ticket_ref}")
-                break
+        idx = get_row(MASTER_TAB, ticket_ref, MASTER_HEADERS.index("TicketRef"))
+        if idx:
+            get_service().spreadsheets().values().update(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"{MASTER_TAB}!A{idx}:{excel_col(len(MASTER_HEADERS))}{idx}",
+                valueInputOption="RAW",
+                body={"values": [master_row]}
+            ).execute()
+            logger.info(f"[Sheets] Updated Master row {idx} for ticket {ticket_ref}")
+        else:
+            logger.warning(f"[Sheets] Ticket {ticket_ref} not found in Master — skipped.")
 
         # --- Update Event ---
         validate_sheet_alignment(event_name, EVENT_HEADERS)
-        event_result = service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{event_name}!A2:{excel_col(len(EVENT_HEADERS))}{ROW_FETCH_LIMIT}"
-        ).execute()
-        event_rows = event_result.get("values", [])
+        idx = get_row(event_name, ticket_ref, EVENT_HEADERS.index("T. Reference"))
+        if idx:
+            get_service().spreadsheets().values().update(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"{event_name}!A{idx}:{excel_col(len(EVENT_HEADERS))}{idx}",
+                valueInputOption="RAW",
+                body={"values": [event_row]}
+            ).execute()
+            logger.info(f"[Sheets] Updated Event row {idx} for ticket {ticket_ref}")
+        else:
+            logger.warning(f"[Sheets] Ticket {ticket_ref} not found in '{event_name}' — skipped.")
 
+    except Exception as e:
+        _reset_tab_caches(MASTER_TAB, event_name)
+        log_and_raise("Sheets", f"updating booking {ticket_ref}", e)
+
+
+def update_booking_rows(event_name: str, rows: list[tuple[list, list]]):
+    """
+    Update many bookings in both Master and Event tabs with a single batchUpdate.
+    rows is a list of (master_row, event_row) pairs. Rows are located through the
+    TicketRef row index; each tab is re-read at most once if tickets are missing.
+    """
+    try:
+        if not rows:
+            return
+
+        idx_ticket_master = MASTER_HEADERS.index("TicketRef")
         idx_ticket_event = EVENT_HEADERS.index("T. Reference")
-        for idx, row in enumerate(event_rows, start=2):
-            if len(row) > idx_ticket_event and row[idx_ticket_event].strip() == ticket_ref:
-                service.spreadsheets().values().update(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=f"{event_name}!A{idx}:{excel_col(len(EVENT_HEADERS))}{idx}",
-                    valueInputOption="RAW",
-                    body={"values": [event_row]}
-                ).execute()
-                logger.info(f"[Sheets] Updated Event row {idx} for ticket {ticket_ref}")
-                break
+
+        validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
+        validate_sheet_alignment(event_name, EVENT_HEADERS)
+
+        ticket_refs = [master_row[idx_ticket_master] for master_row, _ in rows]
+        master_pos = get_rows(MASTER_TAB, ticket_refs, idx_ticket_master)
+        event_pos = get_rows(event_name, ticket_refs, idx_ticket_event)
+
+        data = []
+        for master_row, event_row in rows:
+            ticket_ref = str(master_row[idx_ticket_master]).strip()
+            if ticket_ref in master_pos:
+                idx = master_pos[ticket_ref]
+                data.append({
+                    "range": f"{MASTER_TAB}!A{idx}:{excel_col(len(MASTER_HEADERS))}{idx}",
+                    "values": [master_row],
+                })
+            else:
+                logger.warning(f"[Sheets] Ticket {ticket_ref} not found in Master — skipped.")
+            if ticket_ref in event_pos:
+                idx = event_pos[ticket_ref]
+                data.append({
+                    "range": f"{event_name}!A{idx}:{excel_col(len(EVENT_HEADERS))}{idx}",
+                    "values": [event_row],
+                })
+            else:
+                logger.warning(f"[Sheets] Ticket {ticket_ref} not found in '{event_name}' — skipped.")
+
+        if data:
+            get_service().spreadsheets().values().batchUpdate(
+                spreadsheetId=SPREADSHEET_ID,
+                body={"valueInputOption": "RAW", "data": data}
+            ).execute()
+        logger.info(f"[Sheets] Batch updated {len(data)} ranges for {len(rows)} bookings in '{event_name}'.")
 
     except Exception as e:
-        log_and_raise("Sheets", f"updating booking {ticket_ref}", e)
+        _reset_tab_caches(MASTER_TAB, event_name)
+        log_and_raise("Sheets", f"batch updating {len(rows)} bookings for {event_name}", e)
 
 
 def update_booking_photo(event_name: str, ticket_ref: str, photo_url: str):
     """
     Update only the ID Doc URL for a booking in both Master and Event tabs.
-    Looks up by TicketRef (col 3 in Master, col 2 in Event).
+    Rows are located through the TicketRef row index.
     """
     try:
         # --- Update Master ---
         validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
-        master_result = service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{MASTER_TAB}!A2:{excel_col(len(MASTER_HEADERS))}{ROW_FETCH_LIMIT}"
-        ).execute()
-        master_rows = master_result.get("values", [])
-
-        idx_ticket = MASTER_HEADERS.index("TicketRef")
         idx_photo = MASTER_HEADERS.index("ID Doc URL")
-
-        for idx, row in enumerate(master_rows, start=2):
-            if len(row) > idx_ticket and row[idx_ticket] == ticket_ref:
-                service.spreadsheets().values().update(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=f"{MASTER_TAB}!{excel_col(idx_photo+1)}{idx}",
-                    valueInputOption="RAW",
-                    body={"values": [[photo_url]]}
-                ).execute()
-                logger.info(f"[Sheets] Updated Master photo for ticket {ticket_ref} at row {idx}")
-                break
+        idx = get_row(MASTER_TAB, ticket_ref, MASTER_HEADERS.index("TicketRef"))
+        if idx:
+            get_service().spreadsheets().values().update(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"{MASTER_TAB}!{excel_col(idx_photo+1)}{idx}",
+                valueInputOption="RAW",
+                body={"values": [[photo_url]]}
+            ).execute()
+            logger.info(f"[Sheets] Updated Master photo for ticket {ticket_ref} at row {idx}")
 
         # --- Update Event ---
         validate_sheet_alignment(event_name, EVENT_HEADERS)
-        event_result = service.spreadsheets().values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range=f"{event_name}!A2:{excel_col(len(EVENT_HEADERS))}{ROW_FETCH_LIMIT}"
-        ).execute()
-        event_rows = event_result.get("values", [])
+        idx_photo_event = EVENT_HEADERS.index("ID Doc URL")
+        idx = get_row(event_name, ticket_ref, EVENT_HEADERS.index("T. Reference"))
+        if idx:
+            get_service().spreadsheets().values().update(
+                spreadsheetId=SPREADSHEET_ID,
+                range=f"{event_name}!{excel_col(idx_photo_event+1)}{idx}",
+                valueInputOption="RAW",
+                body={"values": [[photo_url]]}
+            ).execute()
+            logger.info(f"[Sheets] Updated Event photo for ticket {ticket_ref} at row {idx}")
 
+    except Exception as e:
+        _reset_tab_caches(MASTER_TAB, event_name)
+        log_and_raise("Sheets", f"updating booking photo for {ticket_ref}", e)
+
+
+# --- Coalescing batch writer ---
+
+class SheetsBatchError(Exception):
+    """
+    A SheetsBatch flush failed. `appended` is True when the whole append phase had
+    completed (the updates failed). `landed` is the set of (event_name, ticket_ref)
+    appends whose rows are in both Master and the event tab; only the rest need
+    retrying.
+    """
+
+    def __init__(self, message: str, appended: bool, landed: set = frozenset()):
+        super().__init__(message)
+        self.appended = appended
+        self.landed = set(landed)
+
+
+_batch_stats = {"flushes": 0, "operations": 0, "requests": 0, "requests_saved": 0}
+_batch_stats_lock = threading.Lock()
+
+
+def sheets_batch_stats() -> dict:
+    """Totals across all SheetsBatch flushes since process start."""
+    with _batch_stats_lock:
+        return dict(_batch_stats)
+
+
+class SheetsBatch:
+    """
+    Collects row updates, photo-cell updates and appends, and writes them with as
+    few API calls as possible: every row/cell update goes into one
+    values().batchUpdate, and appends become one values().append per tab
+    (the append endpoint can't be folded into batchUpdate).
+
+    Each operation would otherwise cost two requests (Master + event tab); the
+    difference is reported as requests saved on every flush.
+
+    There is no timer: max_age is only checked when due()/maybe_flush() is called
+    (the outbox checks after each enqueue and flushes whatever is left at the end
+    of every drain). It bounds how much a batch accumulates, not how long a queued
+    write may wait; a batch nobody calls into stays queued until flush().
+    """
+
+    def __init__(self, max_ops: int = SHEETS_BATCH_MAX_OPS, max_age: float = SHEETS_BATCH_MAX_AGE):
+        self.max_ops = max_ops
+        self.max_age = max_age
+        self._appends = {}   # event_name -> [master_row, ...]
+        self._verify_appends = False
+        self._updates = []   # ("row", event_name, master_row) | ("photo", event_name, ticket_ref, url)
+        self._first_at = None
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._appends.values()) + len(self._updates)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def _touch(self):
+        if self._first_at is None:
+            self._first_at = time.monotonic()
+
+    # --- Queue operations ---
+
+    def append(self, event_name: str, master_row: list, retry: bool = False):
+        """
+        Queue a new booking for Master and the event tab. Pass retry=True when an
+        earlier attempt may have written it already: the flush then checks the tabs
+        before appending, so landed rows aren't duplicated.
+        """
+        self._touch()
+        self._appends.setdefault(event_name, []).append(master_row)
+        self._verify_appends = self._verify_appends or retry
+
+    def update_row(self, event_name: str, master_row: list):
+        """Queue a full-row rewrite of a booking in Master and the event tab."""
+        self._touch()
+        self._updates.append(("row", event_name, master_row))
+
+    def update_photo(self, event_name: str, ticket_ref: str, photo_url: str):
+        """Queue an ID Doc URL change in Master and the event tab."""
+        self._touch()
+        self._updates.append(("photo", event_name, str(ticket_ref), photo_url))
+
+    # --- Flushing ---
+
+    def due(self) -> bool:
+        """True once the size or age threshold is reached (age as of this call; see the class docstring)."""
+        if not len(self):
+            return False
+        if self.max_ops and len(self) >= self.max_ops:
+            return True
+        return bool(self.max_age) and time.monotonic() - self._first_at >= self.max_age
+
+    def maybe_flush(self):
+        """Flush if a threshold is reached. Returns the flush report or None."""
+        return self.flush() if self.due() else None
+
+    def flush(self) -> dict:
+        """
+        Write everything queued. Appends go first so the row index knows their
+        positions before updates are resolved. Returns {"operations", "requests", "requests_saved"}.
+        Raises SheetsBatchError, telling the caller which appends were written.
+        """
+        appends, updates, verify = self._appends, self._updates, self._verify_appends
+        self._appends, self._updates, self._first_at, self._verify_appends = {}, [], None, False
+
+        operations = sum(len(rows) for rows in appends.values()) + len(updates)
+        if not operations:
+            return {"operations": 0, "requests": 0, "requests_saved": 0}
+
+        tabs = {MASTER_TAB} | set(appends) | {op[1] for op in updates}
+        idx_ticket = MASTER_HEADERS.index("TicketRef")
+        queued = {(event_name, str(row[idx_ticket]).strip()) for event_name, rows in appends.items() for row in rows}
+        appended = False
+        try:
+            requests = self._flush_appends(appends, verify)
+            appended = True
+            requests += self._flush_updates(updates)
+        except Exception as e:
+            _reset_tab_caches(*tabs)
+            if appended:
+                landed = queued
+            elif isinstance(e, AppendLanesError):
+                # Done only when the row is in Master and in its event tab
+                landed = {
+                    (event_name, ref) for event_name, ref in queued
+                    if ref in e.landed.get(MASTER_TAB, ()) and ref in e.landed.get(event_name, ())
+                }
+            else:
+                landed = set()
+            error = SheetsBatchError(str(e), appended=appended, landed=landed)
+            error.__cause__ = e
+            phase = "updates" if appended else "appends"
+            log_and_raise("Sheets", f"flushing {phase} of a batch of {operations} operations", error)
+
+        report = {
+            "operations": operations,
+            "requests": requests,
+            "requests_saved": max(operations * 2 - requests, 0),
+        }
+        with _batch_stats_lock:
+            _batch_stats["flushes"] += 1
+            for key, value in report.items():
+                _batch_stats[key] += value
+        logger.info(
+            f"[Sheets] Batch flushed {operations} operations in {requests} requests "
+            f"(saved {report['requests_saved']})."
+        )
+        return report
+
+    @staticmethod
+    def _flush_appends(appends: dict, verify: bool = False) -> int:
+        if not appends:
+            return 0
+        idx_ticket = MASTER_HEADERS.index("TicketRef")
+        validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
+        for event_name in appends:
+            validate_sheet_alignment(event_name, EVENT_HEADERS)
+
+        master_rows = [row for rows in appends.values() for row in rows]
+        lanes = {MASTER_TAB: (master_rows, [row[idx_ticket] for row in master_rows], idx_ticket)}
+        for event_name, rows in appends.items():
+            lanes[event_name] = (
+                [build_event_row(row) for row in rows],
+                [row[idx_ticket] for row in rows],
+                EVENT_HEADERS.index("T. Reference"),
+            )
+        return append_lanes(lanes, verify_first=verify)
+
+    @staticmethod
+    def _flush_updates(updates: list) -> int:
+        if not updates:
+            return 0
+        idx_ticket_master = MASTER_HEADERS.index("TicketRef")
         idx_ticket_event = EVENT_HEADERS.index("T. Reference")
-        idx_photo_event = EVENT_HEADERS.index("ID Doc URL")
 
-        for idx, row in enumerate(event_rows, start=2):
-            if len(row) > idx_ticket_event and row[idx_ticket_event] == ticket_ref:
-                service.spreadsheets().values().update(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=f"{event_name}!{excel_col(idx_photo_event+1)}{idx}",
-                    valueInputOption="RAW",
-                    body={"values": [[photo_url]]}
-                ).execute()
-                logger.info(f"[Sheets] Updated Event photo for ticket {ticket_ref} at row {idx}")
-                break
+        def ticket_of(op):
+            return str(op[2][idx_ticket_master] if op[0] == "row" else op[2]).strip()
 
-    except Exception as e:
-        log_and_raise("Sheets", f"updating booking photo for {ticket_ref}", e)
\ No newline at end of file
+        # Resolve positions once per tab (each tab is re-read at most once on misses)
+        validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
+        master_pos = get_rows(MASTER_TAB, [ticket_of(op) for op in updates], idx_ticket_master)
+        event_pos = {}
+        for event_name in dict.fromkeys(op[1] for op in updates):
+            validate_sheet_alignment(event_name, EVENT_HEADERS)
+            refs = [ticket_of(op) for op in updates if op[1] == event_name]
+            event_pos[event_name] = get_rows(event_name, refs, idx_ticket_event)
+
+        master_photo_col = excel_col(MASTER_HEADERS.index("ID Doc URL") + 1)
+        event_photo_col = excel_col(EVENT_HEADERS.index("ID Doc URL") + 1)
+
+        # Queue order is kept so a later write to the same cells wins
+        data = []
+        for op in updates:
+            event_name, ticket_ref = op[1], ticket_of(op)
+            m_idx = master_pos.get(ticket_ref)
+            e_idx = event_pos[event_name].get(ticket_ref)
+            if op[0] == "row":
+                master_row = op[2]
+                if m_idx:
+                    data.append({
+                        "range": f"{MASTER_TAB}!A{m_idx}:{excel_col(len(MASTER_HEADERS))}{m_idx}",
+                        "values": [master_row],
+                    })
+                if e_idx:
+                    data.append({
+                        "range": f"{event_name}!A{e_idx}:{excel_col(len(EVENT_HEADERS))}{e_idx}",
+                        "values": [build_event_row(master_row)],
+                    })
+            else:
+                photo_url = op[3]
+                if m_idx:
+                    data.append({"range": f"{MASTER_TAB}!{master_photo_col}{m_idx}", "values": [[photo_url]]})
+                if e_idx:
+                    data.append({"range": f"{event_name}!{event_photo_col}{e_idx}", "values": [[photo_url]]})
+            if not m_idx:
+                logger.warning(f"[Sheets] Ticket {ticket_ref} not found in Master — skipped.")
+            if not e_idx:
+                logger.warning(f"[Sheets] Ticket {ticket_ref} not found in '{event_name}' — skipped.")
+
+        if not data:
+            return 0
+        get_service().spreadsheets().values().batchUpdate(
+            spreadsheetId=SPREADSHEET_ID,
+            body={"valueInputOption": "RAW", "data": data}
+        ).execute()
+        return 1
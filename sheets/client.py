@@ -1,30 +1,59 @@
 import json
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
+import threading
 from config.envs import GOOGLE_SHEET_ID, GOOGLE_CREDS_JSON
 from config.logger import logger, log_and_raise
 
 SPREADSHEET_ID = GOOGLE_SHEET_ID
 _service = None
+_creds = None
+_thread_local = threading.local()
+
+
+def _credentials():
+    global _creds
+    if _creds is None:
+        from google.oauth2.service_account import Credentials
 
-def get_service():
-    """Return a Google Sheets API service client, initializing if needed."""
-    global _service
-    if _service is not None:
-        return _service
-    try:
         if not GOOGLE_CREDS_JSON:
             raise ValueError("Missing GOOGLE_CREDS_JSON")
-        creds = Credentials.from_service_account_info(
+        _creds = Credentials.from_service_account_info(
             json.loads(GOOGLE_CREDS_JSON),
             scopes=["https://www.googleapis.com/auth/spreadsheets"]
         )
-        _service = build("sheets", "v4", credentials=creds, cache_discovery=False)
+    return _creds
+
+
+def _build():
+    # googleapiclient is a slow import; keep it off the module import path
+    from googleapiclient.discovery import build
+
+    return build("sheets", "v4", credentials=_credentials(), cache_discovery=False)
+
+
+def get_service():
+    """Return a Google Sheets API service client, initializing on first use."""
+    global _service
+    if _service is not None:
+        return _service
+    try:
+        _service = _build()
         logger.info("[Sheets] Google Sheets API client initialized.")
         return _service
     except Exception as e:
         log_and_raise("Sheets Init", "initializing Google Sheets API client", e)
 
-# Backward-compatible export
-service = get_service()
+
+def get_thread_service():
+    """
+    Return a Sheets client owned by the calling thread. The underlying httplib2
+    transport isn't thread-safe, so worker threads must not share get_service().
+    """
+    thread_service = getattr(_thread_local, "service", None)
+    if thread_service is None:
+        try:
+            thread_service = _build()
+            _thread_local.service = thread_service
+        except Exception as e:
+            log_and_raise("Sheets Init", "initializing per-thread Google Sheets API client", e)
+    return thread_service
 
@@ -1,10 +1,16 @@
-from .validators import validate_sheet_alignment
+from .validators import validate_sheet_alignment, invalidate_alignment_cache
+from .row_index import invalidate_row_index
 from .booking_io import (
     create_event_tab,
     append_to_master,
     append_to_event,
+    bulk_append_bookings,
     update_booking_row,
+    update_booking_rows,
     update_booking_photo,
+    SheetsBatch,
+    SheetsBatchError,
+    sheets_batch_stats,
 )
 from .queries import get_manifest_rows
 from .exports import export_manifest_pdf
@@ -21,17 +27,40 @@ def ensure_event_tab(event_name: str):
     validate_sheet_alignment(event_name, EVENT_HEADERS)
 
 
+def resync_sheets(event_name: str = None) -> dict:
+    """
+    Drop memoized header alignment and row positions, then re-verify headers live.
+    Returns {tab_name: aligned} for Master and (if given) the event tab.
+    """
+    invalidate_alignment_cache()
+    invalidate_row_index()
+    results = {MASTER_TAB: validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS, force=True)}
+    if event_name:
+        results[event_name] = validate_sheet_alignment(event_name, EVENT_HEADERS, force=True)
+    return results
+
+
 def add_booking(event_name: str, booking_row: list):
     """Append a booking to both Master and Event sheets."""
     append_to_master(event_name, booking_row)
     append_to_event(event_name, booking_row)
 
 
+def add_bookings(event_name: str, master_rows: list[list]):
+    """Append many bookings to both Master and Event sheets (one append per tab)."""
+    bulk_append_bookings(event_name, master_rows)
+
+
 def update_booking(event_name: str, master_row: list, event_row: list):
     """Update booking in both Master and Event sheets."""
     update_booking_row(event_name, master_row, event_row)
 
 
+def update_bookings(event_name: str, rows: list[tuple[list, list]]):
+    """Update many bookings in both Master and Event sheets in one batch."""
+    update_booking_rows(event_name, rows)
+
+
 def update_photo(event_name: str, ticket_ref: str, photo_url: str):
     """Update only the ID Doc URL for a booking."""
     update_booking_photo(event_name, ticket_ref, photo_url)
@@ -1,5 +1,5 @@
 from config.logger import logger, log_and_raise
-from .client import service, SPREADSHEET_ID
+from .client import get_service, SPREADSHEET_ID
 from .constants import MASTER_TAB, MASTER_HEADERS, ROW_FETCH_LIMIT
 from .validators import validate_sheet_alignment
 
@@ -25,7 +25,7 @@ def get_manifest_rows(boat_number: str, event_name: str = None):
         validate_sheet_alignment(MASTER_TAB, MASTER_HEADERS)
 
         # Dynamic range based on header length
-        result = service.spreadsheets().values().get(
+        result = get_service().spreadsheets().values().get(
             spreadsheetId=SPREADSHEET_ID,
             range=f"{MASTER_TAB}!A2:{excel_col(len(MASTER_HEADERS))}{ROW_FETCH_LIMIT}"
         ).execute()
@@ -0,0 +1,101 @@
+import re
+import threading
+from config.logger import logger
+from .client import get_service, SPREADSHEET_ID
+from .constants import ROW_FETCH_LIMIT
+from .validators import excel_col
+
+# ===== TicketRef → row number index =====
+# tab name -> {ticket_ref: sheet row number}. Filled from append responses
+# (updatedRange) and rebuilt lazily from the TicketRef column on a miss, so a
+# single-booking update can write its range directly without reading the tab.
+
+_index: dict[str, dict[str, int]] = {}
+_lock = threading.Lock()
+
+_RANGE_RE = re.compile(r"^(?P<tab>.+)!\$?[A-Z]+\$?(?P<start>\d+)(?::\$?[A-Z]+\$?(?P<end>\d+))?$")
+
+
+def parse_updated_range(updated_range: str):
+    """
+    Parse an A1 range like "'My Event'!A5:Q7" into (tab, start_row, end_row).
+    Returns None if the range can't be parsed.
+    """
+    match = _RANGE_RE.match(updated_range or "")
+    if not match:
+        return None
+    tab = match.group("tab")
+    if tab.startswith("'") and tab.endswith("'"):
+        tab = tab[1:-1].replace("''", "'")
+    start = int(match.group("start"))
+    end = int(match.group("end") or start)
+    return tab, start, end
+
+
+def record_append(response: dict, ticket_refs: list[str]):
+    """Index rows written by a values().append call, using its updatedRange."""
+    updated_range = (response or {}).get("updates", {}).get("updatedRange")
+    parsed = parse_updated_range(updated_range)
+    if not parsed:
+        logger.warning(f"[Sheets] Could not parse append range '{updated_range}' — index not updated.")
+        return
+    tab, start, end = parsed
+    if end - start + 1 != len(ticket_refs):
+        # Unexpected shape (e.g. blank rows skipped); drop the tab so it is rebuilt on next miss
+        logger.warning(f"[Sheets] Append range {updated_range} does not match {len(ticket_refs)} rows — dropping index.")
+        invalidate_row_index(tab)
+        return
+    with _lock:
+        tab_index = _index.setdefault(tab, {})
+        for offset, ticket_ref in enumerate(ticket_refs):
+            if ticket_ref:
+                tab_index[str(ticket_ref).strip()] = start + offset
+
+
+def rebuild_row_index(tab: str, ticket_col: int, client=None) -> dict[str, int]:
+    """
+    Rebuild a tab's index by reading only its TicketRef column (0-based ticket_col).
+    Worker threads pass their own client (see client.get_thread_service).
+    """
+    col = excel_col(ticket_col + 1)
+    result = (client or get_service()).spreadsheets().values().get(
+        spreadsheetId=SPREADSHEET_ID,
+        range=f"{tab}!{col}2:{col}{ROW_FETCH_LIMIT}"
+    ).execute()
+    tab_index = {}
+    for row_num, row in enumerate(result.get("values", []), start=2):
+        if row and row[0].strip():
+            tab_index[row[0].strip()] = row_num
+    with _lock:
+        _index[tab] = tab_index
+    logger.info(f"[Sheets] Rebuilt row index for '{tab}' ({len(tab_index)} tickets)")
+    return tab_index
+
+
+def get_row(tab: str, ticket_ref: str, ticket_col: int):
+    """Return the sheet row for a ticket, rebuilding the tab index once on a miss. None if absent."""
+    ticket_ref = str(ticket_ref).strip()
+    with _lock:
+        row = _index.get(tab, {}).get(ticket_ref)
+    if row is not None:
+        return row
+    return rebuild_row_index(tab, ticket_col).get(ticket_ref)
+
+
+def get_rows(tab: str, ticket_refs: list[str], ticket_col: int, client=None) -> dict[str, int]:
+    """Resolve many tickets at once; the tab is rebuilt at most once for all misses."""
+    refs = [str(t).strip() for t in ticket_refs]
+    with _lock:
+        tab_index = dict(_index.get(tab, {}))
+    if any(ref not in tab_index for ref in refs):
+        tab_index = rebuild_row_index(tab, ticket_col, client)
+    return {ref: tab_index[ref] for ref in refs if ref in tab_index}
+
+
+def invalidate_row_index(tab: str = None):
+    """Forget one tab's index (or all of them)."""
+    with _lock:
+        if tab is None:
+            _index.clear()
+        else:
+            _index.pop(tab, None)
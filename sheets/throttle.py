@@ -0,0 +1,38 @@
+import threading
+import time
+from config.envs import SHEETS_WRITE_REQUESTS_PER_MINUTE
+from config.logger import logger
+
+# ===== Sheets write rate limiting =====
+# Google Sheets enforces per-minute write quotas. Parallel writers share one
+# token bucket so they slow down together instead of collecting 429s.
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate_per_minute` tokens, refilled continuously."""
+
+    def __init__(self, rate_per_minute: int, burst: int = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1, rate_per_minute // 6)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            logger.debug(f"[Sheets] Write quota throttle — waiting {wait:.2f}s")
+            time.sleep(wait)
+
+
+write_limiter = RateLimiter(SHEETS_WRITE_REQUESTS_PER_MINUTE)
@@ -1,5 +1,13 @@
+import threading
+import time
 from config.logger import logger
-from .client import service, SPREADSHEET_ID
+from config.envs import SHEETS_ALIGNMENT_TTL
+from .client import get_service, SPREADSHEET_ID
+
+# (sheet_name, expected headers) -> monotonic time the alignment was last confirmed.
+# Only successful checks are memoized, so a fixed sheet is picked up on the next call.
+_alignment_cache: dict[tuple, float] = {}
+_alignment_lock = threading.Lock()
 
 
 def excel_col(n: int) -> str:
@@ -11,15 +19,33 @@ def excel_col(n: int) -> str:
     return result
 
 
-def validate_sheet_alignment(sheet_name: str, expected_columns: list) -> bool:
+def invalidate_alignment_cache(sheet_name: str = None):
+    """Forget memoized alignment for one sheet (or all), forcing a live re-check."""
+    with _alignment_lock:
+        if sheet_name is None:
+            _alignment_cache.clear()
+        else:
+            for key in [k for k in _alignment_cache if k[0] == sheet_name]:
+                del _alignment_cache[key]
+
+
+def validate_sheet_alignment(sheet_name: str, expected_columns: list, force: bool = False) -> bool:
     """
     Validate that the first row (headers) of the given sheet matches the expected columns.
     Logs mismatches and returns True if aligned, False otherwise.
+    A successful check is trusted for SHEETS_ALIGNMENT_TTL seconds unless force=True.
     """
+    cache_key = (sheet_name, tuple(expected_columns))
+    if not force:
+        with _alignment_lock:
+            checked_at = _alignment_cache.get(cache_key)
+        if checked_at is not None and time.monotonic() - checked_at < SHEETS_ALIGNMENT_TTL:
+            return True
+
     try:
         # Dynamic range based on expected column count
         last_col = excel_col(len(expected_columns))
-        result = service.spreadsheets().values().get(
+        result = get_service().spreadsheets().values().get(
             spreadsheetId=SPREADSHEET_ID,
             range=f"{sheet_name}!A1:{last_col}1"
         ).execute()
@@ -52,6 +78,8 @@ def validate_sheet_alignment(sheet_name: str, expected_columns: list) -> bool:
 
         if aligned:
             logger.info(f"[Sheets] Header alignment OK for '{sheet_name}'")
+            with _alignment_lock:
+                _alignment_cache[cache_key] = time.monotonic()
 
         return aligned
 
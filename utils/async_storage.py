@@ -0,0 +1,190 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from urllib.parse import quote
+import httpx
+from config.logger import logger
+from config.envs import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_BUCKET,
+    STORAGE_MAX_CONCURRENCY,
+    STORAGE_MAX_RETRIES,
+    STORAGE_TIMEOUT,
+)
+from utils.supabase_storage import id_photo_path, check_pdf
+
+# ===== Async Supabase Storage =====
+# Non-blocking counterpart of utils/supabase_storage.py for async handlers, with the
+# same function names. Talks to the Storage REST API over one pooled keep-alive
+# httpx.AsyncClient; a semaphore bounds in-flight requests, transient failures
+# (transport errors, 429, 5xx) are retried with jittered backoff, and every
+# operation's latency is recorded for /metrics.
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_LATENCY_SAMPLES = 200
+
+_client = None
+_semaphore = None
+_latency = defaultdict(lambda: deque(maxlen=_LATENCY_SAMPLES))
+_counts = defaultdict(lambda: {"calls": 0, "errors": 0, "retries": 0})
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client, _semaphore
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=f"{SUPABASE_URL.rstrip('/')}/storage/v1/",
+            headers={"Authorization": f"Bearer {SUPABASE_KEY}", "apikey": SUPABASE_KEY},
+            limits=httpx.Limits(max_connections=STORAGE_MAX_CONCURRENCY, max_keepalive_connections=STORAGE_MAX_CONCURRENCY),
+            timeout=STORAGE_TIMEOUT,
+        )
+        _semaphore = asyncio.Semaphore(STORAGE_MAX_CONCURRENCY)
+    return _client
+
+
+async def close_storage_client():
+    """Close the pooled client (FastAPI shutdown)."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+        _client, _semaphore = None, None
+
+
+async def _request(op: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """One Storage call with bounded concurrency, retries and latency tracking."""
+    client = _get_client()
+    stats = _counts[op]
+    stats["calls"] += 1
+    started = time.perf_counter()
+    try:
+        for attempt in range(1, STORAGE_MAX_RETRIES + 1):
+            try:
+                async with _semaphore:
+                    resp = await client.request(method, url, **kwargs)
+                if resp.status_code not in _RETRYABLE_STATUS or attempt == STORAGE_MAX_RETRIES:
+                    if resp.status_code >= 400:
+                        raise RuntimeError(f"Supabase {op} failed: {resp.status_code} {resp.text[:200]}")
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+            except httpx.TransportError as e:
+                if attempt == STORAGE_MAX_RETRIES:
+                    raise
+                reason = str(e) or type(e).__name__
+            stats["retries"] += 1
+            backoff = min(0.25 * 2 ** attempt, 5) * (0.5 + random.random())
+            logger.warning(f"[Storage] {op} attempt {attempt} failed ({reason}), retrying in {backoff:.2f}s")
+            await asyncio.sleep(backoff)
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        _latency[op].append((time.perf_counter() - started) * 1000)
+
+
+def storage_stats() -> dict:
+    """Per-operation call/error/retry counts and latency (ms) over the last samples."""
+    result = {}
+    for op, stats in _counts.items():
+        samples = sorted(_latency[op])
+        result[op] = {
+            **stats,
+            "avg_ms": round(sum(samples) / len(samples), 1) if samples else None,
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else None,
+        }
+    return result
+
+
+# --- Uploads ---
+
+async def _upload(op: str, path: str, data: bytes, content_type: str) -> str:
+    await _request(
+        op, "POST", f"object/{SUPABASE_BUCKET}/{quote(path)}",
+        content=data, headers={"x-upsert": "true", "content-type": content_type},
+    )
+    return path
+
+
+async def upload_id_photo(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
+    """Upload a passenger ID photo to Supabase under ids/<event>/<ticket>.<ext>"""
+    path = id_photo_path(file_bytes, event_name, ticket_ref)
+    content_type = "image/jpeg" if path.endswith(".jpg") else "image/png"
+    return await _upload("upload_id_photo", path, file_bytes, content_type)
+
+
+async def upload_id_thumbnail(thumb_bytes: bytes, photo_path: str) -> str:
+    """Upload the card-sized JPEG derivative of an ID photo (see utils/thumbnails.py)."""
+    from utils.thumbnails import thumbnail_path
+
+    return await _upload("upload_id_thumbnail", thumbnail_path(photo_path), thumb_bytes, "image/jpeg")
+
+
+async def delete_id_thumbnail(photo_path: str):
+    """Remove the stored derivative of an ID photo, so readers fall back to the original."""
+    from utils.thumbnails import thumbnail_path
+
+    await _request("delete_id_thumbnail", "DELETE", f"object/{SUPABASE_BUCKET}/{quote(thumbnail_path(photo_path))}")
+
+
+async def upload_manifest(pdf_bytes: bytes, event_name: str, boat_number: str) -> str:
+    """Upload a manifest PDF to Supabase under manifests/<event>/boat_<n>.pdf"""
+    check_pdf(pdf_bytes)
+    return await _upload("upload_manifest", f"manifests/{event_name}/boat_{boat_number}.pdf", pdf_bytes, "application/pdf")
+
+
+async def upload_idcard(pdf_bytes: bytes, event_name: str, ticket_ref: str) -> str:
+    """Upload an ID card PDF under ids/<event>/idcards/<ticket>.pdf"""
+    check_pdf(pdf_bytes)
+    return await _upload("upload_idcard", f"ids/{event_name}/idcards/{ticket_ref}.pdf", pdf_bytes, "application/pdf")
+
+
+# --- Signed downloads ---
+
+def _absolute(signed_url: str) -> str:
+    # Storage returns signed URLs relative to /storage/v1
+    return f"{SUPABASE_URL.rstrip('/')}/storage/v1/{signed_url.lstrip('/')}"
+
+
+async def create_signed_urls(paths: list[str], expiry: int = 60) -> dict[str, str]:
+    """Sign many paths in one Storage request. Paths that couldn't be signed are left out."""
+    if not paths:
+        return {}
+    resp = await _request(
+        "create_signed_urls", "POST", f"object/sign/{SUPABASE_BUCKET}",
+        json={"expiresIn": expiry, "paths": list(paths)},
+    )
+    urls = {}
+    for item in resp.json() or []:
+        url = item.get("signedURL") or item.get("signedUrl")
+        if item.get("path") and url and not item.get("error"):
+            urls[item["path"]] = _absolute(url)
+    return urls
+
+
+async def _download(url: str) -> bytes:
+    resp = await _request("download", "GET", url)
+    return resp.content
+
+
+async def fetch_signed_file(path: str, expiry: int = 60) -> bytes:
+    """Generate a signed URL and fetch the file bytes"""
+    resp = await _request(
+        "create_signed_url", "POST", f"object/sign/{SUPABASE_BUCKET}/{quote(path)}", json={"expiresIn": expiry}
+    )
+    url = (resp.json() or {}).get("signedURL")
+    if not url:
+        raise RuntimeError(f"Failed to create signed URL for {path}")
+    return await _download(_absolute(url))
+
+
+async def fetch_signed_files(paths: list[str], expiry: int = 60) -> dict:
+    """Batch-sign, then download concurrently (bounded by the semaphore). {path: bytes or Exception}"""
+    paths = list(dict.fromkeys(p for p in paths if p))
+    if not paths:
+        return {}
+    urls = await create_signed_urls(paths, expiry)
+    results = {p: RuntimeError(f"Failed to create signed URL for {p}") for p in paths if p not in urls}
+    downloaded = await asyncio.gather(*(_download(urls[p]) for p in urls), return_exceptions=True)
+    results.update(zip(urls, downloaded))
+    return results
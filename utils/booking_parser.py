@@ -1,4 +1,4 @@
-import csv, io, logging
+import codecs, csv, io, logging
 from decimal import Decimal, InvalidOperation
 from utils.booking_schema import MASTER_HEADERS, EVENT_HEADERS
 
@@ -69,103 +69,192 @@ def parse_booking_input(update_text: str) -> dict:
     return data
 
 
-def parse_bookings_file(file_bytes: bytes) -> tuple[list[dict], list[str]]:
-    """
-    Parse a CSV file into structured booking dicts.
-    Supports Master tab, Event tab, and raw snake_case CSV formats.
-    Returns (valid_rows, errors).
-    """
-    valid_rows, errors = [], []
+# ===== Bulk file parsing (streaming) =====
+# Files are read incrementally: CSV through a TextIOWrapper (decoded chunk by
+# chunk), XLSX through openpyxl's read-only mode. Rows are yielded as they are
+# parsed, so an import can commit early chunks while later ones are still read.
 
-    # --- Decode with fallback encodings ---
-    text = None
-    for enc in ("utf-8-sig", "utf-16", "latin1"):
-        try:
-            text = file_bytes.decode(enc)
-            logging.info(f"[Parser] Decoded file using {enc}")
-            break
-        except UnicodeDecodeError:
-            continue
-    if text is None:
-        raise ValueError("Unsupported file encoding")
+_SNIFF_BYTES = 64 * 1024
+
+
+def _detect_encoding(head: bytes) -> str:
+    """Pick a decoder from the first bytes: BOMs first, then UTF-8, then latin1."""
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    try:
+        # A multi-byte sequence may be cut at the end of the sample; that's fine
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        if e.start >= len(head) - 3:
+            return "utf-8"
+        return "latin1"
+
+
+def _latin1_fallback(error: UnicodeDecodeError):
+    # Bytes that aren't valid UTF-8 past the sniffed head (a stray cp1252/latin1
+    # character) are decoded as latin1 instead of failing a half-committed import
+    return error.object[error.start:error.end].decode("latin1"), error.end
 
+
+codecs.register_error("edb_latin1_fallback", _latin1_fallback)
+
+
+def _iter_csv(stream):
+    """Yield (headers, row_dict_iterator) for a binary CSV stream, decoding incrementally."""
+    # peek() returns at most one buffer, so size the buffer to the sniff window
+    buffered = io.BufferedReader(stream, buffer_size=_SNIFF_BYTES)
+    encoding = _detect_encoding(buffered.peek(_SNIFF_BYTES)[:_SNIFF_BYTES])
+    logging.info(f"[Parser] Decoding CSV as {encoding}")
+    errors = "edb_latin1_fallback" if encoding.startswith("utf-8") else "replace"
     # Important: newline="" prevents _csv.Error on embedded newlines
-    reader = csv.DictReader(io.StringIO(text, newline=""))
+    text = io.TextIOWrapper(buffered, encoding=encoding, errors=errors, newline="")
+    reader = csv.DictReader(text)
     headers = [h.strip() for h in (reader.fieldnames or [])]
+    return headers, ({(k or "").strip(): v for k, v in row.items()} for row in reader)
+
+
+def _cell_to_str(value) -> str:
+    """Spreadsheet cells come typed; bring them back to the strings the CSV path sees."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # phones/IDs stored as numbers
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _iter_xlsx(stream):
+    """Yield (headers, row_dict_iterator) for the first worksheet of an XLSX file."""
+    from openpyxl import load_workbook  # optional: only needed for Excel imports
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    first = next(rows, None) or ()
+    headers = [_cell_to_str(h).strip() for h in first]
+
+    def _dicts():
+        try:
+            for values in rows:
+                if values is None or all(v is None for v in values):
+                    continue
+                yield {h: _cell_to_str(v) for h, v in zip(headers, values)}
+        finally:
+            workbook.close()
 
-    # --- Detect schema ---
-    is_master = "Event" in headers and "TicketRef" in headers
-    is_event = "T. Reference" in headers and "ID" in headers
-    is_raw   = "ticket_ref" in headers and "id_number" in headers
-
-    if not (is_master or is_event or is_raw):
-        raise ValueError("Unrecognized file format: headers do not match Master, Event, or Raw schema")
-
-    # --- Row parsing ---
-    for idx, row in enumerate(reader, start=2):
-        booking, row_errors = {}, []
-
-        if is_master:
-            booking = {
-                "ticket_ref": (row.get("TicketRef") or "").strip(),
-                "name": (row.get("Name") or "").strip(),
-                "id_number": (row.get("IDNumber") or "").strip().upper(),
-                "phone": _normalize_phone(row.get("Phone") or ""),
-                "male_dep": (row.get("MaleDep") or "").strip(),
-                "resort_dep": (row.get("ResortDep") or "").strip(),
-                "arrival_time": (row.get("ArrivalTime") or "").strip(),
-                "departure_time": (row.get("DepartureTime") or "").strip(),
-                "paid_amount": _normalize_amount(row.get("PaidAmount") or ""),
-                "transfer_ref": (row.get("TransferRef") or "").strip(),
-                "ticket_type": (row.get("TicketType") or "").strip(),
-                "status": (row.get("Status") or "").strip() or "booked",
-                "id_doc_url": (row.get("ID Doc URL") or "").strip(),
-                "group_id": (row.get("GroupID") or "").strip(),
-            }
-
-        elif is_event:
-            booking = {
-                "ticket_ref": (row.get("T. Reference") or "").strip(),
-                "name": (row.get("Name") or "").strip(),
-                "id_number": (row.get("ID") or "").strip().upper(),
-                "phone": _normalize_phone(row.get("Number") or ""),
-                "male_dep": (row.get("Male' Dep") or "").strip(),
-                "resort_dep": (row.get("Resort Dep") or "").strip(),
-                "arrival_time": (row.get("ArrivalTime") or "").strip(),
-                "departure_time": (row.get("DepartureTime") or "").strip(),
-                "paid_amount": _normalize_amount(row.get("Paid Amount") or ""),
-                "transfer_ref": (row.get("Transfer slip Ref") or "").strip(),
-                "ticket_type": (row.get("Ticket Type") or "").strip(),
-                "status": (row.get("Status") or "").strip() or "booked",
-                "id_doc_url": (row.get("ID Doc URL") or "").strip(),
-                "group_id": "",
-            }
-
-        elif is_raw:
-            booking = {
-                "ticket_ref": (row.get("ticket_ref") or "").strip(),
-                "name": (row.get("name") or "").strip(),
-                "id_number": (row.get("id_number") or "").strip().upper(),
-                "phone": _normalize_phone(row.get("phone") or ""),
-                "male_dep": (row.get("male_dep") or "").strip(),
-                "resort_dep": (row.get("resort_dep") or "").strip(),
-                "arrival_time": (row.get("arrival_time") or "").strip(),
-                "departure_time": (row.get("departure_time") or "").strip(),
-                "paid_amount": _normalize_amount(row.get("paid_amount") or ""),
-                "transfer_ref": (row.get("transfer_ref") or "").strip(),
-                "ticket_type": (row.get("ticket_type") or "").strip(),
-                "status": "booked",
-                "id_doc_url": None,
-                "group_id": (row.get("group_id") or "").strip(),
-            }
-
-        # --- Validation ---
+    return headers, _dicts()
+
+
+def _detect_schema(headers: list[str]) -> str:
+    if "Event" in headers and "TicketRef" in headers:
+        return "master"
+    if "T. Reference" in headers and "ID" in headers:
+        return "event"
+    if "ticket_ref" in headers and "id_number" in headers:
+        return "raw"
+    raise ValueError("Unrecognized file format: headers do not match Master, Event, or Raw schema")
+
+
+def _map_row(row: dict, schema: str) -> dict:
+    """Map one source row (Master, Event or raw snake_case columns) to a booking dict."""
+    if schema == "master":
+        return {
+            "ticket_ref": (row.get("TicketRef") or "").strip(),
+            "name": (row.get("Name") or "").strip(),
+            "id_number": (row.get("IDNumber") or "").strip().upper(),
+            "phone": _normalize_phone(row.get("Phone") or ""),
+            "male_dep": (row.get("MaleDep") or "").strip(),
+            "resort_dep": (row.get("ResortDep") or "").strip(),
+            "arrival_time": (row.get("ArrivalTime") or "").strip(),
+            "departure_time": (row.get("DepartureTime") or "").strip(),
+            "paid_amount": _normalize_amount(row.get("PaidAmount") or ""),
+            "transfer_ref": (row.get("TransferRef") or "").strip(),
+            "ticket_type": (row.get("TicketType") or "").strip(),
+            "status": (row.get("Status") or "").strip() or "booked",
+            "id_doc_url": (row.get("ID Doc URL") or "").strip(),
+            "group_id": (row.get("GroupID") or "").strip(),
+        }
+    if schema == "event":
+        return {
+            "ticket_ref": (row.get("T. Reference") or "").strip(),
+            "name": (row.get("Name") or "").strip(),
+            "id_number": (row.get("ID") or "").strip().upper(),
+            "phone": _normalize_phone(row.get("Number") or ""),
+            "male_dep": (row.get("Male' Dep") or "").strip(),
+            "resort_dep": (row.get("Resort Dep") or "").strip(),
+            "arrival_time": (row.get("ArrivalTime") or "").strip(),
+            "departure_time": (row.get("DepartureTime") or "").strip(),
+            "paid_amount": _normalize_amount(row.get("Paid Amount") or ""),
+            "transfer_ref": (row.get("Transfer slip Ref") or "").strip(),
+            "ticket_type": (row.get("Ticket Type") or "").strip(),
+            "status": (row.get("Status") or "").strip() or "booked",
+            "id_doc_url": (row.get("ID Doc URL") or "").strip(),
+            "group_id": "",
+        }
+    return {
+        "ticket_ref": (row.get("ticket_ref") or "").strip(),
+        "name": (row.get("name") or "").strip(),
+        "id_number": (row.get("id_number") or "").strip().upper(),
+        "phone": _normalize_phone(row.get("phone") or ""),
+        "male_dep": (row.get("male_dep") or "").strip(),
+        "resort_dep": (row.get("resort_dep") or "").strip(),
+        "arrival_time": (row.get("arrival_time") or "").strip(),
+        "departure_time": (row.get("departure_time") or "").strip(),
+        "paid_amount": _normalize_amount(row.get("paid_amount") or ""),
+        "transfer_ref": (row.get("transfer_ref") or "").strip(),
+        "ticket_type": (row.get("ticket_type") or "").strip(),
+        "status": "booked",
+        "id_doc_url": None,
+        "group_id": (row.get("group_id") or "").strip(),
+    }
+
+
+def iter_bookings(source, filename: str = ""):
+    """
+    Stream a CSV or XLSX bookings file (bytes or a binary file object).
+    Supports Master tab, Event tab, and raw snake_case formats.
+    Yields (booking, None) for valid rows and (None, error) for invalid ones.
+    """
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    is_xlsx = filename.lower().endswith(".xlsx")
+    headers, rows = _iter_xlsx(stream) if is_xlsx else _iter_csv(stream)
+    schema = _detect_schema(headers)
+
+    for idx, row in enumerate(rows, start=2):
+        booking = _map_row(row, schema)
         if not booking["name"] or not booking["id_number"]:
-            row_errors.append(f"Row {idx}: Missing Name or IDNumber")
+            yield None, f"Row {idx}: Missing Name or IDNumber"
+        else:
+            yield booking, None
 
-        if row_errors:
-            errors.extend(row_errors)
+
+def iter_booking_chunks(source, filename: str = "", chunk_size: int = 500):
+    """Group iter_bookings output into (valid_rows, errors) chunks of at most chunk_size valid rows."""
+    valid_rows, errors = [], []
+    for booking, error in iter_bookings(source, filename):
+        if error:
+            errors.append(error)
+            continue
+        valid_rows.append(booking)
+        if len(valid_rows) >= chunk_size:
+            yield valid_rows, errors
+            valid_rows, errors = [], []
+    if valid_rows or errors:
+        yield valid_rows, errors
+
+
+def parse_bookings_file(file_bytes: bytes, filename: str = "") -> tuple[list[dict], list[str]]:
+    """
+    Parse a whole CSV/XLSX file into structured booking dicts.
+    Returns (valid_rows, errors). Prefer iter_booking_chunks for large files.
+    """
+    valid_rows, errors = [], []
+    for booking, error in iter_bookings(file_bytes, filename):
+        if error:
+            errors.append(error)
         else:
             valid_rows.append(booking)
-
-    return valid_rows, errors
\ No newline at end of file
+    return valid_rows, errors
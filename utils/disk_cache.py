@@ -0,0 +1,75 @@
+import hashlib
+import os
+import threading
+from config.logger import logger
+
+# ===== Local disk LRU =====
+# Small size-bounded file cache shared by the thumbnail and PDF caches. Entries are
+# files named by a hash of their key; a hit touches the mtime, and eviction removes
+# the least recently used files once the directory grows past max_bytes.
+
+
+class DiskLRUCache:
+    """Size-bounded disk cache keyed by string; least recently used files go first."""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".bin"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + self.suffix)
+
+    def get(self, key: str):
+        file = self._file(key)
+        try:
+            with open(file, "rb") as f:
+                data = f.read()
+            os.utime(file)  # mark as recently used
+            self.hits += 1
+            return data
+        except OSError:
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file = self._file(key)
+            tmp = f"{file}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, file)
+            self._evict()
+        except OSError as e:
+            logger.warning(f"[DiskCache] Could not cache {key} in {self.directory}: {e}")
+
+    def delete(self, key: str):
+        """Drop an entry (e.g. its source changed). Missing entries are ignored."""
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(self.suffix):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, file in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(file)
+                    total -= size
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -3,41 +3,49 @@ from reportlab.lib.pagesizes import A4, landscape
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 from config.logger import logger
-from utils.supabase_storage import fetch_signed_file
 from utils.pdf_common import draw_header, draw_footer
-from db.init import get_db
-from db.models import Booking
+
+
+def load_idcard_rows(boat_number: int, event_name: str = None) -> list[dict]:
+    """Passengers on a boat (optionally one event) in boarding order, from the manifest projection."""
+    from db.init import get_db  # render workers import this module without touching the DB
+    from services.manifest_projection import load_manifest
+
+    with get_db() as db:
+        return load_manifest(db, boat_number, event_name)
+
+
+def prefetch_idcard_photos(rows: list[dict]) -> dict:
+    """Card-sized thumbnails for every row (disk cache, then Storage): {path: bytes or Exception}."""
+    from utils.thumbnails import fetch_thumbnails
+
+    return fetch_thumbnails([r["ID Doc URL"] for r in rows], expiry=60)
 
 
 def generate_idcards_pdf(boat_number: str, event_name: str = None) -> bytes:
     """
-    Generate an ID cards PDF in landscape orientation.
+    Generate an ID cards PDF in landscape orientation (loads rows and photos, then renders).
+    Returns None on failure.
+    """
+    boat_number = int(boat_number)
+    try:
+        rows = load_idcard_rows(boat_number, event_name)
+        photos = prefetch_idcard_photos(rows)
+    except Exception as e:
+        logger.error(f"[IDCards] Failed to load ID card data for Boat {boat_number}: {e}", exc_info=True)
+        return None
+    return render_idcards_pdf(boat_number, event_name, rows, photos)
+
+
+def render_idcards_pdf(boat_number: int, event_name: str, rows: list[dict], photos: dict) -> bytes:
+    """
+    Render the ID cards PDF from preloaded rows and photo bytes.
     Layout: 3 columns × 2 rows per page (6 cards per page).
     Each card shows full ID photo (resized), with Name + Phone above.
     Adds a header banner on each page, page footers with page numbers,
-    and a summary page at the end.
+    and a summary page at the end. Pure CPU work, so it can run in a render worker process.
     """
-    boat_number = int(boat_number)  
-    
     try:
-        # --- Query DB instead of Sheets ---
-        with get_db() as db:
-            q = db.query(Booking).filter(
-                (Booking.arrival_boat_boarded == boat_number) |
-                (Booking.departure_boat_boarded == boat_number)
-            )
-            if event_name:
-                q = q.filter(Booking.event_id == event_name)
-            bookings = q.all()
-
-        rows = []
-        for b in bookings:
-            rows.append({
-                "Name": b.name,
-                "Number": b.phone,
-                "ID Doc URL": b.id_doc_url,
-            })
-
         buffer = io.BytesIO()
         c = canvas.Canvas(buffer, pagesize=landscape(A4))
         page_width, page_height = landscape(A4)
@@ -51,7 +59,7 @@ def generate_idcards_pdf(boat_number: str, event_name: str = None) -> bytes:
         current_page = 1
 
         # First page header
-        draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}")
+        draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}", landscape_mode=True)
 
         for idx, row in enumerate(rows):
             col = idx % cols
@@ -61,7 +69,7 @@ def generate_idcards_pdf(boat_number: str, event_name: str = None) -> bytes:
                 draw_footer(c, current_page, total_pages + 1, landscape_mode=True)
                 c.showPage()
                 current_page += 1
-                draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}")
+                draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}", landscape_mode=True)
 
             x = col * card_width
             y = page_height - (row_idx + 1) * card_height
@@ -84,7 +92,9 @@ def generate_idcards_pdf(boat_number: str, event_name: str = None) -> bytes:
 
             if photo_path:
                 try:
-                    photo_bytes = fetch_signed_file(photo_path, expiry=60)
+                    photo_bytes = photos.get(photo_path)
+                    if isinstance(photo_bytes, Exception):
+                        raise photo_bytes
                     img = ImageReader(io.BytesIO(photo_bytes))
                     c.drawImage(
                         img,
@@ -109,7 +119,7 @@ def generate_idcards_pdf(boat_number: str, event_name: str = None) -> bytes:
         # Summary page
         c.showPage()
         current_page += 1
-        draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}")
+        draw_header(c, f"Event: {event_name or 'Master'} | Boat: {boat_number}", landscape_mode=True)
         c.setFont("Helvetica-Bold", 16)
         c.drawCentredString(page_width / 2, page_height / 2, f"Total ID Cards Generated: {len(rows)}")
         draw_footer(c, current_page, total_pages + 1, landscape_mode=True)
@@ -6,7 +6,8 @@ def format_import_summary(result: dict) -> str:
         "inserted": int,
         "skipped": int,
         "errors": list[str],
-        "missing_photos": list[str]
+        "missing_photos": list[str],        # preview of IDs
+        "missing_photos_count": int          # optional, defaults to len(missing_photos)
     }
     """
     inserted = result.get("inserted", 0)
@@ -29,8 +30,8 @@ def format_import_summary(result: dict) -> str:
         if len(errors) > 3:
             lines.append(f"   … and {len(errors) - 3} more")
 
-    if missing_photos:
-        count = len(missing_photos)
+    count = result.get("missing_photos_count", len(missing_photos))
+    if count:
         preview = missing_photos[:5]
         lines.append(f"🪪 {count} bookings missing photos")
         lines.append("   Use /attachphoto <ID> to upload")
@@ -0,0 +1,42 @@
+import hashlib
+import json
+from config.envs import PDF_CACHE_DIR, PDF_CACHE_MAX_MB
+from utils.disk_cache import DiskLRUCache
+
+# ===== PDF cache =====
+# Manifest and ID card PDFs are content-addressed: the key hashes everything that
+# shows up in the document (event, boat, passengers in order, photo paths and the
+# booking version that changes when a photo is re-attached). Same key → same PDF,
+# so /departed skips rendering and uploading, and export buttons serve local bytes.
+
+_MB = 1024 * 1024
+
+pdf_cache = DiskLRUCache(PDF_CACHE_DIR, PDF_CACHE_MAX_MB * _MB, suffix=".pdf")
+
+
+def pdf_cache_key(kind: str, event_name: str, boat_number: int, rows: list[dict], leg_type: str = None) -> str:
+    """Content hash for a manifest ("manifest") or ID cards ("idcards") PDF rendered from rows."""
+    passengers = [
+        [
+            row.get("TicketRef"), row.get("Name"), row.get("ID"), row.get("Number"),
+            row.get("ArrivalBoatBoarded"), row.get("DepartureBoatBoarded"),
+            row.get("ID Doc URL"), str(row.get("UpdatedAt") or ""),
+        ]
+        for row in rows
+    ]
+    payload = json.dumps([kind, event_name, boat_number, leg_type, passengers], default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def _uploaded_marker(kind: str, event_name: str, boat_number: int) -> str:
+    return f"uploaded:{kind}:{event_name}:{boat_number}"
+
+
+def uploaded_key(kind: str, event_name: str, boat_number: int):
+    """Key of the version last uploaded to Storage for this document (None if unknown)."""
+    data = pdf_cache.get(_uploaded_marker(kind, event_name, boat_number))
+    return data.decode() if data else None
+
+
+def mark_uploaded(kind: str, event_name: str, boat_number: int, key: str):
+    pdf_cache.put(_uploaded_marker(kind, event_name, boat_number), key.encode())
@@ -1,11 +1,11 @@
-from reportlab.lib.pagesizes import A4
+from reportlab.lib.pagesizes import A4, landscape
 from reportlab.pdfgen import canvas
 from datetime import datetime
 
 
-def draw_header(c: canvas.Canvas, title: str, subtitle: str = None):
+def draw_header(c: canvas.Canvas, title: str, subtitle: str = None, landscape_mode: bool = False):
     """Draw a standard header with title and optional subtitle."""
-    page_width, page_height = A4
+    page_width, page_height = landscape(A4) if landscape_mode else A4
     c.setFont("Helvetica-Bold", 14)
     c.drawCentredString(page_width / 2, page_height - 40, title)
     if subtitle:
@@ -14,9 +14,9 @@ def draw_header(c: canvas.Canvas, title: str, subtitle: str = None):
     c.setFont("Helvetica", 10)
 
 
-def draw_footer(c: canvas.Canvas, page_num: int, total_pages: int = None):
+def draw_footer(c: canvas.Canvas, page_num: int, total_pages: int = None, landscape_mode: bool = False):
     """Draw a footer with page number and timestamp. Supports 'Page X of N'."""
-    page_width, _ = A4
+    page_width, _ = landscape(A4) if landscape_mode else A4
     c.setFont("Helvetica", 8)
     if total_pages:
         footer_text = f"Page {page_num} of {total_pages}"
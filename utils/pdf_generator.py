@@ -4,8 +4,15 @@ from config.logger import logger, log_and_raise
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from utils.pdf_common import draw_header, draw_footer
-from db.init import get_db
-from db.models import Booking
+
+
+def load_manifest_rows(boat_number: int, event_name: str = None) -> list[dict]:
+    """Passengers on a boat (optionally one event) in boarding order, from the manifest projection."""
+    from db.init import get_db  # render workers import this module without touching the DB
+    from services.manifest_projection import load_manifest
+
+    with get_db() as db:
+        return load_manifest(db, boat_number, event_name)
 
 
 def generate_manifest_pdf(boat_number: str, event_name: str = None) -> bytes:
@@ -15,28 +22,19 @@ def generate_manifest_pdf(boat_number: str, event_name: str = None) -> bytes:
     Returns PDF as bytes.
     """
     boat_number = int(boat_number)
-
     try:
-        # --- Query DB instead of Sheets ---
-        with get_db() as db:
-            q = db.query(Booking).filter(
-                (Booking.arrival_boat_boarded == boat_number) |
-                (Booking.departure_boat_boarded == boat_number)
-            )
-            if event_name:
-                q = q.filter(Booking.event_id == event_name)
-            bookings = q.all()
-
-        manifest = []
-        for b in bookings:
-            manifest.append({
-                "Name": b.name,
-                "ID": b.id_number,
-                "Number": b.phone,
-                "ArrivalBoatBoarded": b.arrival_boat_boarded,
-                "DepartureBoatBoarded": b.departure_boat_boarded,
-            })
+        manifest = load_manifest_rows(boat_number, event_name)
+    except Exception as e:
+        log_and_raise("PDF", f"loading manifest for boat {boat_number}", e)
+    return render_manifest_pdf(boat_number, event_name, manifest)
 
+
+def render_manifest_pdf(boat_number: int, event_name: str, manifest: list[dict]) -> bytes:
+    """
+    Render the manifest PDF from preloaded rows. Pure CPU work (no DB or network),
+    so it can run in a render worker process.
+    """
+    try:
         logger.info(f"[PDF] Generating manifest PDF for Boat {boat_number} with {len(manifest)} passengers.")
 
         buffer = io.BytesIO()
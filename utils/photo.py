@@ -1,6 +1,9 @@
 import io
 from config.logger import logger
-from utils.supabase_storage import upload_id_photo
+import asyncio
+from utils.async_storage import upload_id_photo, upload_id_thumbnail, delete_id_thumbnail
+from utils.thumbnails import make_thumbnail, thumb_cache
+from utils.supabase_storage import id_photo_path
 from PIL import Image
 
 
@@ -80,12 +83,29 @@ async def handle_photo_upload(update, id_number: str) -> str:
 
         # --- Step 7: Upload to Supabase ---
         file_bytes.seek(0)  # rewind before upload
-        path = upload_id_photo(file_bytes.getvalue(), event_name, safe_id)
+        path = id_photo_path(file_bytes.getvalue(), event_name, safe_id)
+        thumb_cache.delete(path)  # a re-upload replaces the photo; drop the old local thumbnail
+        path = await upload_id_photo(file_bytes.getvalue(), event_name, safe_id)
         if not path:
             await message.reply_text("❌ Upload failed. Please try again.")
             logger.error(f"[Photo] Supabase upload failed for {safe_id} in event {event_name}")
             return None
 
+        # --- Step 8: Card-sized derivative for ID card PDFs (best effort) ---
+        try:
+            thumb = await asyncio.to_thread(make_thumbnail, file_bytes.getvalue())
+            await upload_id_thumbnail(thumb, path)
+            thumb_cache.put(path, thumb)
+        except Exception as e:
+            logger.warning(f"[Photo] Thumbnail upload failed for {safe_id}: {e}")
+            # The stored derivative may show the previous photo; remove it so ID cards
+            # thumbnail the new original instead (see utils/thumbnails.py)
+            try:
+                await delete_id_thumbnail(path)
+            except Exception as delete_error:
+                logger.warning(f"[Photo] Could not remove stale thumbnail for {safe_id}: {delete_error}")
+            thumb_cache.delete(path)
+
         await message.reply_text("✅ Photo uploaded successfully.")
         return path
 
@@ -1,18 +1,35 @@
 import os
 import io
 import requests
-from supabase import create_client
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from PIL import Image
-from config.envs import SUPABASE_URL, SUPABASE_KEY, SUPABASE_BUCKET
+from config.logger import logger
+from config.envs import SUPABASE_URL, SUPABASE_KEY, SUPABASE_BUCKET, PHOTO_FETCH_WORKERS
 
 MAX_PHOTO_SIZE = 2 * 1024 * 1024  # 2 MB
 ALLOWED_IMAGE_TYPES = {"JPEG", "PNG"}
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+_supabase = None
 
 
-def upload_id_photo(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
-    """Upload a passenger ID photo to Supabase under ids/<event>/<ticket>.<ext>"""
+def get_supabase():
+    """Supabase client, created on first use (or by the startup warm-up)."""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
+
+
+# Pooled HTTP session for signed-URL downloads (keep-alive across files)
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=PHOTO_FETCH_WORKERS))
+
+
+def id_photo_path(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
+    """Validate an ID photo and return its Storage path ids/<event>/<ticket>.<ext>"""
     if len(file_bytes) > MAX_PHOTO_SIZE:
         raise ValueError("Photo too large. Max size is 2 MB.")
 
@@ -27,9 +44,21 @@ def upload_id_photo(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
 
     # Preserve original extension
     ext = ".jpg" if fmt == "JPEG" else ".png"
-    path = f"ids/{event_name}/{ticket_ref}{ext}"
+    return f"ids/{event_name}/{ticket_ref}{ext}"
+
 
-    res = supabase.storage.from_(SUPABASE_BUCKET).upload(
+def check_pdf(pdf_bytes: bytes):
+    if not pdf_bytes:
+        raise ValueError("upload received no PDF bytes")
+    if not pdf_bytes.startswith(b"%PDF"):
+        raise ValueError("Invalid file type. Only PDF allowed.")
+
+
+def upload_id_photo(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
+    """Upload a passenger ID photo to Supabase under ids/<event>/<ticket>.<ext>"""
+    path = id_photo_path(file_bytes, event_name, ticket_ref)
+
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).upload(
         path,
         file_bytes,
         {"x-upsert": "true"}   # correct header
@@ -40,13 +69,28 @@ def upload_id_photo(file_bytes: bytes, event_name: str, ticket_ref: str) -> str:
     return path
 
 
+def upload_id_thumbnail(thumb_bytes: bytes, photo_path: str) -> str:
+    """Upload the card-sized JPEG derivative of an ID photo (see utils/thumbnails.py)."""
+    from utils.thumbnails import thumbnail_path
+
+    path = thumbnail_path(photo_path)
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).upload(
+        path,
+        thumb_bytes,
+        {"x-upsert": "true", "content-type": "image/jpeg"}
+    )
+
+    if isinstance(res, dict) and res.get("error"):
+        raise RuntimeError(f"Supabase upload failed: {res['error']}")
+    return path
+
+
 def upload_manifest(pdf_bytes: bytes, event_name: str, boat_number: str) -> str:
     """Upload a manifest PDF to Supabase under manifests/<event>/boat_<n>.pdf"""
-    if not pdf_bytes.startswith(b"%PDF"):
-        raise ValueError("Invalid file type. Only PDF allowed.")
+    check_pdf(pdf_bytes)
 
     path = f"manifests/{event_name}/boat_{boat_number}.pdf"
-    res = supabase.storage.from_(SUPABASE_BUCKET).upload(
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).upload(
         path,
         pdf_bytes,
         {"x-upsert": "true"}   # ✅ fix here
@@ -59,14 +103,10 @@ def upload_manifest(pdf_bytes: bytes, event_name: str, boat_number: str) -> str:
 
 def upload_idcard(pdf_bytes: bytes, event_name: str, ticket_ref: str) -> str:
     """Upload an ID card PDF under ids/<event>/idcards/<ticket>.pdf"""
-    if not pdf_bytes:
-        raise ValueError("upload_idcard received no PDF bytes")
-        
-    if not pdf_bytes.startswith(b"%PDF"):
-        raise ValueError("Invalid file type. Only PDF allowed.")
+    check_pdf(pdf_bytes)
 
     path = f"ids/{event_name}/idcards/{ticket_ref}.pdf"
-    res = supabase.storage.from_(SUPABASE_BUCKET).upload(
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).upload(
         path,
         pdf_bytes,
         {"x-upsert": "true"}   # ✅ fix here
@@ -77,14 +117,60 @@ def upload_idcard(pdf_bytes: bytes, event_name: str, ticket_ref: str) -> str:
     return path
 
 
+def _download(url: str) -> bytes:
+    resp = _http.get(url, timeout=30)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch file from Supabase: {resp.status_code}")
+    return resp.content
+
+
 def fetch_signed_file(path: str, expiry: int = 60) -> bytes:
     """Generate a signed URL and fetch the file bytes"""
-    res = supabase.storage.from_(SUPABASE_BUCKET).create_signed_url(path, expiry)
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).create_signed_url(path, expiry)
     url = res.get("signedURL") if isinstance(res, dict) else None
     if not url:
         raise RuntimeError(f"Failed to create signed URL for {path}")
-
-    resp = requests.get(url)
-    if resp.status_code != 200:
-        raise RuntimeError(f"Failed to fetch file from Supabase: {resp.status_code}")
-    return resp.content
\ No newline at end of file
+    return _download(url)
+
+
+def create_signed_urls(paths: list[str], expiry: int = 60) -> dict[str, str]:
+    """Sign many paths in one Storage request. Paths that couldn't be signed are left out."""
+    if not paths:
+        return {}
+    res = get_supabase().storage.from_(SUPABASE_BUCKET).create_signed_urls(list(paths), expiry)
+    urls = {}
+    for item in res or []:
+        url = item.get("signedURL") or item.get("signedUrl")
+        if item.get("path") and url and not item.get("error"):
+            urls[item["path"]] = url
+    return urls
+
+
+def fetch_signed_files(paths: list[str], expiry: int = 60, max_workers: int = PHOTO_FETCH_WORKERS) -> dict:
+    """
+    Prefetch many files: sign them in one batch, then download concurrently over
+    the pooled session. Returns {path: bytes or Exception} so callers can render
+    a placeholder for individual failures.
+    """
+    paths = list(dict.fromkeys(p for p in paths if p))
+    if not paths:
+        return {}
+    try:
+        urls = create_signed_urls(paths, expiry)
+    except Exception as e:
+        logger.warning(f"[Storage] Batch signing failed for {len(paths)} files: {e}")
+        return {p: e for p in paths}
+
+    results = {p: RuntimeError(f"Failed to create signed URL for {p}") for p in paths if p not in urls}
+
+    def _fetch(path):
+        try:
+            return path, _download(urls[path])
+        except Exception as e:
+            return path, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls) or 1))) as pool:
+        results.update(pool.map(_fetch, urls))
+    failed = sum(isinstance(v, Exception) for v in results.values())
+    logger.info(f"[Storage] Prefetched {len(paths) - failed}/{len(paths)} files")
+    return results
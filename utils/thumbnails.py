@@ -0,0 +1,85 @@
+import io
+import posixpath
+from PIL import Image, ImageOps
+from config.logger import logger
+from config.envs import THUMB_CACHE_DIR, THUMB_CACHE_MAX_MB
+from utils.disk_cache import DiskLRUCache
+
+# ===== ID photo thumbnails =====
+# ID cards place each photo in a ~260×227 pt slot, so the full upload (up to 5 MB)
+# is wasted bytes in the PDF. Every upload also stores a card-sized JPEG next to
+# the original (ids/<event>/thumbs/<ticket>.jpg); renderers fetch that instead,
+# through a local disk LRU so repeated PDFs for the same boat skip Storage entirely.
+
+THUMB_SIZE = (780, 680)  # ~3× the card slot in points (≈216 dpi when printed)
+THUMB_QUALITY = 80
+
+
+def make_thumbnail(image_bytes: bytes) -> bytes:
+    """Downscale an image to a card-sized RGB JPEG (EXIF rotation applied)."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(THUMB_SIZE)
+        out = io.BytesIO()
+        img.convert("RGB").save(out, format="JPEG", quality=THUMB_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def thumbnail_path(photo_path: str) -> str:
+    """ids/<event>/<ticket>.png → ids/<event>/thumbs/<ticket>.jpg"""
+    folder, name = posixpath.split(photo_path)
+    return posixpath.join(folder, "thumbs", posixpath.splitext(name)[0] + ".jpg")
+
+
+thumb_cache = DiskLRUCache(THUMB_CACHE_DIR, THUMB_CACHE_MAX_MB * 1024 * 1024, suffix=".jpg")
+
+
+def fetch_thumbnails(photo_paths: list[str], expiry: int = 60) -> dict:
+    """
+    Card-sized photo bytes for each original photo path: {path: bytes or Exception}.
+    Order of preference: disk cache, stored derivative, original (thumbnailed here,
+    then the derivative is backfilled to Storage for next time).
+    """
+    from utils.supabase_storage import fetch_signed_files, upload_id_thumbnail
+
+    results, misses = {}, []
+    for path in dict.fromkeys(p for p in photo_paths if p):
+        data = thumb_cache.get(path)
+        if data is not None:
+            results[path] = data
+        else:
+            misses.append(path)
+    if not misses:
+        return results
+
+    thumbs = fetch_signed_files([thumbnail_path(p) for p in misses], expiry=expiry)
+    legacy = []
+    for path in misses:
+        data = thumbs.get(thumbnail_path(path))
+        if isinstance(data, bytes):
+            results[path] = data
+            thumb_cache.put(path, data)
+        else:
+            legacy.append(path)
+
+    # Photos uploaded before derivatives existed: shrink the original once
+    if legacy:
+        originals = fetch_signed_files(legacy, expiry=expiry)
+        for path in legacy:
+            data = originals.get(path)
+            if not isinstance(data, bytes):
+                results[path] = data
+                continue
+            try:
+                thumb = make_thumbnail(data)
+            except Exception as e:
+                results[path] = e
+                continue
+            results[path] = thumb
+            thumb_cache.put(path, thumb)
+            try:
+                upload_id_thumbnail(thumb, path)
+            except Exception as e:
+                logger.warning(f"[Thumbs] Backfill upload failed for {path}: {e}")
+        logger.info(f"[Thumbs] Built {len(legacy)} thumbnails from originals")
+    return results
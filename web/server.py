@@ -6,9 +6,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from telegram import Update
 
 from config.logger import logger
-from config.envs import LOG_LEVEL, TELEGRAM_TOKEN
+from config.envs import LOG_LEVEL, TELEGRAM_TOKEN, validate_envs
 from bot.handlers import init_bot, application
-from db.init import close_engine
+from db.init import close_engine, close_async_engine
+from services.sheets_outbox import start_outbox_worker, stop_outbox_worker
+from services.render_pool import shutdown_render_pool
+from services.warmup import warm_up, warmup_stats
+from bot.dispatcher import stop_dispatcher, submit_update, dispatcher_stats
+from utils.async_storage import close_storage_client, storage_stats
 
 # ===== Global State =====
 # Remove this duplicate declaration:
@@ -36,22 +41,35 @@ app.add_middleware(
 )
 
 # ===== Startup Hook =====
-@app.on_event("startup")
-async def startup_event():
+async def _start_bot():
     # No need to declare global here since we're importing from handlers
-    logger.info("[Web] FastAPI startup — initializing bot...")
     for attempt in range(3):
         try:
             print(f"[DEBUG] init_bot() attempt {attempt+1}")
             await init_bot()
             # The bot_ready flag is now set within init_bot() in handlers.py
             logger.info("[Startup] ✅ Bot initialized successfully.")
-            break
+            return
         except Exception as e:
             logger.error(f"[Startup] ❌ Bot init failed (attempt {attempt+1}): {e}", exc_info=True)
             await asyncio.sleep(2 * attempt)
-    else:
-        logger.critical("[Startup] ❌ Bot failed to initialize after retries.")
+    logger.critical("[Startup] ❌ Bot failed to initialize after retries.")
+    raise RuntimeError("bot failed to initialize")
+
+
+@app.on_event("startup")
+async def startup_event():
+    validate_envs()
+    logger.info("[Web] FastAPI startup — warming up DB, Sheets, Supabase and bot...")
+    timings = await warm_up(("bot", _start_bot()))
+    # Without the DB or the bot the service can't do its job; fail startup so the
+    # platform restarts it instead of reporting healthy while dropping every update
+    for essential, label in (("db", "Database unavailable"), ("bot", "Telegram bot failed to initialize")):
+        if not timings[essential]["ok"]:
+            raise RuntimeError(f"{label}: {timings[essential].get('error')}")
+
+    # Sheets writes are queued by handlers and flushed in the background
+    start_outbox_worker()
 
 # ===== Shutdown Hook =====
 @app.on_event("shutdown")
@@ -59,6 +77,10 @@ async def shutdown_event():
     from bot.handlers import bot_ready, application
     bot_ready = False
     logger.info("[Web] FastAPI shutdown — cleaning up bot and DB...")
+    await stop_dispatcher()
+    await stop_outbox_worker()
+    shutdown_render_pool()
+    await close_storage_client()
     try:
         if application:
             # Proper shutdown for webhook mode
@@ -71,6 +93,7 @@ async def shutdown_event():
         logger.error(f"[Shutdown] ❌ Bot shutdown failed: {e}", exc_info=True)
     finally:
         close_engine()
+        await close_async_engine()
         
 # ===== Health Check =====
 @app.get("/", tags=["Health"])
@@ -83,6 +106,27 @@ def health_check():
         "bot_ready": bot_ready
     }
 
+# ===== Runtime Metrics =====
+@app.get("/metrics", tags=["Health"])
+def metrics():
+    from bot.utils.roles import role_cache_stats
+    from services.sheets_outbox import outbox_stats
+    from sheets.manager import sheets_batch_stats
+    from utils.thumbnails import thumb_cache
+    from utils.pdf_cache import pdf_cache
+    from db.init import db_pool_stats
+    return {
+        "db_pool": db_pool_stats(),
+        "role_cache": role_cache_stats(),
+        "sheets_outbox": outbox_stats(),
+        "sheets_batch": sheets_batch_stats(),
+        "thumb_cache": thumb_cache.stats(),
+        "pdf_cache": pdf_cache.stats(),
+        "storage": storage_stats(),
+        "updates": dispatcher_stats(),
+        "startup": warmup_stats(),
+    }
+
 # ===== Telegram Webhook =====
 @app.post(f"/{TELEGRAM_TOKEN}")
 async def telegram_webhook(request: Request):
@@ -100,9 +144,15 @@ async def telegram_webhook(request: Request):
         logger.info(f"[Webhook] 📩 Incoming update from {request.client.host}")
 
         update = Update.de_json(data, application.bot)
-        
-        # ✅ CRITICAL: Use application.process_update() instead of putting in queue
-        await application.process_update(update)
+
+        # Acknowledge right away; a slow handler must not hold Telegram's request open
+        if not submit_update(update):
+            # Backpressure: Telegram retries non-2xx deliveries later
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"ok": False, "queued": False},
+                headers={"Retry-After": "5"},
+            )
 
         return JSONResponse(status_code=status.HTTP_200_OK, content={"ok": True})
 